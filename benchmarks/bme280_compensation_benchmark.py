@@ -0,0 +1,46 @@
+"""
+Compensation of 100000 raw BME280 readings: per reading with CompensatedReadings and
+FixedPointCompensatedReadings, and in one NumPy pass with BatchCompensation.
+
+    python -m benchmarks.bme280_compensation_benchmark
+"""
+import time
+
+import numpy as np
+
+from lib.sensor_drivers.bme280.batch_compensation import BatchCompensation
+from lib.sensor_drivers.bme280.bme280_driver import (CompensatedReadings, FixedPointCompensatedReadings, Params,
+                                                     UncompensatedReadings)
+from lib.sensor_drivers.bme280.simulated_bus import EXAMPLE_CALIBRATION
+
+SAMPLES = 100000
+
+
+def raw_blocks(samples: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = rng.integers(450000, 560000, samples)
+    p = rng.integers(380000, 450000, samples)
+    h = rng.integers(20000, 40000, samples)
+    return np.stack([p >> 12 & 0xFF, p >> 4 & 0xFF, (p & 0x0F) << 4,
+                     t >> 12 & 0xFF, t >> 4 & 0xFF, (t & 0x0F) << 4,
+                     h >> 8, h & 0xFF], axis=1).astype(np.uint8)
+
+
+if __name__ == "__main__":
+    blocks = raw_blocks(SAMPLES)
+    readings = [UncompensatedReadings(block) for block in blocks.tolist()]
+    params = Params(EXAMPLE_CALIBRATION)
+
+    for name, compensation in (("float", CompensatedReadings), ("fixed point", FixedPointCompensatedReadings)):
+        start = time.perf_counter()
+        for raw in readings:
+            compensation(raw, params)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} {elapsed:7.3f}s  {SAMPLES / elapsed:12.0f} readings/sec")
+
+    batch = BatchCompensation(params)
+    for name, fixed_point in (("batch float", False), ("batch fixed point", True)):
+        start = time.perf_counter()
+        batch.compensate(blocks, fixed_point=fixed_point)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} {elapsed:7.3f}s  {SAMPLES / elapsed:12.0f} readings/sec")
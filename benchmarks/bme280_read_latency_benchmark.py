@@ -0,0 +1,35 @@
+"""
+Read latency of the Bme280 driver in forced mode (start a measurement, wait for it, read it) and in
+normal mode (read the latest result of the continuously measuring sensor), on a simulated 100 kHz bus.
+
+    python -m benchmarks.bme280_read_latency_benchmark
+"""
+import time
+
+from lib.sensor_drivers.bme280.bme280_driver import Bme280, OperatingMode, StandbyTime
+from lib.sensor_drivers.bme280.simulated_bus import SimulatedBme280Bus
+from lib.util.latency_stats import LatencyStats
+
+READS = 200
+
+
+def measure(sensor: Bme280, bus: SimulatedBme280Bus) -> LatencyStats:
+    bus.transactions = 0
+    latency = LatencyStats()
+    for _ in range(READS):
+        start = time.perf_counter()
+        sensor.get_sensor_data()
+        latency.record(time.perf_counter() - start)
+    return latency
+
+
+if __name__ == "__main__":
+    bus = SimulatedBme280Bus(realtime=True)
+    forced = measure(Bme280(bus), bus)
+    print(f"forced  {bus.transactions / READS:.0f} transactions per read, {forced}")
+
+    bus = SimulatedBme280Bus(realtime=True)
+    sensor = Bme280(bus, mode=OperatingMode.NORMAL, standby=StandbyTime.STANDBY_0_5_MS)
+    normal = measure(sensor, bus)
+    print(f"normal  {bus.transactions / READS:.0f} transactions per read, {normal}")
+    print(f"a new result every {sensor.sampling_period * 1000:.1f} ms")
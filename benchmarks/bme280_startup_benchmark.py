@@ -0,0 +1,40 @@
+"""
+Startup of the Bme280 driver on a simulated 100 kHz i2c bus: the calibration read per register, in two
+block transfers and from the calibration cache (a chip id and dig_T1 verify).
+
+    python -m benchmarks.bme280_startup_benchmark
+"""
+import os
+import tempfile
+import time
+
+from lib.sensor_drivers.bme280.bme280_driver import Bme280
+from lib.sensor_drivers.bme280.calibration_cache import CalibrationCache
+from lib.sensor_drivers.bme280.simulated_bus import SimulatedBme280Bus
+
+
+def _report(name: str, bus: SimulatedBme280Bus, elapsed: float) -> None:
+    print(f"{name:<16} {bus.transactions:>3} transactions, {bus.bus_time * 1000:6.2f} ms on the bus, {elapsed * 1000:6.2f} ms startup")
+
+
+if __name__ == "__main__":
+    bus = SimulatedBme280Bus(realtime=True)
+    sensor = Bme280(bus)  # block reads
+    bus.transactions, bus.bus_time = 0, 0.0
+    start = time.perf_counter()
+    sensor._read_calibration_registers()
+    _report("per register", bus, time.perf_counter() - start)
+
+    bus = SimulatedBme280Bus(realtime=True)
+    start = time.perf_counter()
+    Bme280(bus)
+    _report("block reads", bus, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as directory:
+        calibration_cache = CalibrationCache(os.path.join(directory, "bme280_calibration.json"))
+        Bme280(SimulatedBme280Bus(), calibration_cache=calibration_cache, bus_id=1)  # fills the cache
+
+        bus = SimulatedBme280Bus(realtime=True)
+        start = time.perf_counter()
+        Bme280(bus, calibration_cache=calibration_cache, bus_id=1)
+        _report("cached", bus, time.perf_counter() - start)
@@ -0,0 +1,41 @@
+"""
+Decides for 10000 controllers at once with the ControllerBank and compares it with calling 10000
+EnvironmentControllers one by one. The decisions of both are checked to be the same.
+
+    python -m benchmarks.controller_bank_benchmark
+"""
+import time
+
+import numpy as np
+
+from lib.controllers.controller_bank import ControllerBank
+from lib.controllers.enviroment_controller import EnvironmentController
+
+CONTROLLERS = 10_000
+STEPS = 100
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    kp = rng.uniform(0.1, 1.0, CONTROLLERS)
+    kd = rng.uniform(0.0, 0.5, CONTROLLERS)
+    threshold = rng.uniform(0.1, 1.0, CONTROLLERS)
+    internal = rng.normal(20, 2, (STEPS, CONTROLLERS))
+    external = rng.normal(21, 2, (STEPS, CONTROLLERS))
+
+    controllers = [EnvironmentController(*gains) for gains in zip(kp.tolist(), kd.tolist(), threshold.tolist())]
+    bank = ControllerBank(kp, kd, threshold)
+
+    start = time.perf_counter()
+    scalar_decisions = [[controller.calculate_device_on_off(internal_value, external_value)
+                         for controller, internal_value, external_value in zip(controllers, internal[step].tolist(), external[step].tolist())]
+                        for step in range(STEPS)]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bank_decisions = [bank.calculate_device_on_off(internal[step], external[step]) for step in range(STEPS)]
+    bank_time = time.perf_counter() - start
+
+    assert np.array_equal(np.array(scalar_decisions), np.array(bank_decisions)), "the decisions differ"
+    print(f"{CONTROLLERS} controllers, {STEPS} steps, same decisions")
+    print(f"  scalar: {scalar_time / STEPS * 1000:8.3f} ms per step")
+    print(f"  bank:   {bank_time / STEPS * 1000:8.3f} ms per step ({scalar_time / bank_time:.0f}x)")
@@ -0,0 +1,36 @@
+"""
+Two BME280s in forced mode on one simulated 100 kHz i2c bus: read one after the other, and with
+Bme280.read_many (both measurements started first, one wait, both data blocks in one pass).
+
+    python -m benchmarks.i2c_bus_benchmark
+"""
+import time
+
+from lib.i2c.i2c_bus_manager import SharedI2cBus
+from lib.sensor_drivers.bme280.bme280_driver import Bme280
+from lib.sensor_drivers.bme280.simulated_bus import SimulatedBme280Bus
+from lib.util.latency_stats import LatencyStats
+
+ROUNDS = 50
+
+
+if __name__ == "__main__":
+    bus = SharedI2cBus(SimulatedBme280Bus(realtime=True), 1)
+    sensors = [Bme280(bus, 0x76), Bme280(bus, 0x77)]
+
+    one_by_one = LatencyStats()
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for sensor in sensors:
+            sensor.get_sensor_data()
+        one_by_one.record(time.perf_counter() - start)
+
+    batched = LatencyStats()
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        Bme280.read_many(sensors)
+        batched.record(time.perf_counter() - start)
+
+    print(f"one by one  {one_by_one}")
+    print(f"read_many   {batched}")
+    print(f"per transaction: {bus.latency}")
@@ -0,0 +1,54 @@
+"""
+Sends sensor data from an MQTTManager to EnviroControl over the in-process loopback broker and measures
+how many messages per second EnviroControl handles end to end, without a network or a real broker.
+
+    python -m benchmarks.loopback_benchmark
+"""
+import logging
+import threading
+import time
+import uuid
+
+import yaml
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.mqtt_topic import MqttTopic
+from lib.mqtt.transports.loopback_transport import LoopbackTransport
+
+MESSAGES = 20_000
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    config["enviro_sense"]["mqtt_transport"] = "loopback"
+    config["enviro_sense"]["history_path"] = ""
+    logging.disable(logging.INFO)
+
+    enviro_control = EnviroControl(config)
+    control_thread = threading.Thread(target=enviro_control.run)
+    control_thread.start()
+
+    publisher = MQTTManager(transport=LoopbackTransport())  # the same broker of the process as EnviroControl
+    publisher.connect()
+    topic = MqttTopic(enviro_control.digital_id).sensor_data_topic
+    payload = SensorDataPayload(id=uuid.uuid4(),
+                                internal_sensor_data=SensorData(temperature=21.37, humidity=48.21, pressure=1012.87),
+                                external_sensor_data=SensorData(temperature=14.02, humidity=71.5, pressure=1013.04))
+
+    for payload_format in ["json", "binary"]:
+        handled = enviro_control.dispatch_stats.messages_handled
+        encoded = payload.encode(payload_format)
+        start = time.perf_counter()
+        for _ in range(MESSAGES):
+            publisher.publish(topic, encoded, qos=1)
+        while enviro_control.dispatch_stats.messages_handled < handled + MESSAGES:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        print(f"{payload_format:>6}: {MESSAGES} messages in {elapsed:.2f}s, {MESSAGES / elapsed:.0f} msg/s")
+
+    publisher.disconnect()
+    enviro_control.stop()
+    control_thread.join()
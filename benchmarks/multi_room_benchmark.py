@@ -0,0 +1,61 @@
+"""
+Measures how many sensor messages per second the MultiRoomEnviroControl handles for a growing number of
+rooms. The messages are put straight on the router, so no broker is needed.
+
+    python -m benchmarks.multi_room_benchmark
+"""
+import json
+import logging
+import time
+
+from lib.envirocontrol_app.multi_room_enviro_control import MultiRoomEnviroControl
+from lib.mqtt.mqtt_topic import MqttTopic
+
+ROOM_COUNTS = [1, 10, 40, 100, 200]
+MESSAGES_PER_ROOM = 200
+WORKER_THREADS = 4
+
+
+def _config(room_count: int) -> dict:
+    return {
+        "enviro_sense": {
+            "relay_driver": "mock",
+            "enable_pid": True,
+            "control_worker_threads": WORKER_THREADS,
+            "control_rooms": [{"digital_id": f"ROOM_{index}", "relay_gpio_1": 2 * index, "relay_gpio_2": 2 * index + 1}
+                              for index in range(room_count)]
+        }
+    }
+
+
+def _payload(index: int) -> str:
+    return json.dumps({
+        "id": "bea83a3b-3034-476f-8451-a2677a4ffc3c",
+        "internal_sensor_data": {"temperature": 18 + index % 10, "humidity": 40.0, "pressure": 1013.25},
+        "external_sensor_data": {"temperature": 22.0, "humidity": 60.0, "pressure": 1013.25},
+        "timestamp": "2024-10-18 14:38:23.343361"
+    })
+
+
+def run(room_count: int) -> float:
+    enviro_control = MultiRoomEnviroControl(_config(room_count))
+    messages = [{"topic": MqttTopic(digital_id).sensor_data_topic, "payload": _payload(index), "qos": 0}
+                for index in range(MESSAGES_PER_ROOM) for digital_id in enviro_control.rooms]
+
+    enviro_control.start()
+    start = time.perf_counter()
+    for message in messages:
+        enviro_control.router.put(message)
+    while sum(stats.messages_handled for stats in enviro_control.dispatch_stats) < len(messages):
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    enviro_control.stop()
+    enviro_control._shutdown()
+    return len(messages) / elapsed
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    print(f"{'rooms':>6} {'messages/sec':>14}")
+    for room_count in ROOM_COUNTS:
+        print(f"{room_count:>6} {run(room_count):>14.0f}")
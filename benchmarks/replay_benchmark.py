@@ -0,0 +1,45 @@
+"""
+Replays a synthetic day of sensor data (a reading every 3 seconds) through EnviroControl without
+broker and relay settle times, and reports the decisions per second and the time per stage.
+
+    python -m benchmarks.replay_benchmark
+"""
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import yaml
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.envirocontrol_app.replay_enviro_control import ReplayEnviroControl
+
+READINGS = 28_800
+
+
+def _synthetic_recording(readings: int):
+    random.seed(42)
+    start = datetime(2024, 10, 18)
+    for reading in range(readings):
+        outside = 12 + 6 * math.sin(reading / readings * 2 * math.pi)
+        payload = SensorDataPayload(id=uuid.uuid4(),
+                                    internal_sensor_data=SensorData(temperature=20 + random.gauss(0, 1.5),
+                                                                    humidity=55 + random.gauss(0, 8),
+                                                                    pressure=1013.25),
+                                    external_sensor_data=SensorData(temperature=outside + random.gauss(0, 0.5),
+                                                                    humidity=70 + random.gauss(0, 5),
+                                                                    pressure=1013.25),
+                                    timestamp=start + timedelta(seconds=3 * reading))
+        yield payload.to_json()
+
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    config["enviro_sense"]["history_path"] = ""
+
+    recording = list(_synthetic_recording(READINGS))
+    enviro_control = ReplayEnviroControl(config)
+    print(enviro_control.replay(recording))
+    print(f"heater switched {enviro_control.heating_relay.switches} times, steamer {enviro_control.steam_relay.switches} times")
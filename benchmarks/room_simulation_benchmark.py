@@ -0,0 +1,60 @@
+"""
+Runs EnviroSense and EnviroControl in one process on a simulated room: the loopback broker carries the
+messages, the simulated sensors read the room and the simulated relays switch its heater and steamer.
+The room runs 3600 times faster than real time, a reading every 3 seconds of room time.
+
+    python -m benchmarks.room_simulation_benchmark
+"""
+import logging
+import threading
+import time
+
+import yaml
+
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.envirosense_app.enviro_sense import EnviroSense
+from lib.simulation.room_simulator import RoomSimulator
+
+SPEED = 3600.0
+WALL_SECONDS = 10.0
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    config["enviro_sense"].update({
+        "mqtt_transport": "loopback",
+        "internal_sensor_driver": "simulated_room",
+        "external_sensor_driver": "simulated_outdoor",
+        "relay_driver": "simulated",
+        "sensor_publish_data_timeout": 3.0 / SPEED,
+        "outbox_path": "",
+        "history_path": "",
+    })
+    logging.disable(logging.INFO)
+
+    simulator = RoomSimulator(speed=SPEED, start_temperature=5.0, start_relative_humidity=8.0)
+    RoomSimulator.set_shared(simulator)
+    enviro_control = EnviroControl(config)
+    enviro_sense = EnviroSense(config)
+    threads = [threading.Thread(target=enviro_control.run), threading.Thread(target=enviro_sense.run)]
+
+    temperatures = []
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while time.perf_counter() - start < WALL_SECONDS:
+        temperatures.append(simulator.temperature - simulator.model.outdoor.at(simulator.time)[0])
+        time.sleep(0.1)
+    enviro_sense.stop()
+    enviro_control.stop()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    hours = simulator.time / 3600
+    handled = enviro_control.dispatch_stats.messages_handled
+    print(f"{hours:.1f} hours of room time in {elapsed:.1f}s, {handled} readings handled ({handled / elapsed:.0f}/s), "
+          f"a reading every {simulator.time / max(handled, 1):.1f}s of room time")
+    print(f"room - outside: min {min(temperatures):.2f}, max {max(temperatures):.2f} °C")
+    print(f"heater: {simulator.heater_switches} switches, on {simulator.heater_on_time / simulator.time:.0%} of the time")
+    print(f"steamer: {simulator.steamer_switches} switches, on {simulator.steamer_on_time / simulator.time:.0%} of the time")
@@ -0,0 +1,45 @@
+"""
+Drift of the EnviroSense sampling loop: sleeping the period after every sample (the old loop) against
+the PeriodicScheduler, for a 50 ms period and a sample that takes 5 to 15 ms.
+
+    python -m benchmarks.sampling_drift_benchmark
+"""
+import random
+import time
+
+from lib.util.jitter_histogram import JitterHistogram
+from lib.util.periodic_scheduler import PeriodicScheduler
+
+PERIOD = 0.05
+TICKS = 100
+
+
+def sample(rng: random.Random) -> None:
+    time.sleep(rng.uniform(0.005, 0.015))
+
+
+def sleep_after_sample() -> JitterHistogram:
+    rng = random.Random(1)
+    jitter = JitterHistogram()
+    start = time.monotonic()
+    for tick in range(TICKS):
+        jitter.record(time.monotonic() - (start + tick * PERIOD))
+        sample(rng)
+        time.sleep(PERIOD)
+    return jitter
+
+
+def scheduled() -> JitterHistogram:
+    rng = random.Random(1)
+    scheduler = PeriodicScheduler(PERIOD)
+    for _ in range(TICKS):
+        scheduler.wait_next()
+        sample(rng)
+    return scheduler.jitter
+
+
+if __name__ == "__main__":
+    for name, loop in (("sleep after sample", sleep_after_sample), ("scheduler", scheduled)):
+        jitter = loop()
+        print(f"{name:<18} furthest behind the schedule in {TICKS} samples: {jitter.maximum * 1000:8.1f} ms, p99 jitter <= {jitter.percentile(99) * 1000:g} ms")
+        print(f"{'':<18} {jitter}")
@@ -0,0 +1,55 @@
+"""
+Compares the SaturationVapourEngine with the CSVLookup of doc/waterdampspanning.csv: the difference
+with the table at every row, and the calls/sec for single messages and for a batch. The closed form
+has to be faster than the table for single messages as well, the benchmark fails when it isn't.
+
+    python -m benchmarks.saturation_vapour_benchmark
+"""
+import random
+import time
+
+import numpy as np
+
+from lib.util.csv_lookup import CSVLookup
+from lib.util.saturation_vapour import SaturationVapourEngine, SaturationFormula
+
+CALLS = 200_000
+BATCH_SIZE = 1_000_000
+
+
+def accuracy(csv_lookup: CSVLookup, engine: SaturationVapourEngine) -> float:
+    temperatures = sorted(csv_lookup.lookup_table.keys())
+    calculated = engine.saturation_vapour_density(temperatures)
+    table = np.array([csv_lookup.lookup_table[temperature] for temperature in temperatures])
+    return float(np.max(np.abs(calculated - table)))
+
+
+def calls_per_second(lookup, temperatures) -> float:
+    start = time.perf_counter()
+    for temperature in temperatures:
+        lookup.get_closest_value(temperature)
+    return len(temperatures) / (time.perf_counter() - start)
+
+
+def batch_per_second(lookup, temperatures) -> float:
+    start = time.perf_counter()
+    lookup.get_closest_values(temperatures)
+    return len(temperatures) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    csv_lookup = CSVLookup("doc/waterdampspanning.csv")
+    engines = {formula.value.lower(): SaturationVapourEngine(formula) for formula in SaturationFormula}
+    # sensor readings have two decimals
+    temperatures = [round(random.uniform(15.0, 30.0), 2) for _ in range(CALLS)]
+    batch = np.random.uniform(-10.0, 35.0, BATCH_SIZE)
+
+    print(f"{'lookup':>8} {'max diff g/m3':>14} {'calls/sec':>12} {'batch values/sec':>17}")
+    csv_calls_per_second = calls_per_second(csv_lookup, temperatures)
+    print(f"{'csv':>8} {0.0:>14.3f} {csv_calls_per_second:>12.0f} {batch_per_second(csv_lookup, batch):>17.0f}")
+    for name, engine in engines.items():
+        engine_calls_per_second = calls_per_second(engine, temperatures)
+        print(f"{name:>8} {accuracy(csv_lookup, engine):>14.3f} {engine_calls_per_second:>12.0f} "
+              f"{batch_per_second(engine, batch):>17.0f}")
+        assert engine_calls_per_second > csv_calls_per_second, \
+            f"{name} is slower than the table for single messages: {engine_calls_per_second:.0f} < {csv_calls_per_second:.0f} calls/sec"
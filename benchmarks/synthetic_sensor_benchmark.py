@@ -0,0 +1,28 @@
+"""
+Readings per second of the SensorMock, one reading at a time, against the SyntheticSensorGenerator,
+which produces a reading of 10000 virtual sensors per step.
+
+    python -m benchmarks.synthetic_sensor_benchmark
+"""
+import time
+
+from lib.sensor_drivers.sensor_mock import SensorMock
+from lib.sensor_drivers.synthetic.synthetic_generator import SyntheticSensorGenerator
+
+SENSORS = 10_000
+STEPS = 100
+
+if __name__ == "__main__":
+    sensor_mock = SensorMock()
+    start = time.perf_counter()
+    for _ in range(SENSORS * 10):
+        sensor_mock.get_sensor_data()
+    mock_rate = SENSORS * 10 / (time.perf_counter() - start)
+
+    generator = SyntheticSensorGenerator(SENSORS, seed=42, dropout_rate=0.01)
+    start = time.perf_counter()
+    series = generator.series(STEPS)
+    synthetic_rate = SENSORS * STEPS / (time.perf_counter() - start)
+
+    print(f"SensorMock:               {mock_rate:12,.0f} readings/s")
+    print(f"SyntheticSensorGenerator: {synthetic_rate:12,.0f} readings/s ({SENSORS} sensors, {series.valid.mean():.1%} valid)")
@@ -0,0 +1,34 @@
+"""
+Compares the json and the binary format of the SensorDataPayload: bytes on the wire and the time to
+encode and decode a payload.
+
+    python -m benchmarks.wire_format_benchmark
+"""
+import time
+import uuid
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_payload import SensorDataPayload
+
+ITERATIONS = 100_000
+
+
+def _time_per_call(function, argument) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function(argument)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+if __name__ == "__main__":
+    payload = SensorDataPayload(id=uuid.uuid4(),
+                                internal_sensor_data=SensorData(temperature=21.37, humidity=48.21, pressure=1012.87),
+                                external_sensor_data=SensorData(temperature=14.02, humidity=71.5, pressure=1013.04))
+
+    print(f"{'format':>8} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+    for payload_format in ["json", "binary"]:
+        encoded = payload.encode(payload_format)
+        size = len(encoded.encode() if isinstance(encoded, str) else encoded)
+        encode_time = _time_per_call(payload.encode, payload_format)
+        decode_time = _time_per_call(SensorDataPayload.from_wire, encoded)
+        print(f"{payload_format:>8} {size:>6} {encode_time * 1e6:>10.2f} {decode_time * 1e6:>10.2f}")
@@ -4,7 +4,7 @@ from lib.gpio.relay_driver import RelayDriver
 from lib.gpio.relay_factory import RelayFactory
 from lib.gpio.relay_interface import RelayInterface
 from lib.sensor_drivers.sensor_driver import SensorDriver
-from lib.sensor_drivers.sensor_factory import SensorFactory
+from lib.sensor_drivers.sensor_hub import SensorHub
 from lib.sensor_drivers.sensor_interface import SensorInterface
 
 
@@ -75,6 +75,13 @@ class SensorShell(cmd.Cmd):
         except Exception as e:
             print(f"Error controlling relay: {e}")
 
+    def do_hub(self, arg):
+        """Show how often the sensors of this process were read and shared, an EnviroSense in another process has its own hub"""
+        hub = SensorHub.shared()
+        print(hub)
+        for key in hub.keys():
+            print(f"  - {key[0].value} {key[1]}: {hub.latency(key)}")
+
     def do_list(self, arg):
         """List all devices"""
         sensors = self._manager.list_sensors()
@@ -98,8 +105,9 @@ class SensorShell(cmd.Cmd):
 
 if __name__ == "__main__":
 
-    dht22 = SensorFactory.create_driver(SensorDriver.MOCK, 22)
-    bme280 = SensorFactory.create_driver(SensorDriver.MOCK, 0x76)
+    # through the hub of this process, it doesn't share readings with an EnviroSense that runs as another process
+    dht22 = SensorHub.shared().sensor(SensorDriver.MOCK, 22)
+    bme280 = SensorHub.shared().sensor(SensorDriver.MOCK, 0x76)
 
     relay_heater = RelayFactory.create_relay(RelayDriver.MOCK, 17)
     relay_steamer = RelayFactory.create_relay(RelayDriver.MOCK, 27)
@@ -1,10 +1,18 @@
 import yaml
+from lib.envirocontrol_app.async_enviro_control import AsyncEnviroControl
 from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.envirocontrol_app.multi_room_enviro_control import MultiRoomEnviroControl
 
 if __name__ == "__main__":
     config = None
     with open("config.yaml", "r") as file:
         config = yaml.safe_load(file)
 
-    enviro_control = EnviroControl(config)
+    runtime = config["enviro_sense"].get("runtime") or "threaded"
+    if config["enviro_sense"].get("control_rooms"):
+        enviro_control = MultiRoomEnviroControl(config)
+    elif runtime.lower() == "asyncio":
+        enviro_control = AsyncEnviroControl(config)
+    else:
+        enviro_control = EnviroControl(config)
     enviro_control.run()
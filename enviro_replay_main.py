@@ -0,0 +1,33 @@
+import argparse
+
+import yaml
+from lib.envirocontrol_app.replay_enviro_control import ReplayEnviroControl
+from lib.history.sensor_history_store import SensorHistoryStore
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replays recorded sensor data through EnviroControl, faster than real time")
+    parser.add_argument("recording", nargs="?", help="file with a json SensorDataPayload per line")
+    parser.add_argument("--history", help="replay the raw readings of this history directory instead")
+    parser.add_argument("--decisions", help="write the heater/steamer decisions to this file (json lines)")
+    parser.add_argument("--config", default="config.yaml")
+    arguments = parser.parse_args()
+
+    config = None
+    with open(arguments.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    enviro_control = ReplayEnviroControl(config)
+    if arguments.history:
+        history_store = SensorHistoryStore(arguments.history,
+                                           capacity=config["enviro_sense"].get("history_capacity") or 1_000_000,
+                                           tiers=config["enviro_sense"].get("history_tiers") or [60, 3600])
+        report = enviro_control.replay_payloads(ReplayEnviroControl.payloads_from_history(history_store))
+    elif arguments.recording:
+        report = enviro_control.replay(ReplayEnviroControl.load_recording(arguments.recording))
+    else:
+        parser.error("give a recording or --history")
+
+    print(report)
+    print(f"heater switched {enviro_control.heating_relay.switches} times, steamer {enviro_control.steam_relay.switches} times")
+    if arguments.decisions:
+        enviro_control.write_decisions(arguments.decisions)
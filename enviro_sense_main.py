@@ -1,4 +1,5 @@
 import yaml
+from lib.envirosense_app.async_enviro_sense import AsyncEnviroSense
 from lib.envirosense_app.enviro_sense import EnviroSense
 
 
@@ -7,5 +8,9 @@ if __name__ == "__main__":
     with open("config.yaml", "r") as file:
         config = yaml.safe_load(file)
 
-    enviro_sense = EnviroSense(config)
+    runtime = config["enviro_sense"].get("runtime") or "threaded"
+    if runtime.lower() == "asyncio":
+        enviro_sense = AsyncEnviroSense(config)
+    else:
+        enviro_sense = EnviroSense(config)
     enviro_sense.run()
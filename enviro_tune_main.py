@@ -0,0 +1,59 @@
+import argparse
+import math
+
+import yaml
+from lib.history.sensor_history_store import SensorHistoryStore
+from lib.tuning.gain_sweep import GainSweep, TuningScenario
+
+
+def _values(text: str):
+    return [float(value) for value in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Searches the heater gains offline, on a plant model or on the recorded history")
+    parser.add_argument("--history", help="fit the plant on the raw readings of this history directory and replay its external temperature")
+    parser.add_argument("--start", type=float, default=18.0, help="start temperature without history")
+    parser.add_argument("--setpoint", type=float, default=23.0, help="external temperature without history")
+    parser.add_argument("--steps", type=int, default=1200, help="steps without history")
+    parser.add_argument("--kp", type=_values, default=[0.1, 0.2, 0.3, 0.5, 0.75, 1.0])
+    parser.add_argument("--kd", type=_values, default=[0.0, 0.1, 0.2, 0.5])
+    parser.add_argument("--threshold", type=_values, default=[0.1, 0.25, 0.5, 1.0])
+    parser.add_argument("--random", type=int, default=0, help="evaluate this many random gain sets instead of the grid")
+    parser.add_argument("--refine", type=int, default=0, help="evaluate this many gain sets around the best one afterwards")
+    parser.add_argument("--workers", type=int, default=None, help="processes, one per core by default")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--config", default="config.yaml")
+    arguments = parser.parse_args()
+
+    if arguments.history:
+        config = None
+        with open(arguments.config, "r") as file:
+            config = yaml.safe_load(file)
+        history_store = SensorHistoryStore(arguments.history,
+                                           capacity=config["enviro_sense"].get("history_capacity") or 1_000_000,
+                                           tiers=config["enviro_sense"].get("history_tiers") or [60, 3600])
+        scenario = TuningScenario.from_history(history_store.query(0, math.inf))
+        print(f"fitted {scenario.plant} on {len(scenario.setpoints)} readings")
+    else:
+        scenario = TuningScenario(setpoints=[arguments.setpoint] * arguments.steps,
+                                  outside=[arguments.setpoint] * arguments.steps,
+                                  start_value=arguments.start)
+
+    sweep = GainSweep(scenario, workers=arguments.workers)
+    if arguments.random:
+        gain_sets = GainSweep.random(arguments.random, (min(arguments.kp), max(arguments.kp)),
+                                     (min(arguments.kd), max(arguments.kd)),
+                                     (min(arguments.threshold), max(arguments.threshold)))
+    else:
+        gain_sets = GainSweep.grid(arguments.kp, arguments.kd, arguments.threshold)
+    results = sweep.run(gain_sets)
+    if arguments.refine:
+        refined = GainSweep.refine(results[0].gains, arguments.refine, kp_range=(min(arguments.kp), max(arguments.kp)),
+                                   kd_range=(min(arguments.kd), max(arguments.kd)),
+                                   threshold_range=(min(arguments.threshold), max(arguments.threshold)))
+        results = sorted(results + sweep.run(refined), key=lambda result: result.score)
+
+    print(f"evaluated {len(results)} gain sets, best first:")
+    for result in results[:arguments.top]:
+        print(f"  {result}")
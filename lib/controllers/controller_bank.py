@@ -0,0 +1,107 @@
+from typing import List, Optional, Union
+
+import numpy as np
+
+from lib.controllers.enviroment_controller import EnvironmentController
+
+Index = Union[None, int, slice, np.ndarray, List[int]]
+
+
+class ControllerBank:
+    """
+    Many EnvironmentControllers at once: the gains, thresholds and the state (integral and previous error)
+    of every controller are kept in NumPy arrays and `calculate_device_on_off` decides for all of them in
+    one vectorized step.
+
+    The calculation does the same float64 operations in the same order as EnvironmentController, so
+    controller `i` of the bank gives exactly the same decisions as a scalar controller with the same gains
+    that gets the same values.
+    """
+
+    def __init__(self, kp, kd, threshold, size: Optional[int] = None, ki=0.05) -> None:
+        if size is None:
+            size = np.broadcast(np.asarray(kp), np.asarray(kd), np.asarray(threshold), np.asarray(ki)).size
+        self._kp = np.broadcast_to(np.asarray(kp, dtype=np.float64), (size,)).copy()
+        self._kd = np.broadcast_to(np.asarray(kd, dtype=np.float64), (size,)).copy()
+        self._ki = np.broadcast_to(np.asarray(ki, dtype=np.float64), (size,)).copy()
+        self._threshold = np.broadcast_to(np.asarray(threshold, dtype=np.float64), (size,)).copy()
+        self._use_pid = np.ones(size, dtype=bool)
+        self._integral = np.zeros(size)
+        self._previous_error = np.zeros(size)
+
+        # scratch buffers, so a step doesn't allocate
+        self._error = np.empty(size)
+        self._output = np.empty(size)
+        self._term = np.empty(size)
+        self._pid_on = np.empty(size, dtype=bool)
+
+    @staticmethod
+    def from_controllers(controllers: List[EnvironmentController]) -> "ControllerBank":
+        """A bank with the gains, the pid setting and the current state of the given controllers."""
+        bank = ControllerBank([controller._kp for controller in controllers],
+                              [controller._kd for controller in controllers],
+                              [controller._threshold for controller in controllers],
+                              ki=[controller._ki for controller in controllers])
+        bank._use_pid[:] = [controller._use_pid for controller in controllers]
+        bank._integral[:] = [controller._integral for controller in controllers]
+        bank._previous_error[:] = [controller._previous_error for controller in controllers]
+        return bank
+
+    @property
+    def size(self) -> int:
+        return self._kp.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def integral(self) -> np.ndarray:
+        return self._integral
+
+    @property
+    def previous_error(self) -> np.ndarray:
+        return self._previous_error
+
+    @property
+    def use_pid(self) -> np.ndarray:
+        return self._use_pid
+
+    def enable_pid(self, index: Index = None) -> None:
+        self._use_pid[self._select(index)] = True
+
+    def disable_pid(self, index: Index = None) -> None:
+        self._use_pid[self._select(index)] = False
+
+    def set_gains(self, index: Index, kp, kd, threshold) -> None:
+        """Like replacing the controllers with new ones: the gains change and the state starts over."""
+        selection = self._select(index)
+        self._kp[selection] = kp
+        self._kd[selection] = kd
+        self._threshold[selection] = threshold
+        self._integral[selection] = 0.0
+        self._previous_error[selection] = 0.0
+
+    @staticmethod
+    def _select(index: Index):
+        return slice(None) if index is None else index
+
+    def calculate_device_on_off(self, internal_env_values, external_env_values) -> np.ndarray:
+        internal = np.asarray(internal_env_values, dtype=np.float64)
+        external = np.asarray(external_env_values, dtype=np.float64)
+        error, output, term, pid_on = self._error, self._output, self._term, self._pid_on
+
+        np.subtract(external, internal, out=error)
+        # only the controllers with the pid enabled keep state, like in EnvironmentController
+        np.add(self._integral, error, out=self._integral, where=self._use_pid)
+
+        np.multiply(self._kp, error, out=output)  # p
+        np.subtract(error, self._previous_error, out=term)
+        np.multiply(self._kd, term, out=term)  # d
+        np.add(output, term, out=output)
+        np.multiply(self._ki, self._integral, out=term)  # i
+        np.add(output, term, out=output)
+
+        np.copyto(self._previous_error, error, where=self._use_pid)
+
+        np.greater(output, self._threshold, out=pid_on)
+        return np.where(self._use_pid, pid_on, internal <= external)
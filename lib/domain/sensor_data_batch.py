@@ -0,0 +1,76 @@
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import List, Union
+
+from lib.domain.sensor_data_payload import SensorDataPayload
+
+BINARY_BATCH_MAGIC = 0xB6  # like the payload magic, never the first byte of utf-8 text
+BINARY_BATCH_VERSION = 1
+
+# magic, version, number of payloads, followed by the binary payloads
+_BINARY_BATCH_HEADER = struct.Struct("<BBH")
+
+
+@dataclass
+class SensorDataBatch:
+    payloads: List[SensorDataPayload] = field(default_factory=list)
+
+    @property
+    def latest(self) -> SensorDataPayload:
+        return self.payloads[-1]
+
+    def to_json(self):
+        return json.dumps({"batch": [payload.to_dict() for payload in self.payloads]})
+
+    def to_bytes(self) -> bytes:
+        header = _BINARY_BATCH_HEADER.pack(BINARY_BATCH_MAGIC, BINARY_BATCH_VERSION, len(self.payloads))
+        return header + b"".join(payload.to_bytes() for payload in self.payloads)
+
+    def encode(self, payload_format: str = "json") -> Union[str, bytes]:
+        if payload_format.lower() == "json":
+            return self.to_json()
+        if payload_format.lower() == "binary":
+            return self.to_bytes()
+        raise ValueError(f"Unsupported payload format: {payload_format}")
+
+    @staticmethod
+    def from_json(json_str: str) -> 'SensorDataBatch':
+        data = json.loads(json_str)
+        return SensorDataBatch([SensorDataPayload.from_dict(payload) for payload in data["batch"]])
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'SensorDataBatch':
+        if len(data) < _BINARY_BATCH_HEADER.size or data[0] != BINARY_BATCH_MAGIC:
+            raise ValueError("Not a binary sensor data batch")
+        magic, version, count = _BINARY_BATCH_HEADER.unpack_from(data)
+        if version != BINARY_BATCH_VERSION:
+            raise ValueError(f"Unsupported binary sensor data batch version: {version}")
+
+        # a payload with a stale or missing reading is a byte longer, the size follows from its version
+        payloads = []
+        offset = _BINARY_BATCH_HEADER.size
+        for _ in range(count):
+            size = SensorDataPayload.binary_size(data[offset + 1])
+            payloads.append(SensorDataPayload.from_bytes(data[offset:offset + size]))
+            offset += size
+        return SensorDataBatch(payloads)
+
+    @staticmethod
+    def is_batch(payload: Union[str, bytes]) -> bool:
+        """Whether a json or binary message is a batch, to tell them apart in a recording."""
+        if isinstance(payload, (bytes, bytearray)):
+            if len(payload) > 0 and payload[0] == BINARY_BATCH_MAGIC:
+                return True
+            payload = payload.decode()
+        # to_json() always starts with the batch key
+        return payload.lstrip().startswith('{"batch"')
+
+    @staticmethod
+    def from_wire(payload: Union[str, bytes]) -> 'SensorDataBatch':
+        """Decodes a json or binary batch, the format is detected from the first byte."""
+        if isinstance(payload, (bytes, bytearray)):
+            if len(payload) > 0 and payload[0] == BINARY_BATCH_MAGIC:
+                return SensorDataBatch.from_bytes(payload)
+            payload = payload.decode()
+        return SensorDataBatch.from_json(payload)
@@ -1,8 +1,24 @@
 import json
-from dataclasses import dataclass, field, asdict
+import struct
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Union
 from uuid import UUID
 from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_status import SensorStatus
+
+
+BINARY_MAGIC = 0xB5  # never the first byte of utf-8 text, so a binary payload can't be mistaken for json
+BINARY_VERSION = 1
+BINARY_VERSION_WITH_STATUS = 2
+
+# magic, version, uuid, timestamp in microseconds since the epoch,
+# internal temperature/humidity/pressure, external temperature/humidity/pressure
+_BINARY_LAYOUT_V1 = struct.Struct("<BB16sq6f")
+# version 1 followed by the status of the internal (low nibble) and the external (high nibble) sensor,
+# only used when a reading is stale or missing so the common payload stays the same
+_BINARY_LAYOUT_V2 = struct.Struct("<BB16sq6fB")
+_STATUS_CODES = [SensorStatus.OK, SensorStatus.STALE, SensorStatus.MISSING]
 
 
 @dataclass
@@ -11,6 +27,120 @@ class SensorDataPayload:
     internal_sensor_data: SensorData
     external_sensor_data: SensorData
     timestamp: datetime = field(default_factory=datetime.now)
+    internal_sensor_status: SensorStatus = field(default=SensorStatus.OK)
+    external_sensor_status: SensorStatus = field(default=SensorStatus.OK)
+
+    @property
+    def complete(self) -> bool:
+        return self.internal_sensor_status == SensorStatus.OK and self.external_sensor_status == SensorStatus.OK
+
+    def to_dict(self) -> dict:
+        data = {
+            "id": str(self.id),
+            "internal_sensor_data": SensorDataPayload._sensor_data_to_dict(self.internal_sensor_data),
+            "external_sensor_data": SensorDataPayload._sensor_data_to_dict(self.external_sensor_data),
+            "timestamp": str(self.timestamp)
+        }
+        # the status is only added when a reading is stale or missing, so older readers keep working
+        if self.internal_sensor_status != SensorStatus.OK:
+            data["internal_sensor_status"] = self.internal_sensor_status.value
+        if self.external_sensor_status != SensorStatus.OK:
+            data["external_sensor_status"] = self.external_sensor_status.value
+        return data
 
     def to_json(self):
-        return json.dumps(asdict(self), default=str)
+        return json.dumps(self.to_dict())
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary encoding (50 bytes), the readings are stored as 32-bit floats.
+        A payload with a stale or missing reading has one more byte with the status of both sensors.
+        """
+        values = (self.id.bytes,
+                  round(self.timestamp.timestamp() * 1_000_000),
+                  self.internal_sensor_data.temperature,
+                  self.internal_sensor_data.humidity,
+                  self.internal_sensor_data.pressure,
+                  self.external_sensor_data.temperature,
+                  self.external_sensor_data.humidity,
+                  self.external_sensor_data.pressure)
+        if self.complete:
+            return _BINARY_LAYOUT_V1.pack(BINARY_MAGIC, BINARY_VERSION, *values)
+        status = _STATUS_CODES.index(self.internal_sensor_status) | _STATUS_CODES.index(self.external_sensor_status) << 4
+        return _BINARY_LAYOUT_V2.pack(BINARY_MAGIC, BINARY_VERSION_WITH_STATUS, *values, status)
+
+    @staticmethod
+    def binary_size(version: int) -> int:
+        if version == BINARY_VERSION:
+            return _BINARY_LAYOUT_V1.size
+        if version == BINARY_VERSION_WITH_STATUS:
+            return _BINARY_LAYOUT_V2.size
+        raise ValueError(f"Unsupported binary sensor data payload version: {version}")
+
+    def encode(self, payload_format: str = "json") -> Union[str, bytes]:
+        if payload_format.lower() == "json":
+            return self.to_json()
+        if payload_format.lower() == "binary":
+            return self.to_bytes()
+        raise ValueError(f"Unsupported payload format: {payload_format}")
+
+    @staticmethod
+    def _sensor_data_to_dict(sensor_data: SensorData) -> dict:
+        return {
+            "temperature": sensor_data.temperature,
+            "humidity": sensor_data.humidity,
+            "pressure": sensor_data.pressure
+        }
+
+    @staticmethod
+    def from_json(json_str: str) -> 'SensorDataPayload':
+        return SensorDataPayload.from_dict(json.loads(json_str))
+
+    @staticmethod
+    def from_dict(data: dict) -> 'SensorDataPayload':
+        return SensorDataPayload(
+            id=UUID(data["id"]) if data.get("id") else None,
+            internal_sensor_data=SensorData.to_sensor_data(data["internal_sensor_data"]),
+            external_sensor_data=SensorData.to_sensor_data(data["external_sensor_data"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]) if data.get("timestamp") else datetime.now(),
+            internal_sensor_status=SensorStatus(data.get("internal_sensor_status") or SensorStatus.OK.value),
+            external_sensor_status=SensorStatus(data.get("external_sensor_status") or SensorStatus.OK.value)
+        )
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'SensorDataPayload':
+        if len(data) < 2 or data[0] != BINARY_MAGIC:
+            raise ValueError("Not a binary sensor data payload")
+        if data[1] == BINARY_VERSION:
+            (_, _, id_bytes, timestamp,
+             internal_temperature, internal_humidity, internal_pressure,
+             external_temperature, external_humidity, external_pressure) = _BINARY_LAYOUT_V1.unpack(data)
+            status = 0
+        elif data[1] == BINARY_VERSION_WITH_STATUS:
+            (_, _, id_bytes, timestamp,
+             internal_temperature, internal_humidity, internal_pressure,
+             external_temperature, external_humidity, external_pressure, status) = _BINARY_LAYOUT_V2.unpack(data)
+        else:
+            raise ValueError(f"Unsupported binary sensor data payload version: {data[1]}")
+
+        return SensorDataPayload(
+            id=UUID(bytes=id_bytes),
+            internal_sensor_data=SensorData.to_sensor_data({"temperature": internal_temperature,
+                                                            "humidity": internal_humidity,
+                                                            "pressure": internal_pressure}),
+            external_sensor_data=SensorData.to_sensor_data({"temperature": external_temperature,
+                                                            "humidity": external_humidity,
+                                                            "pressure": external_pressure}),
+            timestamp=datetime.fromtimestamp(timestamp / 1_000_000),
+            internal_sensor_status=_STATUS_CODES[status & 0x0F],
+            external_sensor_status=_STATUS_CODES[status >> 4]
+        )
+
+    @staticmethod
+    def from_wire(payload: Union[str, bytes]) -> 'SensorDataPayload':
+        """Decodes a json or binary payload, the format is detected from the first byte."""
+        if isinstance(payload, (bytes, bytearray)):
+            if len(payload) > 0 and payload[0] == BINARY_MAGIC:
+                return SensorDataPayload.from_bytes(payload)
+            payload = payload.decode()
+        return SensorDataPayload.from_json(payload)
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SensorStatus(Enum):
+    OK = "OK"
+    STALE = "STALE"  # the sensor didn't answer in time, the reading is the last good one
+    MISSING = "MISSING"  # the sensor didn't answer and there is no recent good reading, the values are placeholders
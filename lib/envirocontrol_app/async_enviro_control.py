@@ -0,0 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.gpio.async_relay_actuator import AsyncRelayActuator
+from lib.gpio.relay_factory import RelayFactory
+from lib.gpio.relay_interface import RelayInterface
+from lib.mqtt.async_mqtt_manager import AsyncMQTTManager
+from lib.mqtt.mqtt_topic import MqttTopic
+from lib.util.message_dispatcher import AsyncMessageDispatcher, MessageDispatcher
+
+
+class AsyncEnviroControl(EnviroControl):
+    """
+    EnviroControl on a single asyncio event loop: the MQTT client, the message handling and the relay
+    tasks all run on the loop, only the blocking relay drivers are offloaded to a small executor.
+    Selected with `runtime: "asyncio"` in the config.yaml.
+    """
+
+    def __init__(self, config: dict) -> None:
+        executor_workers = config["enviro_sense"].get("async_executor_workers") or 2
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="enviro-control")
+        super().__init__(config)
+
+    def _create_message_queue(self):
+        return asyncio.Queue()
+
+    def _create_dispatcher(self) -> MessageDispatcher:
+        return AsyncMessageDispatcher(self._sensor_data_queue, self._logger, self._housekeeping_interval)
+
+    def _create_actuator(self, gpio_pin: int, name: str) -> RelayInterface:
+        return AsyncRelayActuator(RelayFactory.create_relay(self._relay_driver, gpio_pin), name, self._logger, self._executor,
+                                  self._create_guard())
+
+    def _initialize_mqtt(self) -> None:
+        AsyncMQTTManager.check_transport(self._config["enviro_sense"].get("mqtt_transport"))
+        broker_address = self._config["enviro_sense"]["broker_address"]
+        broker_port = self._config["enviro_sense"]["broker_port"]
+
+        self._mqtt_topic = MqttTopic(self._digital_id)
+        self._mqtt_manager = AsyncMQTTManager(broker_address=broker_address,
+                                              port=broker_port,
+                                              logger=self._logger,
+                                              message_list=self._sensor_data_queue)
+        # the subscription is done as soon as the client is connected in run()
+        self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_topic)
+        self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_batch_topic)
+
+    async def _shutdown_async(self) -> None:
+        await self._heating_element.shutdown()
+        await self._steam_element.shutdown()
+        if self._history_store is not None:
+            self._history_store.flush()
+        self._mqtt_manager.disconnect()
+        self._mqtt_manager = None
+        self._executor.shutdown(wait=False)
+
+    async def _run(self) -> None:
+        self._mqtt_manager.connect()
+        self._heating_element.start()
+        self._steam_element.start()
+
+        self._heating_element.open_relay()
+        self._steam_element.open_relay()
+
+        try:
+            await self._dispatcher.run_async()
+        finally:
+            await self._shutdown_async()
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            self._logger.info("Shutting down gracefully...")
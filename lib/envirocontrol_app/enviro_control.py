@@ -1,28 +1,36 @@
-import json
-import time
-
+from collections import deque
+from logging import Logger
 from queue import Queue
 from typing import Optional
 
 from lib.controllers.enviroment_controller import EnvironmentController
 from lib.domain.room_control_data import RoomControlData
 from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.gpio.relay_actuator import RelayActuator
+from lib.history.sensor_history_store import SensorHistoryStore
 from lib.gpio.relay_driver import RelayDriver
 from lib.gpio.relay_factory import RelayFactory
+from lib.gpio.relay_interface import RelayInterface
+from lib.gpio.short_cycle_guard import ShortCycleGuard
 from lib.mqtt.mqtt_manager import MQTTManager
 from lib.mqtt.mqtt_topic import MqttTopic
-from lib.util.csv_lookup import CSVLookup
+from lib.mqtt.mqtt_transport_factory import MqttTransportFactory
 from lib.util.digital_id import DigitalId
+from lib.util.humidity_lookup_factory import HumidityLookupFactory
 from lib.util.logger_factory import LoggerFactory
+from lib.util.message_dispatcher import MessageDispatcher, DispatchStats
 
 
 class EnviroControl:
 
     def __init__(self, config: dict) -> None:
-        self._logger = LoggerFactory.create("EnviroControl")
+        self._logger = self._create_logger()
         self._config = config
 
-        self._csv_env_table = CSVLookup("doc/waterdampspanning.csv")
+        self._csv_env_table = HumidityLookupFactory.create(self._config["enviro_sense"])
 
         self._gpio_pin_1 = self._config["enviro_sense"]["control_relay_gpio_1"] or 17
         self._gpio_pin_2 = self._config["enviro_sense"]["control_relay_gpio_2"] or 27
@@ -39,11 +47,17 @@ class EnviroControl:
         self._digital_id = self._config["enviro_sense"]["sensor_digital_id"] or DigitalId.create_digital_id()
         self._publish_sensor_data_timeout = self._config["enviro_sense"]["sensor_publish_data_timeout"] or 3
 
-        self._sensor_data_queue = Queue()  # we are going to use this as a fifo data structure (queue)
+        self._sensor_data_queue = self._create_message_queue()
+        self._sensor_data_archive = deque(maxlen=self._config["enviro_sense"].get("control_archive_size") or 1000)
+        self._history_store = self._create_history_store()
+        self._heater_on: Optional[bool] = None  # last decisions, None until the first sensor data
+        self._steamer_on: Optional[bool] = None
+        self._housekeeping_interval = self._config["enviro_sense"].get("control_housekeeping_interval") or 60
+        self._dispatcher = self._create_dispatcher()
 
         self._relay_driver = self._set_relay_driver(self._config["enviro_sense"]["relay_driver"])
-        self._heating_element = RelayFactory.create_relay(self._relay_driver, self._gpio_pin_1)
-        self._steam_element = RelayFactory.create_relay(self._relay_driver, self._gpio_pin_2)
+        self._heating_element = self._create_actuator(self._gpio_pin_1, "heater")
+        self._steam_element = self._create_actuator(self._gpio_pin_2, "steamer")
 
         self._mqtt_manager: Optional[MQTTManager] = None
         self._initialize_mqtt()
@@ -52,10 +66,36 @@ class EnviroControl:
         self._steamer_control = EnvironmentController(self._kp_steamer, self._kd_steamer, self._threshold_steamer)
 
         self._set_pid()
+        self._register_handlers()
 
-        self._running = True
         self._logger.info("envirocontrol has been init")
 
+    def _create_logger(self) -> Logger:
+        return LoggerFactory.create("EnviroControl")
+
+    def _create_message_queue(self):
+        return Queue()  # we are going to use this as a fifo data structure (queue)
+
+    def _create_history_store(self) -> Optional[SensorHistoryStore]:
+        history_path = self._config["enviro_sense"].get("history_path")
+        if not history_path:
+            return None
+        return SensorHistoryStore(history_path,
+                                  capacity=self._config["enviro_sense"].get("history_capacity") or 1_000_000,
+                                  tiers=self._config["enviro_sense"].get("history_tiers") or [60, 3600])
+
+    def _create_dispatcher(self) -> MessageDispatcher:
+        return MessageDispatcher(self._sensor_data_queue, self._logger, self._housekeeping_interval)
+
+    def _create_actuator(self, gpio_pin: int, name: str) -> RelayInterface:
+        # relay commands are executed by a worker per relay, so the settle time of a relay doesn't block the loop
+        return RelayActuator(RelayFactory.create_relay(self._relay_driver, gpio_pin), name, self._logger, self._create_guard())
+
+    def _create_guard(self) -> ShortCycleGuard:
+        # redundant commands are always skipped, the minimum on/off times are off by default
+        return ShortCycleGuard(min_on_time=self._config["enviro_sense"].get("control_relay_min_on_time") or 0.0,
+                               min_off_time=self._config["enviro_sense"].get("control_relay_min_off_time") or 0.0)
+
     def _set_pid(self):
         if self._use_pid:
             self._heating_control.enable_pid()
@@ -64,10 +104,28 @@ class EnviroControl:
             self._heating_control.disable_pid()
             self._steamer_control.disable_pid()
 
+    def _register_handlers(self) -> None:
+        self._dispatcher.register_handler(self._mqtt_topic.sensor_data_topic, self._handle_sensor_data_message)
+        self._dispatcher.register_handler(self._mqtt_topic.sensor_data_batch_topic, self._handle_sensor_data_batch_message)
+        self._dispatcher.register_handler(self._mqtt_topic.set_heater_values, self._handle_heater_data)
+        self._dispatcher.register_handler(self._mqtt_topic.set_steamer_values, self._handle_steamer_data)
+        self._dispatcher.register_tick(self._log_dispatch_stats)
+
+    def _log_dispatch_stats(self) -> None:
+        self._logger.info(f"{self._dispatcher.stats}")
+        self._logger.info(f"Heater actuation: {self._heating_element.latency}, superseded: {self._heating_element.superseded}, "
+                          f"{self._heating_element.guard}")
+        self._logger.info(f"Steamer actuation: {self._steam_element.latency}, superseded: {self._steam_element.superseded}, "
+                          f"{self._steam_element.guard}")
+
     @property
     def digital_id(self) -> str:
         return self._digital_id
 
+    @property
+    def dispatch_stats(self) -> DispatchStats:
+        return self._dispatcher.stats
+
     def _initialize_mqtt(self) -> None:
         broker_address = self._config["enviro_sense"]["broker_address"]
         broker_port = self._config["enviro_sense"]["broker_port"]
@@ -76,45 +134,91 @@ class EnviroControl:
         self._mqtt_manager = MQTTManager(broker_address=broker_address,
                                          port=broker_port,
                                          logger=self._logger,
-                                         message_list=self._sensor_data_queue)
+                                         message_list=self._sensor_data_queue,
+                                         transport=MqttTransportFactory.create_transport_from_config(self._config["enviro_sense"].get("mqtt_transport")))
         self._mqtt_manager.connect()
-        time.sleep(2)
+        self._mqtt_manager.wait_until_connected(timeout=2)
         self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_topic)
+        self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_batch_topic)
 
     def _set_relay_driver(self, relay_driver_as_str: str) -> RelayDriver:
         if relay_driver_as_str.lower() == "mock":
             return RelayDriver.MOCK
         elif relay_driver_as_str.lower() == "rpi":
             return RelayDriver.RPI
+        elif relay_driver_as_str.lower() == "simulated":
+            return RelayDriver.SIMULATED
         else:
             raise ValueError(f"Unsupported sensor driver: {relay_driver_as_str}")
 
     def _shutdown(self) -> None:
+        if self._history_store is not None:
+            self._history_store.flush()
+        self._heating_element.shutdown()
+        self._steam_element.shutdown()
         self._mqtt_manager.disconnect()
         self._mqtt_manager = None
 
+    def stop(self) -> None:
+        self._dispatcher.stop()
+
     def _handle_sensor_data_message(self, data: dict) -> None:
         if data is None:
             return
 
         self._logger.info(f"received this sensor data {data}")
 
-        data_as_dict = json.loads(data["payload"])
-        internal_sensor_data = SensorData.to_sensor_data(data_as_dict["internal_sensor_data"])
-        external_sensor_data = SensorData.to_sensor_data(data_as_dict["external_sensor_data"])
+        self._handle_sensor_data_payload(SensorDataPayload.from_wire(data["payload"]))
+
+    def _handle_sensor_data_batch_message(self, data: dict) -> None:
+        if data is None:
+            return
+
+        # only the latest sample is used to control the relays, the older ones are archived
+        sensor_data_batch = SensorDataBatch.from_wire(data["payload"])
+        self._logger.info(f"received a batch of {len(sensor_data_batch.payloads)} samples")
+        if not sensor_data_batch.payloads:
+            return
+
+        for sensor_data_payload in sensor_data_batch.payloads[:-1]:
+            self._archive_sensor_data(sensor_data_payload)
+        self._handle_sensor_data_payload(sensor_data_batch.latest)
+
+    def _archive_sensor_data(self, sensor_data_payload: SensorDataPayload) -> None:
+        if self._history_store is not None:
+            # the relays were in the last decided state while these samples were taken
+            self._history_store.append(sensor_data_payload, self._heater_on, self._steamer_on)
+        else:
+            self._sensor_data_archive.append(sensor_data_payload)
+
+    def _handle_sensor_data_payload(self, sensor_data_payload: SensorDataPayload) -> None:
+        internal_sensor_data = sensor_data_payload.internal_sensor_data
+        external_sensor_data = sensor_data_payload.external_sensor_data
         self._logger.info(f"Handling the sensor data: ")
         self._logger.info(f"Internal sensor data:\n{internal_sensor_data} ")
         self._logger.info(f"External sensor data:\n{external_sensor_data} ")
+        if sensor_data_payload.internal_sensor_status == SensorStatus.MISSING:
+            # there is nothing to control on, the relays stay as they are
+            self._logger.warning(f"The internal sensor data is missing, the relays are not switched")
+            return
+
         self._logger.info(f"Controlling the steamer and heater relay: ")
-        self._handle_heater(external_sensor_data, internal_sensor_data)
-        self._handle_steamer(internal_sensor_data)
+        if sensor_data_payload.external_sensor_status == SensorStatus.MISSING:
+            self._logger.warning(f"The external sensor data is missing, the heater relay is not switched")
+        else:
+            self._heater_on = self._handle_heater(external_sensor_data, internal_sensor_data)
+        self._steamer_on = self._handle_steamer(internal_sensor_data, self._steamer_on)
+
+        if self._history_store is not None:
+            self._history_store.append(sensor_data_payload, self._heater_on, self._steamer_on)
 
-    def _handle_steamer(self, internal_sensor_data: SensorData) -> None:
+    def _handle_steamer(self, internal_sensor_data: SensorData, steamer_on: Optional[bool] = None) -> Optional[bool]:
         # stel u heersende temperatuur is 30° dan gaat ge in u tabel de waarde zoeken voor de temperatuur van 29° wat dat is het maximale vocht dat er mag zijn
         # is dat onder die waarde van 29° dan moet ge de stomer gaan aanzetten
-        target_humidity = self._csv_env_table.get_closest_value(internal_sensor_data.temperature)[1]
-        if target_humidity is None:
-            return
+        closest_value = self._csv_env_table.get_closest_value(internal_sensor_data.temperature)
+        if closest_value is None:
+            return steamer_on
+        target_humidity = closest_value[1]
 
         turn_steamer_on = self._steamer_control.calculate_device_on_off(internal_sensor_data.humidity, target_humidity)
         if turn_steamer_on:
@@ -123,8 +227,9 @@ class EnviroControl:
         else:
             self._logger.info(f"Opening the steamer relay")
             self._steam_element.open_relay()
+        return turn_steamer_on
 
-    def _handle_heater(self, external_sensor_data: SensorData, internal_sensor_data: SensorData) -> None:
+    def _handle_heater(self, external_sensor_data: SensorData, internal_sensor_data: SensorData) -> bool:
         # Is het buiten warmer dan binnen moet het verwarmingselement inschakelen tot de warmte binnen hoger
         turn_heater_on = self._heating_control.calculate_device_on_off(internal_sensor_data.temperature, external_sensor_data.temperature)
         if turn_heater_on:
@@ -133,6 +238,7 @@ class EnviroControl:
         else:
             self._logger.info(f"Opening the heater relay")
             self._heating_element.open_relay()
+        return turn_heater_on
 
     def _handle_heater_data(self, data: dict) -> None:
         room_control_data = RoomControlData.to_sensor_data(data["payload"])
@@ -161,19 +267,7 @@ class EnviroControl:
         self._steam_element.open_relay()
 
         try:
-            while self._running:
-                if not self._sensor_data_queue.empty():
-                    data = self._sensor_data_queue.get()
-
-                    if data["topic"] == self._mqtt_topic.sensor_data_topic:
-                        self._handle_sensor_data_message(data)
-
-                    if data["topic"] == self._mqtt_topic.set_heater_values:
-                        self._handle_heater_data(data)
-
-                    if data["topic"] == self._mqtt_topic.set_steamer_values:
-                        self._handle_steamer_data(data)
-
+            self._dispatcher.run()  # blocks on the queue, so we don't burn cpu while waiting for messages
         except KeyboardInterrupt:
             self._logger.info("Shutting down gracefully...")
         finally:
@@ -0,0 +1,304 @@
+import threading
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from logging import Logger
+from queue import Queue
+from typing import Dict, List, Optional
+
+from lib.controllers.enviroment_controller import EnvironmentController
+from lib.domain.room_control_data import RoomControlData
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.gpio.relay_actuator import RelayActuator
+from lib.gpio.relay_driver import RelayDriver
+from lib.gpio.relay_factory import RelayFactory
+from lib.gpio.relay_interface import RelayInterface
+from lib.gpio.short_cycle_guard import ShortCycleGuard
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.mqtt_topic import MqttTopic
+from lib.mqtt.mqtt_transport_factory import MqttTransportFactory
+from lib.util.humidity_lookup_factory import HumidityLookupFactory
+from lib.util.logger_factory import LoggerFactory
+from lib.util.message_dispatcher import MessageDispatcher, DispatchStats
+
+
+@dataclass
+class RoomState:
+    digital_id: str
+    mqtt_topic: MqttTopic
+    heating_control: EnvironmentController
+    steamer_control: EnvironmentController
+    heating_element: RelayInterface
+    steam_element: RelayInterface
+    csv_env_table: object  # one CSVLookup or SaturationVapourEngine shared by all the rooms
+    shard: int = field(default=0)
+    archive: deque = field(default_factory=lambda: deque(maxlen=1000))  # older samples of the batches
+
+
+class RoomShard:
+    """
+    A worker thread with its own queue and dispatcher. A room always belongs to the same shard, so
+    the messages of one room are handled in order while different rooms are handled in parallel.
+    """
+
+    def __init__(self, index: int, logger: Logger, tick_interval: float) -> None:
+        self._index = index
+        self._queue = Queue()
+        self._dispatcher = MessageDispatcher(self._queue, logger, tick_interval)
+        self._thread = threading.Thread(target=self._dispatcher.run, name=f"room-shard-{index}", daemon=True)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def dispatcher(self) -> MessageDispatcher:
+        return self._dispatcher
+
+    @property
+    def stats(self) -> DispatchStats:
+        return self._dispatcher.stats
+
+    def put(self, message: dict) -> None:
+        self._queue.put(message)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._dispatcher.stop()
+        self._thread.join()
+
+
+class RoomRouter:
+    """
+    Takes the place of the message queue of the MQTTManager and puts every message on the queue of the
+    shard that owns the room of the topic.
+    """
+
+    def __init__(self, shards: List[RoomShard]) -> None:
+        self._shards = shards
+        self._room_shards: Dict[str, RoomShard] = {}
+
+    def assign(self, digital_id: str, shard: RoomShard) -> None:
+        self._room_shards[digital_id] = shard
+
+    def shard_for(self, digital_id: str) -> RoomShard:
+        shard = self._room_shards.get(digital_id)
+        if shard is None:
+            # unknown rooms still go to a fixed shard, its dispatcher counts them as unhandled
+            shard = self._shards[zlib.crc32(digital_id.encode()) % len(self._shards)]
+        return shard
+
+    def put(self, message: dict) -> None:
+        self.shard_for(MqttTopic.digital_id_from_topic(message["topic"])).put(message)
+
+
+class MultiRoomEnviroControl:
+    """
+    Controls the heater and steamer of many rooms from one process and one MQTT connection.
+
+    The rooms are listed under `control_rooms` in the config.yaml, every room has the digital id of
+    its EnviroSense and the gpio pins of its relays. The gains default to the ones of the single room
+    config. The process subscribes to the wildcard topics and spreads the rooms over
+    `control_worker_threads` shards. Unlike EnviroControl it keeps no SensorHistoryStore, the older
+    samples of the batches are only kept in the `archive` of the room.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self._logger = LoggerFactory.create("MultiRoomEnviroControl")
+        self._config = config
+
+        self._csv_env_table = HumidityLookupFactory.create(self._config["enviro_sense"])
+        self._relay_driver = self._set_relay_driver(self._config["enviro_sense"]["relay_driver"])
+        self._use_pid = self._config["enviro_sense"]["enable_pid"]
+
+        worker_threads = self._config["enviro_sense"].get("control_worker_threads") or 4
+        housekeeping_interval = self._config["enviro_sense"].get("control_housekeeping_interval") or 60
+        self._shards = [RoomShard(index, self._logger, housekeeping_interval) for index in range(worker_threads)]
+        self._router = RoomRouter(self._shards)
+
+        self._rooms: Dict[str, RoomState] = {}
+        for index, room_config in enumerate(self._config["enviro_sense"].get("control_rooms") or []):
+            self.add_room(room_config, self._shards[index % len(self._shards)])
+
+        self._mqtt_topic = MqttTopic.wildcard()
+        self._mqtt_manager: Optional[MQTTManager] = None
+        self._stopped = threading.Event()
+        self._logger.info(f"multi room envirocontrol has been init with {len(self._rooms)} rooms")
+
+    @property
+    def rooms(self) -> Dict[str, RoomState]:
+        return self._rooms
+
+    @property
+    def router(self) -> RoomRouter:
+        return self._router
+
+    @property
+    def dispatch_stats(self) -> List[DispatchStats]:
+        return [shard.stats for shard in self._shards]
+
+    def _set_relay_driver(self, relay_driver_as_str: str) -> RelayDriver:
+        if relay_driver_as_str.lower() == "mock":
+            return RelayDriver.MOCK
+        elif relay_driver_as_str.lower() == "rpi":
+            return RelayDriver.RPI
+        elif relay_driver_as_str.lower() == "simulated":
+            return RelayDriver.SIMULATED
+        else:
+            raise ValueError(f"Unsupported sensor driver: {relay_driver_as_str}")
+
+    def _value(self, room_config: dict, key: str, default: float) -> float:
+        return room_config.get(key) or self._config["enviro_sense"].get(key) or default
+
+    def _create_guard(self, room_config: dict) -> ShortCycleGuard:
+        return ShortCycleGuard(min_on_time=self._value(room_config, "control_relay_min_on_time", 0.0),
+                               min_off_time=self._value(room_config, "control_relay_min_off_time", 0.0))
+
+    def add_room(self, room_config: dict, shard: RoomShard) -> RoomState:
+        digital_id = room_config["digital_id"]
+        heating_relay = RelayFactory.create_relay(self._relay_driver, room_config["relay_gpio_1"])
+        steam_relay = RelayFactory.create_relay(self._relay_driver, room_config["relay_gpio_2"])
+
+        room = RoomState(
+            digital_id=digital_id,
+            mqtt_topic=MqttTopic(digital_id),
+            heating_control=EnvironmentController(self._value(room_config, "kp_heater", 0.3),
+                                                  self._value(room_config, "kd_heater", 0.2),
+                                                  self._value(room_config, "threshold_heater", 0.5)),
+            steamer_control=EnvironmentController(self._value(room_config, "kp_steamer", 0.3),
+                                                  self._value(room_config, "kd_steamer", 0.2),
+                                                  self._value(room_config, "threshold_steamer", 0.5)),
+            heating_element=RelayActuator(heating_relay, f"{digital_id}-heater", self._logger, self._create_guard(room_config)),
+            steam_element=RelayActuator(steam_relay, f"{digital_id}-steamer", self._logger, self._create_guard(room_config)),
+            csv_env_table=self._csv_env_table,
+            shard=shard.index,
+            archive=deque(maxlen=self._value(room_config, "control_archive_size", 1000)))
+        self._set_pid(room)
+
+        shard.dispatcher.register_handler(room.mqtt_topic.sensor_data_topic,
+                                          lambda data: self._handle_sensor_data_message(room, data))
+        shard.dispatcher.register_handler(room.mqtt_topic.sensor_data_batch_topic,
+                                          lambda data: self._handle_sensor_data_batch_message(room, data))
+        shard.dispatcher.register_handler(room.mqtt_topic.set_heater_values,
+                                          lambda data: self._handle_heater_data(room, data))
+        shard.dispatcher.register_handler(room.mqtt_topic.set_steamer_values,
+                                          lambda data: self._handle_steamer_data(room, data))
+        self._router.assign(digital_id, shard)
+        self._rooms[digital_id] = room
+        return room
+
+    def _set_pid(self, room: RoomState) -> None:
+        for controller in (room.heating_control, room.steamer_control):
+            if self._use_pid:
+                controller.enable_pid()
+            else:
+                controller.disable_pid()
+
+    def _handle_sensor_data_message(self, room: RoomState, data: dict) -> None:
+        if data is None:
+            return
+
+        self._handle_sensor_data_payload(room, SensorDataPayload.from_wire(data["payload"]))
+
+    def _handle_sensor_data_batch_message(self, room: RoomState, data: dict) -> None:
+        if data is None:
+            return
+
+        sensor_data_batch = SensorDataBatch.from_wire(data["payload"])
+        if not sensor_data_batch.payloads:
+            return
+
+        room.archive.extend(sensor_data_batch.payloads[:-1])
+        self._handle_sensor_data_payload(room, sensor_data_batch.latest)
+
+    def _handle_sensor_data_payload(self, room: RoomState, sensor_data_payload: SensorDataPayload) -> None:
+        internal_sensor_data = sensor_data_payload.internal_sensor_data
+        external_sensor_data = sensor_data_payload.external_sensor_data
+        self._logger.debug(f"Room {room.digital_id}, internal: {internal_sensor_data}, external: {external_sensor_data}")
+        if sensor_data_payload.internal_sensor_status == SensorStatus.MISSING:
+            self._logger.warning(f"Room {room.digital_id}: the internal sensor data is missing, the relays are not switched")
+            return
+        if sensor_data_payload.external_sensor_status != SensorStatus.MISSING:
+            self._handle_heater(room, external_sensor_data, internal_sensor_data)
+        self._handle_steamer(room, internal_sensor_data)
+
+    def _handle_steamer(self, room: RoomState, internal_sensor_data: SensorData) -> None:
+        closest_value = room.csv_env_table.get_closest_value(internal_sensor_data.temperature)
+        if closest_value is None:
+            return
+
+        if room.steamer_control.calculate_device_on_off(internal_sensor_data.humidity, closest_value[1]):
+            room.steam_element.close_relay()
+        else:
+            room.steam_element.open_relay()
+
+    def _handle_heater(self, room: RoomState, external_sensor_data: SensorData, internal_sensor_data: SensorData) -> None:
+        if room.heating_control.calculate_device_on_off(internal_sensor_data.temperature, external_sensor_data.temperature):
+            room.heating_element.close_relay()
+        else:
+            room.heating_element.open_relay()
+
+    def _handle_heater_data(self, room: RoomState, data: dict) -> None:
+        room_control_data = RoomControlData.to_sensor_data(data["payload"])
+        if room_control_data is None:
+            return
+        room.heating_control = EnvironmentController(room_control_data.kp, room_control_data.kd, room_control_data.threshold)
+        self._set_pid(room)
+
+    def _handle_steamer_data(self, room: RoomState, data: dict) -> None:
+        room_control_data = RoomControlData.to_sensor_data(data["payload"])
+        if room_control_data is None:
+            return
+        room.steamer_control = EnvironmentController(room_control_data.kp, room_control_data.kd, room_control_data.threshold)
+        self._set_pid(room)
+
+    def _initialize_mqtt(self) -> None:
+        broker_address = self._config["enviro_sense"]["broker_address"]
+        broker_port = self._config["enviro_sense"]["broker_port"]
+
+        self._mqtt_manager = MQTTManager(broker_address=broker_address,
+                                         port=broker_port,
+                                         logger=self._logger,
+                                         message_list=self._router,
+                                         transport=MqttTransportFactory.create_transport_from_config(self._config["enviro_sense"].get("mqtt_transport")))
+        self._mqtt_manager.connect()
+        self._mqtt_manager.wait_until_connected(timeout=2)
+        self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_topic)
+        self._mqtt_manager.subscribe(self._mqtt_topic.sensor_data_batch_topic)
+        self._mqtt_manager.subscribe(self._mqtt_topic.set_heater_values)
+        self._mqtt_manager.subscribe(self._mqtt_topic.set_steamer_values)
+
+    def start(self) -> None:
+        for room in self._rooms.values():
+            room.heating_element.open_relay()
+            room.steam_element.open_relay()
+        for shard in self._shards:
+            shard.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _shutdown(self) -> None:
+        if self._mqtt_manager is not None:
+            self._mqtt_manager.disconnect()
+            self._mqtt_manager = None
+        for shard in self._shards:
+            shard.stop()
+        for room in self._rooms.values():
+            room.heating_element.shutdown()
+            room.steam_element.shutdown()
+
+    def run(self) -> None:
+        self.start()
+        try:
+            self._initialize_mqtt()
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            self._logger.info("Shutting down gracefully...")
+        finally:
+            self._shutdown()
@@ -0,0 +1,196 @@
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.gpio.relay_interface import RelayInterface
+from lib.history.sensor_history_store import STATUS_CODES, SensorHistoryStore
+from lib.mqtt.mqtt_topic import MqttTopic
+from lib.util.latency_stats import LatencyStats
+
+
+@dataclass
+class ReplayDecision:
+    timestamp: datetime
+    heater_on: Optional[bool]
+    steamer_on: Optional[bool]
+
+
+@dataclass
+class ReplayReport:
+    messages: int
+    elapsed: float
+    stages: Dict[str, LatencyStats]
+
+    @property
+    def decisions_per_second(self) -> float:
+        if self.elapsed == 0:
+            return 0.0
+        return self.messages / self.elapsed
+
+    def __str__(self):
+        lines = [f"Replayed {self.messages} messages in {self.elapsed:.3f}s: {self.decisions_per_second:.0f} decisions/sec"]
+        lines += [f"  {stage:<8} {stats}" for stage, stats in self.stages.items()]
+        return "\n".join(lines)
+
+
+class RecordingRelay(RelayInterface):
+    """Relay without hardware and without settle time, it only counts the switches."""
+
+    def __init__(self) -> None:
+        self.closed: Optional[bool] = None
+        self.switches = 0
+
+    def open_relay(self) -> None:
+        if self.closed is not False:
+            self.switches += 1
+        self.closed = False
+
+    def close_relay(self) -> None:
+        if self.closed is not True:
+            self.switches += 1
+        self.closed = True
+
+
+class ReplayEnviroControl(EnviroControl):
+    """
+    Runs a recorded stream of sensor data through the handlers of EnviroControl as fast as possible:
+    no broker, no relay settle times and no logging per message. Every heater/steamer decision is
+    recorded and the time spent in every stage is measured, so a change to the controllers or the
+    lookup can be regression tested and benchmarked on a laptop.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self._stages = {stage: LatencyStats() for stage in ("message", "decode", "heater", "steamer")}
+        self._decisions: List[ReplayDecision] = []
+        super().__init__(config)
+
+    @property
+    def decisions(self) -> List[ReplayDecision]:
+        return self._decisions
+
+    @property
+    def heating_relay(self) -> RecordingRelay:
+        return self._heating_element
+
+    @property
+    def steam_relay(self) -> RecordingRelay:
+        return self._steam_element
+
+    def _create_logger(self) -> logging.Logger:
+        # a child of the EnviroControl logger, so the level of the EnviroControl of the process isn't changed
+        logger = logging.getLogger("EnviroControl.replay")
+        logger.setLevel(logging.WARNING)
+        return logger
+
+    def _create_actuator(self, gpio_pin: int, name: str) -> RelayInterface:
+        return RecordingRelay()
+
+    def _create_history_store(self) -> Optional[SensorHistoryStore]:
+        return None
+
+    def _initialize_mqtt(self) -> None:
+        self._mqtt_topic = MqttTopic(self._digital_id)
+
+    def _shutdown(self) -> None:
+        pass
+
+    def _handle_sensor_data_payload(self, sensor_data_payload: SensorDataPayload) -> None:
+        super()._handle_sensor_data_payload(sensor_data_payload)
+        self._decisions.append(ReplayDecision(sensor_data_payload.timestamp, self._heater_on, self._steamer_on))
+
+    def _handle_heater(self, external_sensor_data: SensorData, internal_sensor_data: SensorData) -> bool:
+        start = time.perf_counter()
+        heater_on = super()._handle_heater(external_sensor_data, internal_sensor_data)
+        self._stages["heater"].record(time.perf_counter() - start)
+        return heater_on
+
+    def _handle_steamer(self, internal_sensor_data: SensorData, steamer_on: Optional[bool] = None) -> Optional[bool]:
+        start = time.perf_counter()
+        steamer_on = super()._handle_steamer(internal_sensor_data, steamer_on)
+        self._stages["steamer"].record(time.perf_counter() - start)
+        return steamer_on
+
+    def replay(self, payloads: Iterable) -> ReplayReport:
+        """
+        Replays json/binary payloads and batches as they were received from the broker. Like
+        EnviroControl only the latest sample of a batch is decided on, the older ones are archived.
+        """
+        messages = 0
+        start = time.perf_counter()
+        for payload in payloads:
+            message_start = time.perf_counter()
+            if SensorDataBatch.is_batch(payload):
+                sensor_data_batch = SensorDataBatch.from_wire(payload)
+                self._stages["decode"].record(time.perf_counter() - message_start)
+                if not sensor_data_batch.payloads:
+                    continue
+                for archived_payload in sensor_data_batch.payloads[:-1]:
+                    self._archive_sensor_data(archived_payload)
+                sensor_data_payload = sensor_data_batch.latest
+            else:
+                sensor_data_payload = SensorDataPayload.from_wire(payload)
+                self._stages["decode"].record(time.perf_counter() - message_start)
+            self._handle_sensor_data_payload(sensor_data_payload)
+            self._stages["message"].record(time.perf_counter() - message_start)
+            messages += 1
+        return ReplayReport(messages=messages, elapsed=time.perf_counter() - start, stages=self._stages)
+
+    def replay_payloads(self, sensor_data_payloads: Iterable[SensorDataPayload]) -> ReplayReport:
+        """Replays already decoded payloads, e.g. from the history, the decode stage is then skipped."""
+        messages = 0
+        start = time.perf_counter()
+        for sensor_data_payload in sensor_data_payloads:
+            message_start = time.perf_counter()
+            self._handle_sensor_data_payload(sensor_data_payload)
+            self._stages["message"].record(time.perf_counter() - message_start)
+            messages += 1
+        return ReplayReport(messages=messages, elapsed=time.perf_counter() - start, stages=self._stages)
+
+    @staticmethod
+    def load_recording(file_path: str) -> List[str]:
+        """A recording has a json SensorDataPayload or SensorDataBatch per line, as EnviroSense publishes them."""
+        with open(file_path, mode="r", encoding="utf-8") as file:
+            return [line.strip() for line in file if line.strip()]
+
+    @staticmethod
+    def payloads_from_history(history_store: SensorHistoryStore, start_time: float = 0,
+                              end_time: float = float("inf")) -> Iterable[SensorDataPayload]:
+        for segment in history_store.raw.views(start_time, end_time):
+            for record in segment:
+                internal_sensor_data, internal_sensor_status = ReplayEnviroControl._sensor_from_history(record, "internal")
+                external_sensor_data, external_sensor_status = ReplayEnviroControl._sensor_from_history(record, "external")
+                yield SensorDataPayload(
+                    id=UUID(int=0),  # the history doesn't keep the message id
+                    internal_sensor_data=internal_sensor_data,
+                    external_sensor_data=external_sensor_data,
+                    timestamp=datetime.fromtimestamp(float(record["timestamp"])),
+                    internal_sensor_status=internal_sensor_status,
+                    external_sensor_status=external_sensor_status)
+
+    @staticmethod
+    def _sensor_from_history(record, sensor: str) -> Tuple[SensorData, SensorStatus]:
+        status = STATUS_CODES[record[f"{sensor}_status"]]
+        temperature = float(record[f"{sensor}_temperature"])
+        # the history stores NaN for a missing reading, SensorData doesn't accept it
+        if status == SensorStatus.MISSING or math.isnan(temperature):
+            return SensorData(), SensorStatus.MISSING
+        return SensorData(temperature=temperature,
+                          humidity=float(record[f"{sensor}_humidity"]),
+                          pressure=float(record[f"{sensor}_pressure"])), status
+
+    def write_decisions(self, file_path: str) -> None:
+        with open(file_path, mode="w", encoding="utf-8") as file:
+            for decision in self._decisions:
+                file.write(json.dumps({"timestamp": str(decision.timestamp),
+                                       "heater_on": decision.heater_on,
+                                       "steamer_on": decision.steamer_on}) + "\n")
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from lib.envirosense_app.enviro_sense import EnviroSense
+from lib.envirosense_app.enviro_sense_sensor_application import EnviroSenseSensorApplication
+from lib.mqtt.async_mqtt_manager import AsyncMQTTManager
+from lib.sensor_drivers.sensor_hub import SensorHub
+
+
+class AsyncEnviroSense(EnviroSense):
+    """
+    EnviroSense on a single asyncio event loop: the MQTT client and the sampling run on the loop, the
+    blocking sensor drivers are read concurrently in a small executor.
+    Selected with `runtime: "asyncio"` in the config.yaml.
+    """
+
+    def __init__(self, config: dict, sensor_hub: Optional[SensorHub] = None):
+        executor_workers = config["enviro_sense"].get("async_executor_workers") or 2
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="enviro-sense")
+        super().__init__(config, sensor_hub)
+
+    def _initialize(self):
+        AsyncMQTTManager.check_transport(self._config["enviro_sense"].get("mqtt_transport"))
+        if self._config["enviro_sense"].get("outbox_path"):
+            # the outbox publishes from its own thread, the client of the asyncio runtime is only driven by the event loop
+            raise ValueError("The asyncio runtime doesn't support an outbox, leave outbox_path empty or use the threaded runtime")
+
+        broker_address = self._config["enviro_sense"]["broker_address"]
+        broker_port = self._config["enviro_sense"]["broker_port"]
+
+        # the client connects once the event loop is running
+        self._mqtt_manager = AsyncMQTTManager(broker_address=broker_address, port=broker_port, logger=self._logger)
+
+        self._sensor_app = EnviroSenseSensorApplication(self._digital_id,
+                                                        self._logger,
+                                                        self._config["enviro_sense"]["internal_sensor_driver"],
+                                                        self._config["enviro_sense"]["internal_sensor_address"],
+                                                        self._config["enviro_sense"]["external_sensor_driver"],
+                                                        self._config["enviro_sense"]["external_sensor_address"],
+                                                        self._mqtt_manager,
+                                                        self._config["enviro_sense"].get("payload_format") or "json",
+                                                        self._config["enviro_sense"].get("sensor_batch_size") or 1,
+                                                        self._config["enviro_sense"].get("sensor_batch_max_age") or 30,
+                                                        self._bme280_settings(),
+                                                        **self._sensor_timeouts(),
+                                                        sensor_hub=self._sensor_hub)
+
+    def _shutdown(self):
+        super()._shutdown()
+        self._executor.shutdown(wait=False)
+
+    async def _run(self):
+        self._mqtt_manager.connect()
+        try:
+            while self._running:
+                await self._scheduler.wait_next_async()
+                await self._sensor_app.publish_sensor_data_async(self._executor)
+        finally:
+            self._shutdown()
+
+    def run(self):
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            self._logger.info("Shutting down gracefully...")
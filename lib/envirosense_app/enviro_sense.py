@@ -1,22 +1,34 @@
-import time
 from logging import Logger
 from typing import Optional
 
 from lib.envirosense_app.enviro_sense_sensor_application import EnviroSenseSensorApplication
 from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.mqtt_transport_factory import MqttTransportFactory
+from lib.mqtt.outbox import Outbox
+from lib.mqtt.outbox_publisher import OutboxPublisher
+from lib.sensor_drivers.sensor_hub import SensorHub
 from lib.util.digital_id import DigitalId
 from lib.util.logger_factory import LoggerFactory
+from lib.util.periodic_scheduler import OverrunPolicy, PeriodicScheduler
 
 
 class EnviroSense:
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, sensor_hub: Optional[SensorHub] = None):
         self._logger = LoggerFactory.create("EnviroSense")
         self._config = config
 
         self._digital_id = self._config["enviro_sense"]["sensor_digital_id"] or DigitalId.create_digital_id()
         self._mqtt_manager: Optional[MQTTManager] = None
+        self._outbox_publisher: Optional[OutboxPublisher] = None
         self._publish_sensor_data_timeout = self._config["enviro_sense"]["sensor_publish_data_timeout"] or 3
+        # a sample every sensor_publish_data_timeout seconds, however long reading and publishing takes
+        self._scheduler = PeriodicScheduler(self._publish_sensor_data_timeout,
+                                            self._set_overrun_policy(self._config["enviro_sense"].get("sensor_overrun_policy") or "skip"))
+        # a hub that is passed in is shared with its other consumers and closed by whoever created it,
+        # otherwise EnviroSense has its own hub that keeps readings for sensor_cache_ttl seconds
+        self._owns_sensor_hub = sensor_hub is None
+        self._sensor_hub = sensor_hub or SensorHub(ttl=self._config["enviro_sense"].get("sensor_cache_ttl") or 0.0)
         self._initialize()
         self._running = True
 
@@ -24,12 +36,36 @@ class EnviroSense:
     def digital_id(self):
         return self._digital_id
 
+    @property
+    def scheduler(self) -> PeriodicScheduler:
+        return self._scheduler
+
+    def _set_overrun_policy(self, overrun_policy_as_str: str) -> OverrunPolicy:
+        if overrun_policy_as_str.lower() == "skip":
+            return OverrunPolicy.SKIP
+        elif overrun_policy_as_str.lower() == "catch_up":
+            return OverrunPolicy.CATCH_UP
+        else:
+            raise ValueError(f"Unsupported overrun policy: {overrun_policy_as_str}")
+
     def _initialize(self):
         broker_address = self._config["enviro_sense"]["broker_address"]
         broker_port = self._config["enviro_sense"]["broker_port"]
 
-        self._mqtt_manager = MQTTManager(broker_address=broker_address, port=broker_port, logger=self._logger)
-        self._mqtt_manager.connect()
+        self._mqtt_manager = MQTTManager(broker_address=broker_address, port=broker_port, logger=self._logger,
+                                         transport=MqttTransportFactory.create_transport_from_config(self._config["enviro_sense"].get("mqtt_transport")))
+        publisher = self._mqtt_manager
+
+        outbox_path = self._config["enviro_sense"].get("outbox_path")
+        if outbox_path:
+            # readings go to disk first, so they survive a broker that is down (also at startup)
+            self._outbox_publisher = OutboxPublisher(Outbox(outbox_path), self._mqtt_manager, self._logger,
+                                                     batch_size=self._config["enviro_sense"].get("outbox_batch_size") or 100)
+            self._outbox_publisher.start()
+            self._mqtt_manager.connect_async()
+            publisher = self._outbox_publisher
+        else:
+            self._mqtt_manager.connect()
 
         self._sensor_app = EnviroSenseSensorApplication(self._digital_id,
                                                         self._logger,
@@ -37,9 +73,37 @@ class EnviroSense:
                                                         self._config["enviro_sense"]["internal_sensor_address"],
                                                         self._config["enviro_sense"]["external_sensor_driver"],
                                                         self._config["enviro_sense"]["external_sensor_address"],
-                                                        self._mqtt_manager)
+                                                        publisher,
+                                                        self._config["enviro_sense"].get("payload_format") or "json",
+                                                        self._config["enviro_sense"].get("sensor_batch_size") or 1,
+                                                        self._config["enviro_sense"].get("sensor_batch_max_age") or 30,
+                                                        self._bme280_settings(),
+                                                        **self._sensor_timeouts(),
+                                                        sensor_hub=self._sensor_hub)
+
+    def _bme280_settings(self) -> dict:
+        return {"mode": self._config["enviro_sense"].get("bme280_mode") or "forced",
+                "standby_ms": self._config["enviro_sense"].get("bme280_standby_ms") or 62.5,
+                "iir_filter": self._config["enviro_sense"].get("bme280_iir_filter") or 0,
+                "oversampling": self._config["enviro_sense"].get("bme280_oversampling") or 1}
+
+    def _sensor_timeouts(self) -> dict:
+        return {"internal_sensor_timeout": self._config["enviro_sense"].get("internal_sensor_timeout") or 2.0,
+                "external_sensor_timeout": self._config["enviro_sense"].get("external_sensor_timeout") or 2.0,
+                "max_stale_age": self._config["enviro_sense"].get("sensor_max_stale_age") or 60}
 
     def _shutdown(self):
+        self._sensor_app.flush()
+        self._sensor_app.close()
+        self._logger.info(f"Sensor reads: {self._sensor_app.sampler}")
+        self._logger.info(f"Sampling: {self._scheduler}")
+        self._logger.info(f"{self._sensor_hub}")
+        if self._owns_sensor_hub:
+            self._sensor_hub.close()
+        if self._outbox_publisher is not None:
+            self._outbox_publisher.stop(timeout=5)
+            self._logger.info(f"{self._outbox_publisher.stats}, still pending: {self._outbox_publisher.outbox.pending()}")
+            self._outbox_publisher.outbox.close()
         self._mqtt_manager.disconnect()
         self._mqtt_manager = None
 
@@ -49,8 +113,8 @@ class EnviroSense:
     def run(self):
         try:
             while self._running:
+                self._scheduler.wait_next()
                 self._sensor_app.publish_sensor_data()
-                time.sleep(self._publish_sensor_data_timeout)  # we don't want to overrun our clients
 
         except KeyboardInterrupt:
             self._logger.info("Shutting down gracefully...")
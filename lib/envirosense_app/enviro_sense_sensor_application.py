@@ -1,11 +1,18 @@
+import asyncio
+import time
 import uuid
+from concurrent.futures import Executor
 from logging import Logger
+from typing import Optional, Union
 
+from lib.domain.sensor_data_batch import SensorDataBatch
 from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.envirosense_app.sensor_sampler import SensorReading, SensorSampler
 from lib.mqtt.mqtt_topic import MqttTopic
 from lib.sensor_drivers.sensor_driver import SensorDriver
-from lib.sensor_drivers.sensor_factory import SensorFactory
+from lib.sensor_drivers.sensor_hub import SensorHub
 from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.outbox_publisher import OutboxPublisher
 
 
 class EnviroSenseSensorApplication:
@@ -15,7 +22,15 @@ class EnviroSenseSensorApplication:
                  internal_sensor_address: int,
                  external_sensor_driver_as_str: str,
                  external_sensor_address: int,
-                 mqtt_manager: MQTTManager):
+                 mqtt_manager: Union[MQTTManager, OutboxPublisher],
+                 payload_format: str = "json",
+                 batch_size: int = 1,
+                 batch_max_age: float = 30,
+                 bme280_settings: Optional[dict] = None,
+                 internal_sensor_timeout: float = 2.0,
+                 external_sensor_timeout: float = 2.0,
+                 max_stale_age: float = 60,
+                 sensor_hub: Optional[SensorHub] = None):
 
         self._digital_id = digital_id
         self._logger = logger
@@ -23,11 +38,25 @@ class EnviroSenseSensorApplication:
         self._internal_sensor_driver = self._set_sensor_driver(internal_sensor_driver_as_str)
         self._external_sensor_driver = self._set_sensor_driver(external_sensor_driver_as_str)
 
-        self._internal_sensor = SensorFactory.create_driver(self._internal_sensor_driver, internal_sensor_address)
-        self._external_sensor = SensorFactory.create_driver(self._external_sensor_driver, external_sensor_address)
+        # the hub owns the drivers, so other consumers in the process share the readings instead of polling the sensor again
+        sensor_hub = sensor_hub or SensorHub.shared()
+        self._internal_sensor = sensor_hub.sensor(self._internal_sensor_driver, internal_sensor_address, bme280_settings)
+        self._external_sensor = sensor_hub.sensor(self._external_sensor_driver, external_sensor_address, bme280_settings)
+
+        # both sensors are read at the same time, a sensor that doesn't answer in time doesn't hold up the other
+        self._sampler = SensorSampler({"internal": self._internal_sensor, "external": self._external_sensor},
+                                      {"internal": internal_sensor_timeout, "external": external_sensor_timeout},
+                                      max_stale_age=max_stale_age, logger=self._logger)
 
         self._mqtt_manager = mqtt_manager
         self._mqtt_topic = MqttTopic(self._digital_id)
+        self._payload_format = payload_format  # "json" or "binary", EnviroControl detects the format
+
+        # with a batch size above 1 the samples are sent together, when the batch is full or its oldest sample is too old
+        self._batch_size = batch_size
+        self._batch_max_age = batch_max_age
+        self._batch = SensorDataBatch()
+        self._batch_started_at = 0.0
 
     def _set_sensor_driver(self, sensor_driver_as_str: str) -> SensorDriver:
         if sensor_driver_as_str.lower() == "mock":
@@ -36,16 +65,60 @@ class EnviroSenseSensorApplication:
             return SensorDriver.BME280
         elif sensor_driver_as_str.lower() == "dht22":
             return SensorDriver.DHT22
+        elif sensor_driver_as_str.lower() == "simulated_room":
+            return SensorDriver.SIMULATED_ROOM
+        elif sensor_driver_as_str.lower() == "simulated_outdoor":
+            return SensorDriver.SIMULATED_OUTDOOR
+        elif sensor_driver_as_str.lower() == "synthetic":
+            return SensorDriver.SYNTHETIC
         else:
             raise ValueError(f"Unsupported sensor driver: {sensor_driver_as_str}")
 
+    @property
+    def sampler(self) -> SensorSampler:
+        return self._sampler
+
     def publish_sensor_data(self):
+        readings = self._sampler.sample()
+        self._publish(readings["internal"], readings["external"])
+
+    async def publish_sensor_data_async(self, executor: Optional[Executor] = None):
+        # the sampler blocks until both sensors answered or timed out, so it waits in the executor
+        loop = asyncio.get_running_loop()
+        readings = await loop.run_in_executor(executor, self._sampler.sample)
+        self._publish(readings["internal"], readings["external"])
+
+    def close(self):
+        self._sampler.shutdown()
+        self._internal_sensor.close()
+        self._external_sensor.close()
+
+    def _publish(self, internal_reading: SensorReading, external_reading: SensorReading):
         id = uuid.uuid4()
-        internal_sensor_data = self._internal_sensor.get_sensor_data()
-        external_sensor_data = self._external_sensor.get_sensor_data()
+        sensor_data_payload = SensorDataPayload(id=id, internal_sensor_data=internal_reading.sensor_data,
+                                                external_sensor_data=external_reading.sensor_data,
+                                                internal_sensor_status=internal_reading.status,
+                                                external_sensor_status=external_reading.status)
+
+        if self._batch_size <= 1:
+            payload = sensor_data_payload.encode(self._payload_format)
+            topic = self._mqtt_topic.sensor_data_topic
+            self._mqtt_manager.publish(topic, payload)
+            return
+
+        if not self._batch.payloads:
+            self._batch_started_at = time.monotonic()
+        self._batch.payloads.append(sensor_data_payload)
+
+        if len(self._batch.payloads) >= self._batch_size or time.monotonic() - self._batch_started_at >= self._batch_max_age:
+            self.flush()
 
-        sensor_data_payload = SensorDataPayload(id=id, internal_sensor_data=internal_sensor_data, external_sensor_data=external_sensor_data)
+    def flush(self):
+        """Publishes the samples that are waiting in the batch."""
+        if not self._batch.payloads:
+            return
 
-        payload = sensor_data_payload.to_json()
-        topic = self._mqtt_topic.sensor_data_topic
+        payload = self._batch.encode(self._payload_format)
+        topic = self._mqtt_topic.sensor_data_batch_topic
         self._mqtt_manager.publish(topic, payload)
+        self._batch = SensorDataBatch()
@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+from logging import Logger
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_status import SensorStatus
+from lib.sensor_drivers.sensor_interface import SensorInterface
+from lib.util.latency_stats import LatencyStats
+
+
+@dataclass
+class SensorReading:
+    sensor_data: SensorData
+    status: SensorStatus
+    age: float = 0.0  # seconds since the sensor took the reading
+
+
+class SensorSampler:
+    """
+    Reads several sensors at the same time in a small worker pool, so a slow sensor (a DHT22 read can
+    take seconds) doesn't delay or skew the reading of the others.
+
+    Every sensor has its own timeout. A sensor that doesn't answer in time gets its last good reading,
+    marked stale, or when that is older than `max_stale_age` a placeholder marked missing. A read
+    that hangs is not started again: the next sample waits for the same read, so the pool never
+    fills up with reads of a sensor that is gone.
+    """
+
+    def __init__(self, sensors: Dict[str, SensorInterface], timeouts: Union[float, Dict[str, float]] = 2.0,
+                 max_stale_age: float = 60.0, logger: Optional[Logger] = None, executor: Optional[Executor] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._sensors = sensors
+        self._timeouts = timeouts if isinstance(timeouts, dict) else {name: timeouts for name in sensors}
+        self._max_stale_age = max_stale_age
+        self._logger = logger or Logger(__name__)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=len(sensors), thread_name_prefix="sensor-sampler")
+        self._clock = clock
+
+        self._pending: Dict[str, Tuple[Future, float]] = {}
+        self._last_good: Dict[str, Tuple[SensorData, float]] = {}
+        self._latency = {name: LatencyStats() for name in sensors}
+        self._timed_out = {name: 0 for name in sensors}
+        self._failed = {name: 0 for name in sensors}
+
+    @property
+    def latency(self) -> Dict[str, LatencyStats]:
+        """Duration of the driver calls per sensor, also of the reads that came in too late."""
+        return self._latency
+
+    @property
+    def timed_out(self) -> Dict[str, int]:
+        return self._timed_out
+
+    @property
+    def failed(self) -> Dict[str, int]:
+        return self._failed
+
+    def sample(self) -> Dict[str, SensorReading]:
+        for name in self._sensors:
+            pending = self._pending.get(name)
+            if pending is not None and pending[0].done():
+                # a read that came in after its timeout, it is still the most recent good reading
+                self._collect(name)
+                pending = None
+            if pending is None:
+                self._pending[name] = (self._executor.submit(self._read, name), self._clock())
+
+        return {name: self._wait(name) for name in self._sensors}
+
+    def shutdown(self) -> None:
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    def _read(self, name: str) -> Tuple[SensorData, float]:
+        start = time.perf_counter()
+        try:
+            sensor_data, reading_time = self._sensors[name].get_timed_sensor_data()
+            # the driver may return a reading it took earlier, its age counts from then
+            return sensor_data, self._clock() - (time.monotonic() - reading_time)
+        finally:
+            self._latency[name].record(time.perf_counter() - start)
+
+    def _collect(self, name: str) -> Optional[SensorData]:
+        future, _ = self._pending.pop(name)
+        try:
+            sensor_data, taken_at = future.result()
+        except Exception as e:
+            self._failed[name] += 1
+            self._logger.error(f"Reading the {name} sensor failed: {e}")
+            return None
+        self._last_good[name] = (sensor_data, taken_at)
+        return sensor_data
+
+    def _wait(self, name: str) -> SensorReading:
+        future, started_at = self._pending[name]
+        try:
+            future.result(timeout=max(0.0, started_at + self._timeouts[name] - self._clock()))
+        except TimeoutError:
+            self._timed_out[name] += 1
+            self._logger.warning(f"The {name} sensor didn't answer within {self._timeouts[name]}s")
+            return self._fallback(name)
+        except Exception:
+            pass  # logged when the read is collected
+
+        sensor_data = self._collect(name)
+        if sensor_data is None:
+            return self._fallback(name)
+        return SensorReading(sensor_data, SensorStatus.OK, max(0.0, self._clock() - self._last_good[name][1]))
+
+    def _fallback(self, name: str) -> SensorReading:
+        last_good = self._last_good.get(name)
+        if last_good is not None:
+            age = self._clock() - last_good[1]
+            if age <= self._max_stale_age:
+                return SensorReading(last_good[0], SensorStatus.STALE, age)
+        return SensorReading(SensorData(), SensorStatus.MISSING)
+
+    def __str__(self):
+        return ", ".join(f"{name}: {self._latency[name]}, timed out: {self._timed_out[name]}, failed: {self._failed[name]}"
+                         for name in self._sensors)
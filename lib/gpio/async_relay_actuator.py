@@ -0,0 +1,130 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from logging import Logger
+from typing import Optional
+
+from lib.gpio.relay_command import RelayCommand
+from lib.gpio.relay_interface import RelayInterface
+from lib.gpio.short_cycle_guard import ShortCycleGuard
+from lib.util.latency_stats import LatencyStats
+
+
+class AsyncRelayActuator(RelayInterface):
+    """
+    asyncio counterpart of the RelayActuator: a task per relay executes the commands, the blocking
+    driver call runs in an executor and the settle time is awaited instead of slept. Waiting commands
+    that are replaced by a newer one are cancelled, commands that the ShortCycleGuard suppresses are
+    resolved at once.
+    """
+
+    def __init__(self, relay: RelayInterface, name: str, logger: Optional[Logger] = None,
+                 executor: Optional[Executor] = None, guard: Optional[ShortCycleGuard] = None) -> None:
+        self._relay = relay
+        self._name = name
+        self._logger = logger or Logger(__name__)
+        self._guard = guard or ShortCycleGuard()
+        self._executor = executor
+        self._commands: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latency = LatencyStats()
+        self._executed = 0
+        self._superseded = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def relay(self) -> RelayInterface:
+        return self._relay
+
+    @property
+    def latency(self) -> LatencyStats:
+        return self._latency
+
+    @property
+    def executed(self) -> int:
+        return self._executed
+
+    @property
+    def superseded(self) -> int:
+        return self._superseded
+
+    @property
+    def guard(self) -> ShortCycleGuard:
+        return self._guard
+
+    @property
+    def suppressed(self) -> int:
+        return self._guard.suppressed
+
+    def start(self) -> None:
+        """Has to be called from within the running event loop."""
+        self._commands = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"relay-{self._name}")
+
+    def open_relay(self) -> asyncio.Future:
+        return self.submit(RelayCommand.OPEN)
+
+    def close_relay(self) -> asyncio.Future:
+        return self.submit(RelayCommand.CLOSE)
+
+    def submit(self, command: RelayCommand) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if not self._guard.allow(command):
+            future.set_result(0.0)
+            return future
+        self._commands.put_nowait((command, future, time.monotonic()))
+        return future
+
+    async def shutdown(self) -> None:
+        if self._task is None:
+            return
+        self._commands.put_nowait(None)
+        await self._task
+        self._task = None
+
+    def _next_command(self, pending):
+        # only the most recent decision matters, cancel the ones it replaces
+        while pending is not None and not self._commands.empty():
+            newer = self._commands.get_nowait()
+            if newer is None:
+                self._commands.put_nowait(None)
+                break
+            pending[1].cancel()
+            self._superseded += 1
+            pending = newer
+        return pending
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = self._next_command(await self._commands.get())
+            if pending is None:
+                return
+            command, future, submitted_at = pending
+            if future.cancelled():
+                continue
+
+            try:
+                if command == RelayCommand.OPEN:
+                    await loop.run_in_executor(self._executor, self._relay.open_relay)
+                    self._guard.switched(command)
+                    await asyncio.sleep(self._relay.open_settle_time)
+                else:
+                    await loop.run_in_executor(self._executor, self._relay.close_relay)
+                    self._guard.switched(command)
+                    await asyncio.sleep(self._relay.close_settle_time)
+            except Exception as e:
+                self._logger.error(f"Relay {self._name} failed to {command.value.lower()}: {e}")
+                self._guard.forget()
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            latency = time.monotonic() - submitted_at
+            self._latency.record(latency)
+            self._executed += 1
+            if not future.done():
+                future.set_result(latency)
@@ -1,4 +1,3 @@
-import time
 from lib.gpio.relay_interface import RelayInterface
 
 # Try to import RPi.GPIO, or define a mock if unavailable
@@ -34,6 +33,9 @@ except ImportError:
 
 
 class RaspberryPiRelay(RelayInterface):
+    # the settle times are enforced by the RelayActuator so the control loop doesn't sleep on them
+    open_settle_time = 2.0
+    close_settle_time = 5.0
 
     def __init__(self, gpio_pin: int = 17) -> None:
         self._gpio_pin = gpio_pin
@@ -45,11 +47,9 @@ class RaspberryPiRelay(RelayInterface):
 
     def open_relay(self):
         GPIO.output(self._gpio_pin, GPIO.HIGH)
-        time.sleep(2)
 
     def close_relay(self):
         GPIO.output(self._gpio_pin, GPIO.LOW)  # Deactivate relay
-        time.sleep(5)
 
     def __del__(self):
         GPIO.cleanup()
@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import Future
+from logging import Logger
+from queue import Queue
+from typing import Optional
+
+from lib.gpio.relay_command import RelayCommand
+from lib.gpio.relay_interface import RelayInterface
+from lib.gpio.short_cycle_guard import ShortCycleGuard
+from lib.util.latency_stats import LatencyStats
+
+
+class _PendingCommand:
+
+    def __init__(self, command: RelayCommand) -> None:
+        self.command = command
+        self.future: Future = Future()
+        self.submitted_at = time.monotonic()
+
+
+class RelayActuator(RelayInterface):
+    """
+    Executes relay commands on a worker thread so the caller never waits for the relay to settle.
+
+    `open_relay` and `close_relay` return a Future that is resolved once the relay has switched and
+    the settle time of the driver has passed. When several commands are waiting only the newest one
+    is executed, the others are cancelled: the relay only has to end up in the latest decided state.
+    Commands that the ShortCycleGuard suppresses never reach the worker, their Future is resolved at once.
+    """
+
+    def __init__(self, relay: RelayInterface, name: str, logger: Optional[Logger] = None,
+                 guard: Optional[ShortCycleGuard] = None) -> None:
+        self._relay = relay
+        self._name = name
+        self._logger = logger or Logger(__name__)
+        self._guard = guard or ShortCycleGuard()
+        self._commands = Queue()
+        self._latency = LatencyStats()
+        self._executed = 0
+        self._superseded = 0
+        self._worker = threading.Thread(target=self._run, name=f"relay-{name}", daemon=True)
+        self._worker.start()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def relay(self) -> RelayInterface:
+        return self._relay
+
+    @property
+    def latency(self) -> LatencyStats:
+        return self._latency
+
+    @property
+    def executed(self) -> int:
+        return self._executed
+
+    @property
+    def superseded(self) -> int:
+        return self._superseded
+
+    @property
+    def guard(self) -> ShortCycleGuard:
+        return self._guard
+
+    @property
+    def suppressed(self) -> int:
+        return self._guard.suppressed
+
+    def open_relay(self) -> Future:
+        return self.submit(RelayCommand.OPEN)
+
+    def close_relay(self) -> Future:
+        return self.submit(RelayCommand.CLOSE)
+
+    def submit(self, command: RelayCommand) -> Future:
+        if not self._guard.allow(command):
+            suppressed = Future()
+            suppressed.set_result(0.0)
+            return suppressed
+
+        pending = _PendingCommand(command)
+        self._commands.put(pending)
+        return pending.future
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._commands.put(None)
+        if wait:
+            self._worker.join()
+
+    def _next_command(self) -> Optional[_PendingCommand]:
+        pending = self._commands.get()
+        # only the most recent decision matters, cancel the ones it replaces
+        while pending is not None and not self._commands.empty():
+            newer = self._commands.get()
+            if newer is None:
+                self._commands.put(None)
+                break
+            pending.future.cancel()
+            self._superseded += 1
+            pending = newer
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._next_command()
+            if pending is None:
+                return
+            if not pending.future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                self._execute(pending.command)
+            except Exception as e:
+                self._logger.error(f"Relay {self._name} failed to {pending.command.value.lower()}: {e}")
+                self._guard.forget()
+                pending.future.set_exception(e)
+                continue
+
+            latency = time.monotonic() - pending.submitted_at
+            self._latency.record(latency)
+            self._executed += 1
+            pending.future.set_result(latency)
+
+    def _execute(self, command: RelayCommand) -> None:
+        if command == RelayCommand.OPEN:
+            self._relay.open_relay()
+            self._guard.switched(command)
+            time.sleep(self._relay.open_settle_time)
+        else:
+            self._relay.close_relay()
+            self._guard.switched(command)
+            time.sleep(self._relay.close_settle_time)
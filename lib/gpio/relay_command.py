@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class RelayCommand(Enum):
+    OPEN = "OPEN"
+    CLOSE = "CLOSE"
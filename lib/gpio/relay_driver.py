@@ -4,3 +4,4 @@ from enum import Enum
 class RelayDriver(Enum):
     RPI = "RPI"
     MOCK = "MOCK"
+    SIMULATED = "SIMULATED"
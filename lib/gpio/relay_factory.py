@@ -12,3 +12,6 @@ class RelayFactory:
             return RaspberryPiRelay(gpio_pin)
         if relay_driver == RelayDriver.MOCK:
             return MockRelay(gpio_pin)
+        if relay_driver == RelayDriver.SIMULATED:
+            from lib.simulation.simulated_relay import SimulatedRelay
+            return SimulatedRelay(gpio_pin)
@@ -1,4 +1,7 @@
 class RelayInterface:
+    open_settle_time: float = 0.0  # seconds the relay needs after opening before it can switch again
+    close_settle_time: float = 0.0  # seconds the relay needs after closing before it can switch again
+
     def open_relay(self) -> None:
         pass
 
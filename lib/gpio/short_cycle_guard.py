@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from lib.gpio.relay_command import RelayCommand
+
+
+class ShortCycleGuard:
+    """
+    Remembers the last commanded state of a relay and decides if a new command has to be executed.
+
+    A command for the state the relay is already in is suppressed, so the gpio write and the settle time
+    are only paid for a real transition. A transition is also suppressed while the relay hasn't been
+    closed for `min_on_time` or open for `min_off_time` seconds yet (a closed relay switches the device on),
+    this protects the relay and the device against short cycling. A suppressed transition isn't
+    postponed: the controllers decide again on the next sensor data, which then switches the relay.
+
+    The minimum times count from the moment the relay really switched, which the actuator reports with
+    `switched` once its worker has executed the command. Until then they count from the moment the
+    transition was allowed.
+    """
+
+    def __init__(self, min_on_time: float = 0.0, min_off_time: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._min_on_time = min_on_time
+        self._min_off_time = min_off_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: Optional[RelayCommand] = None  # unknown until the first command
+        self._changed_at = 0.0
+        self._transitions = 0
+        self._suppressed_redundant = 0
+        self._suppressed_short_cycle = 0
+
+    @property
+    def state(self) -> Optional[RelayCommand]:
+        return self._state
+
+    @property
+    def transitions(self) -> int:
+        return self._transitions
+
+    @property
+    def suppressed_redundant(self) -> int:
+        return self._suppressed_redundant
+
+    @property
+    def suppressed_short_cycle(self) -> int:
+        return self._suppressed_short_cycle
+
+    @property
+    def suppressed(self) -> int:
+        return self._suppressed_redundant + self._suppressed_short_cycle
+
+    def allow(self, command: RelayCommand) -> bool:
+        now = self._clock()
+        with self._lock:
+            if command == self._state:
+                self._suppressed_redundant += 1
+                return False
+
+            if self._state is not None:
+                minimum = self._min_on_time if self._state == RelayCommand.CLOSE else self._min_off_time
+                if now - self._changed_at < minimum:
+                    self._suppressed_short_cycle += 1
+                    return False
+
+            self._state = command
+            self._changed_at = now
+            self._transitions += 1
+            return True
+
+    def switched(self, command: RelayCommand) -> None:
+        """The relay has been switched by the worker, a command that was replaced in the meantime doesn't count."""
+        now = self._clock()
+        with self._lock:
+            if command == self._state:
+                self._changed_at = now
+
+    def forget(self) -> None:
+        """The state of the relay isn't known anymore (a command failed), the next command is always executed."""
+        with self._lock:
+            self._state = None
+
+    def __str__(self):
+        return (f"ShortCycleGuard(transitions: {self._transitions}, suppressed redundant: {self._suppressed_redundant}, "
+                f"suppressed short cycle: {self._suppressed_short_cycle})")
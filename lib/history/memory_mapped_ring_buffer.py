@@ -0,0 +1,104 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4"), ("capacity", "<u8"), ("count", "<u8")])
+HEADER_SIZE = 64  # the records start at a fixed offset so the header can grow
+MAGIC = b"ENVRING1"
+VERSION = 1
+
+
+class MemoryMappedRingBuffer:
+    """
+    Fixed-size ring buffer of NumPy records in a memory-mapped file.
+
+    The file is allocated once at `capacity` records, so appending never grows the file or the memory
+    use: the oldest record is overwritten. The OS pages the file in and out, only the pages that are
+    used stay in RAM. The first field of the dtype is the timestamp, range queries search on it, so
+    `append` refuses a record that is older than the last one.
+    """
+
+    def __init__(self, file_path: str, dtype: np.dtype, capacity: int) -> None:
+        self._file_path = file_path
+        self._dtype = np.dtype(dtype)
+        self._time_field = self._dtype.names[0]
+
+        if not os.path.exists(file_path):
+            self._create(capacity)
+
+        self._header = np.memmap(file_path, dtype=HEADER_DTYPE, mode="r+", offset=0, shape=(1,))
+        if self._header["magic"][0] != MAGIC or self._header["record_size"][0] != self._dtype.itemsize:
+            raise ValueError(f"{file_path} is not a ring buffer of this record type")
+        self._capacity = int(self._header["capacity"][0])
+        self._records = np.memmap(file_path, dtype=self._dtype, mode="r+", offset=HEADER_SIZE, shape=(self._capacity,))
+
+    def _create(self, capacity: int) -> None:
+        with open(self._file_path, "wb") as file:
+            file.truncate(HEADER_SIZE + capacity * self._dtype.itemsize)
+        header = np.memmap(self._file_path, dtype=HEADER_DTYPE, mode="r+", offset=0, shape=(1,))
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = self._dtype.itemsize
+        header["capacity"] = capacity
+        header["count"] = 0
+        header.flush()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """Number of records ever appended, the buffer holds the last `capacity` of them."""
+        return int(self._header["count"][0])
+
+    def __len__(self) -> int:
+        return min(self.count, self._capacity)
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """The timestamp of the newest record, None when the buffer is empty."""
+        count = self.count
+        if count == 0:
+            return None
+        return float(self._records[(count - 1) % self._capacity][self._time_field])
+
+    def append(self, record: tuple) -> None:
+        count = self.count
+        last_time = self.last_time
+        if last_time is not None and not record[0] >= last_time:
+            raise ValueError(f"The timestamp {record[0]} is older than the last one in {self._file_path}: {last_time}")
+        self._records[count % self._capacity] = record
+        self._header["count"] = count + 1
+
+    def segments(self):
+        """The stored records in chronological order, as one or two views on the file (no copy)."""
+        count = self.count
+        if count <= self._capacity:
+            return [self._records[:count]]
+        head = count % self._capacity
+        return [self._records[head:], self._records[:head]]
+
+    def views(self, start_time: float, end_time: float):
+        """Zero-copy views of the records with `start_time <= time < end_time`, in chronological order."""
+        views = []
+        for segment in self.segments():
+            times = segment[self._time_field]
+            start, end = np.searchsorted(times, [start_time, end_time], side="left")
+            if end > start:
+                views.append(segment[start:end])
+        return views
+
+    def query(self, start_time: float, end_time: float) -> np.ndarray:
+        """Like `views` but as one array, this only copies when the range wraps around the end of the file."""
+        views = self.views(start_time, end_time)
+        if not views:
+            return np.empty(0, dtype=self._dtype)
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate(views)
+
+    def flush(self) -> None:
+        self._records.flush()
+        self._header.flush()
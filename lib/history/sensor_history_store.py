@@ -0,0 +1,168 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.history.memory_mapped_ring_buffer import MemoryMappedRingBuffer
+
+VALUE_FIELDS = ["internal_temperature", "internal_humidity", "internal_pressure",
+                "external_temperature", "external_humidity", "external_pressure",
+                "heater_on", "steamer_on"]
+
+# the code of a status in the history is its index
+STATUS_CODES = [SensorStatus.OK, SensorStatus.STALE, SensorStatus.MISSING]
+
+# relay states are -1 when the state isn't known yet
+RECORD_DTYPE = np.dtype([("timestamp", "<f8")] +
+                        [(name, "<f4") for name in VALUE_FIELDS[:6]] +
+                        [("heater_on", "i1"), ("steamer_on", "i1"),
+                         ("internal_status", "i1"), ("external_status", "i1")])
+
+TIER_DTYPE = np.dtype([("timestamp", "<f8"), ("count", "<u4")] +
+                      [(f"{name}_{statistic}", "<f4") for name in VALUE_FIELDS for statistic in ("min", "mean", "max")])
+
+
+class _TierAccumulator:
+    """
+    Collects the records of the current bucket of a tier until the bucket is complete. NaN values (a
+    sensor without a good reading) are left out of the statistics of their column.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.bucket: Optional[float] = None
+        self.count = 0
+        self.counts = np.zeros(len(VALUE_FIELDS))  # the values that aren't NaN per column
+        self.minimum = np.full(len(VALUE_FIELDS), np.inf)
+        self.maximum = np.full(len(VALUE_FIELDS), -np.inf)
+        self.total = np.zeros(len(VALUE_FIELDS))
+
+    def add(self, values: np.ndarray) -> None:
+        self.count += 1
+        known = ~np.isnan(values)
+        self.counts += known
+        np.fmin(self.minimum, values, out=self.minimum)
+        np.fmax(self.maximum, values, out=self.maximum)
+        self.total += np.where(known, values, 0.0)
+
+    def to_record(self) -> tuple:
+        known = self.counts > 0
+        mean = np.divide(self.total, self.counts, out=np.full(len(VALUE_FIELDS), np.nan), where=known)
+        minimum = np.where(known, self.minimum, np.nan)
+        maximum = np.where(known, self.maximum, np.nan)
+        statistics = np.stack([minimum, mean, maximum], axis=1).ravel()
+        return (self.bucket, self.count, *statistics)
+
+    def reset(self, bucket: float) -> None:
+        self.bucket = bucket
+        self.count = 0
+        self.counts.fill(0.0)
+        self.minimum.fill(np.inf)
+        self.maximum.fill(-np.inf)
+        self.total.fill(0.0)
+
+
+class SensorHistoryStore:
+    """
+    History of the received sensor data and the relay decisions, in memory-mapped ring buffers.
+
+    Every reading is stored in the raw ring buffer. For every interval in `tiers` (in seconds) a
+    downsampled ring buffer keeps the min/mean/max of every column per bucket, so the long term history
+    survives after the raw readings are overwritten. The defaults take about 34 MB for the raw readings
+    (a month of readings every 3 seconds) and 11 MB per tier (69 days of minutes, 11 years of hours).
+
+    The status of both sensors is stored with every reading. A stale reading keeps the last good value
+    EnviroControl decided on, the columns of a missing reading are stored as NaN, so its placeholder
+    values don't end up in the history and its statistics. A relay state that isn't known yet is stored
+    as -1 and left out of the statistics of the tiers.
+
+    A reading older than the last stored one (a batch that is sent again, a clock that was set back)
+    is dropped, the buffers have to stay sorted on time. The bucket that is being collected isn't
+    stored itself: after a restart it is collected again from the raw readings that are newer than the
+    last bucket of the tier, so a restart doesn't write a partial bucket twice.
+    """
+
+    def __init__(self, directory: str, capacity: int = 1_000_000, tiers: List[int] = (60, 3600),
+                 tier_capacity: int = 100_000) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self._raw = MemoryMappedRingBuffer(os.path.join(directory, "raw.ring"), RECORD_DTYPE, capacity)
+        self._tiers: Dict[int, MemoryMappedRingBuffer] = {
+            interval: MemoryMappedRingBuffer(os.path.join(directory, f"tier_{interval}s.ring"), TIER_DTYPE, tier_capacity)
+            for interval in tiers
+        }
+        self._accumulators = [_TierAccumulator(interval) for interval in tiers]
+        self._restore_accumulators()
+
+    @property
+    def raw(self) -> MemoryMappedRingBuffer:
+        return self._raw
+
+    def tier(self, interval: int) -> MemoryMappedRingBuffer:
+        return self._tiers[interval]
+
+    def append(self, sensor_data_payload: SensorDataPayload, heater_on: Optional[bool], steamer_on: Optional[bool]) -> bool:
+        """Stores the reading, returns False when it was dropped because it is older than the last one."""
+        internal = self._sensor_values(sensor_data_payload.internal_sensor_data, sensor_data_payload.internal_sensor_status)
+        external = self._sensor_values(sensor_data_payload.external_sensor_data, sensor_data_payload.external_sensor_status)
+        timestamp = sensor_data_payload.timestamp.timestamp()
+        last_time = self._raw.last_time
+        if last_time is not None and timestamp < last_time:
+            return False
+        values = (*internal, *external,
+                  -1 if heater_on is None else int(heater_on),
+                  -1 if steamer_on is None else int(steamer_on))
+
+        self._raw.append((timestamp, *values,
+                          STATUS_CODES.index(sensor_data_payload.internal_sensor_status),
+                          STATUS_CODES.index(sensor_data_payload.external_sensor_status)))
+        self._downsample(timestamp, self._tier_values(values))
+        return True
+
+    @staticmethod
+    def _tier_values(values) -> np.ndarray:
+        # an unknown relay state (-1) is left out of the on-fraction of its bucket, like a missing reading
+        tier_values = np.array(values, dtype=float)
+        relays = tier_values[6:]
+        relays[relays < 0] = np.nan
+        return tier_values
+
+    @staticmethod
+    def _sensor_values(sensor_data: SensorData, status: SensorStatus) -> tuple:
+        if status == SensorStatus.MISSING:
+            return np.nan, np.nan, np.nan
+        return sensor_data.temperature, sensor_data.humidity, sensor_data.pressure
+
+    def _downsample(self, timestamp: float, values: np.ndarray) -> None:
+        for accumulator in self._accumulators:
+            self._accumulate(accumulator, timestamp, values)
+
+    def _accumulate(self, accumulator: _TierAccumulator, timestamp: float, values: np.ndarray) -> None:
+        bucket = timestamp - timestamp % accumulator.interval
+        if accumulator.bucket is None:
+            accumulator.reset(bucket)
+        elif bucket != accumulator.bucket:
+            if accumulator.count > 0:
+                self._tiers[accumulator.interval].append(accumulator.to_record())
+            accumulator.reset(bucket)
+        accumulator.add(values)
+
+    def _restore_accumulators(self) -> None:
+        for accumulator in self._accumulators:
+            last_bucket = self._tiers[accumulator.interval].last_time
+            start_time = -np.inf if last_bucket is None else last_bucket + accumulator.interval
+            for record in self._raw.query(start_time, np.inf):
+                self._accumulate(accumulator, float(record["timestamp"]),
+                                 self._tier_values([record[name] for name in VALUE_FIELDS]))
+
+    def query(self, start_time: float, end_time: float, tier: Optional[int] = None) -> np.ndarray:
+        """Records with `start_time <= timestamp < end_time`, from the raw buffer or from a downsampled tier."""
+        ring_buffer = self._raw if tier is None else self._tiers[tier]
+        return ring_buffer.query(start_time, end_time)
+
+    def flush(self) -> None:
+        self._raw.flush()
+        for ring_buffer in self._tiers.values():
+            ring_buffer.flush()
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lib.util.latency_stats import LatencyStats
+
+BlockRead = Tuple[int, int, int]  # address, register, length
+
+
+class SharedI2cBus:
+    """
+    One handle of an i2c bus, shared by all devices on it. It has the SMBus methods the drivers use, every
+    transaction holds the lock of the bus so transactions of different devices never interleave, and the
+    duration of every transaction is recorded for the bus and per device.
+    """
+
+    def __init__(self, bus, bus_id: int) -> None:
+        self._bus = bus
+        self._bus_id = bus_id
+        self._lock = threading.RLock()
+        self._latency = LatencyStats()
+        self._device_latency: Dict[int, LatencyStats] = {}
+
+    @property
+    def bus_id(self) -> int:
+        return self._bus_id
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Held for a sequence of transactions that must not be interrupted by another device."""
+        return self._lock
+
+    @property
+    def latency(self) -> LatencyStats:
+        return self._latency
+
+    def device_latency(self, address: int) -> LatencyStats:
+        return self._device_latency.setdefault(address, LatencyStats())
+
+    def _transaction(self, address: int, operation: Callable, *args):
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                return operation(address, *args)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._latency.record(elapsed)
+                self.device_latency(address).record(elapsed)
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        return self._transaction(address, self._bus.read_byte_data, register)
+
+    def read_word_data(self, address: int, register: int) -> int:
+        return self._transaction(address, self._bus.read_word_data, register)
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        return self._transaction(address, self._bus.read_i2c_block_data, register, length)
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        return self._transaction(address, self._bus.write_byte_data, register, value)
+
+    def read_blocks(self, reads: List[BlockRead]) -> List[List[int]]:
+        """Block reads of several devices in one pass, no other transaction gets in between."""
+        with self._lock:
+            return [self.read_i2c_block_data(address, register, length) for address, register, length in reads]
+
+    def close(self) -> None:
+        with self._lock:
+            close = getattr(self._bus, "close", None)
+            if close is not None:
+                close()
+
+    def __str__(self):
+        return f"SharedI2cBus(bus: {self._bus_id}, devices: {sorted(self._device_latency)}, {self._latency})"
+
+
+def _open_smbus(bus_id: int):
+    import smbus2
+    return smbus2.SMBus(bus_id)
+
+
+class I2cBusManager:
+    """Opens every i2c bus of the process once, all drivers on a bus get the same SharedI2cBus."""
+
+    _shared: Optional["I2cBusManager"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, opener: Callable[[int], object] = _open_smbus) -> None:
+        self._opener = opener
+        self._lock = threading.Lock()
+        self._buses: Dict[int, SharedI2cBus] = {}
+
+    @staticmethod
+    def shared() -> "I2cBusManager":
+        """The bus manager of the process."""
+        with I2cBusManager._shared_lock:
+            if I2cBusManager._shared is None:
+                I2cBusManager._shared = I2cBusManager()
+            return I2cBusManager._shared
+
+    @staticmethod
+    def set_shared(manager: Optional["I2cBusManager"]) -> None:
+        with I2cBusManager._shared_lock:
+            I2cBusManager._shared = manager
+
+    def bus(self, bus_id: int) -> SharedI2cBus:
+        with self._lock:
+            if bus_id not in self._buses:
+                self._buses[bus_id] = SharedI2cBus(self._opener(bus_id), bus_id)
+            return self._buses[bus_id]
+
+    def buses(self) -> List[SharedI2cBus]:
+        with self._lock:
+            return list(self._buses.values())
+
+    def close(self) -> None:
+        with self._lock:
+            buses = list(self._buses.values())
+            self._buses.clear()
+        for bus in buses:
+            bus.close()
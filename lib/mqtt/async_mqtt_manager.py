@@ -0,0 +1,129 @@
+import asyncio
+from logging import Logger
+from typing import Optional
+
+import paho.mqtt.client as mqtt
+
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.transports.paho_transport import PahoTransport
+
+
+class AsyncMQTTManager(MQTTManager):
+    """
+    Runs the paho client on the asyncio event loop instead of on paho's own network thread.
+
+    The socket of the client is registered with the event loop, so reading, writing and the keepalive
+    handling happen on the loop and received messages are put on an `asyncio.Queue`. Subscriptions are
+    remembered and (re)done when the connection is established. When the connection drops the client
+    reconnects by itself, after `min_reconnect_delay` seconds and then doubling up to `max_reconnect_delay`,
+    like paho's own thread does for the threaded runtime.
+    """
+
+    def __init__(self, broker_address="localhost", port=1883, keepalive=60, logger: Logger = None,
+                 message_list: Optional[asyncio.Queue] = None, min_reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0):
+        super().__init__(broker_address=broker_address, port=port, keepalive=keepalive, logger=logger,
+                         message_list=message_list if message_list is not None else asyncio.Queue(),
+                         transport=PahoTransport())
+        self._paho = self._client.client  # the socket of paho itself is driven by the event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._misc_task: Optional[asyncio.Task] = None
+        self._subscriptions = {}
+        self._min_reconnect_delay = min_reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._reconnect_delay = min_reconnect_delay
+        self._stopping = False
+
+        self._paho.on_socket_open = self._on_socket_open
+        self._paho.on_socket_close = self._on_socket_close
+        self._paho.on_socket_register_write = self._on_socket_register_write
+        self._paho.on_socket_unregister_write = self._on_socket_unregister_write
+
+    @staticmethod
+    def check_transport(transport_driver_as_str: Optional[str]) -> None:
+        """The socket of paho is driven by the event loop, so the asyncio runtime only works with the paho transport."""
+        if transport_driver_as_str and transport_driver_as_str.lower() != "paho":
+            raise ValueError(f"The asyncio runtime only supports the paho mqtt transport, not: {transport_driver_as_str}")
+
+    def on_connect(self, client, userdata, flags, rc):
+        super().on_connect(client, userdata, flags, rc)
+        if rc == 0:
+            self._reconnect_delay = self._min_reconnect_delay
+            for topic, qos in self._subscriptions.items():
+                self._client.subscribe(topic, qos=qos)
+
+    def on_message(self, client, userdata, msg):
+        """Callback when a message is received, this runs on the event loop."""
+        self._logger.info(f"Received message on topic '{msg.topic}' with QoS {msg.qos}")
+
+        self._message_list.put_nowait({
+            'topic': msg.topic,
+            'payload': MQTTManager.decode_payload(msg.payload),
+            'qos': msg.qos
+        })
+
+    def connect(self):
+        """Connect to the MQTT broker, has to be called from within the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._logger.info(f"Attempting to connect to MQTT broker at {self._broker_address}:{self._port}")
+        self._paho.connect(self._broker_address, self._port, self._keepalive)
+        if self._misc_task is None:
+            self._misc_task = self._loop.create_task(self._misc_loop())
+
+    def disconnect(self):
+        """Disconnect from the MQTT broker, the client doesn't reconnect anymore."""
+        self._stopping = True
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+        self._paho.disconnect()
+        self._logger.info("Disconnected from MQTT Broker.")
+
+    def subscribe(self, topic, qos=0):
+        """Subscribe to a specific topic, also after a reconnect."""
+        self._subscriptions[topic] = qos
+        if self._client.is_connected():
+            self._client.subscribe(topic, qos=qos)
+        self._logger.info(f"Subscribed to topic '{topic}' with QoS {qos}")
+
+    def unsubscribe(self, topic):
+        """Unsubscribe from a specific topic."""
+        self._subscriptions.pop(topic, None)
+        super().unsubscribe(topic)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._loop.add_reader(sock, client.loop_read)
+
+    def _on_socket_close(self, client, userdata, sock):
+        # also when the connection drops, the misc loop then reconnects and the new socket is registered again
+        self._loop.remove_reader(sock)
+        self._loop.remove_writer(sock)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._loop.add_writer(sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._loop.remove_writer(sock)
+
+    async def _misc_loop(self):
+        # keepalive pings, retries and reconnects, paho's own thread does this in loop_start()
+        try:
+            while not self._stopping:
+                if self._paho.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+                    await asyncio.sleep(1)
+                    continue
+                await asyncio.sleep(self._reconnect_delay)
+                if self._stopping:
+                    break
+                self._reconnect()
+        except asyncio.CancelledError:
+            pass
+
+    def _reconnect(self):
+        try:
+            self._logger.info(f"Reconnecting to MQTT broker at {self._broker_address}:{self._port}")
+            self._paho.reconnect()  # opens a new socket, _on_socket_open registers it with the loop
+        except OSError as e:
+            self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
+            self._logger.warning(f"Reconnecting failed, trying again in {self._reconnect_delay}s: {e}")
@@ -1,33 +1,60 @@
+import threading
 from logging import Logger
-import paho.mqtt.client as mqtt
 from queue import Queue
 
+from lib.mqtt.mqtt_transport import MqttTransport
+
 
 class MQTTManager:
-    def __init__(self, broker_address="localhost", port=1883, keepalive=60, logger: Logger = None, message_list: Queue = Queue()):
+    def __init__(self, broker_address="localhost", port=1883, keepalive=60, logger: Logger = None, message_list: Queue = Queue(),
+                 transport: MqttTransport = None):
         self._broker_address = broker_address
         self._port = port
         self._keepalive = keepalive
-        self._client = mqtt.Client()
+        self._client = transport or MQTTManager._create_paho_transport()
         self._logger = logger or Logger(__name__)
         self._message_list = message_list
+        self._connected = threading.Event()
 
         # MQTT Callbacks
         self._client.on_connect = self.on_connect
+        self._client.on_disconnect = self.on_disconnect
         self._client.on_message = self.on_message
 
+    @staticmethod
+    def _create_paho_transport() -> MqttTransport:
+        from lib.mqtt.transports.paho_transport import PahoTransport
+        return PahoTransport()
+
+    @property
+    def transport(self) -> MqttTransport:
+        return self._client
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    def wait_until_connected(self, timeout: float = None) -> bool:
+        return self._connected.wait(timeout)
+
     def on_connect(self, client, userdata, flags, rc):
         """Callback when the client connects to the broker."""
         if rc == 0:
+            self._connected.set()
             self._logger.info("Connected to MQTT Broker!")
         else:
             self._logger.warning(f"Failed to connect, return code {rc}")
 
+    def on_disconnect(self, client, userdata, rc):
+        """Callback when the client loses the connection, paho reconnects by itself."""
+        self._connected.clear()
+        if rc != 0:
+            self._logger.warning(f"Lost the connection to the MQTT broker, return code {rc}")
+
     def on_message(self, client, userdata, msg):
         """Callback when a message is received from the broker."""
-        self._logger.info(f"Received message '{msg.payload.decode()}' on topic '{msg.topic}' with QoS {msg.qos}")
-
-        message = msg.payload.decode()
+        message = MQTTManager.decode_payload(msg.payload)
+        self._logger.info(f"Received message '{message}' on topic '{msg.topic}' with QoS {msg.qos}")
 
         self._message_list.put({
             'topic': msg.topic,
@@ -35,15 +62,26 @@ class MQTTManager:
             'qos': msg.qos
         })
 
+    @staticmethod
+    def decode_payload(payload: bytes):
+        """Text payloads are decoded, binary payloads (see SensorDataPayload.to_bytes) are kept as bytes."""
+        try:
+            return payload.decode()
+        except UnicodeDecodeError:
+            return payload
+
     def connect(self):
         """Connect to the MQTT broker."""
-        self._client.connect(self._broker_address, self._port, self._keepalive)
-        self._client.loop_start()  # Starts a new thread to process network traffic
+        self._client.connect(self._broker_address, self._port, self._keepalive)  # the transport handles the traffic in the background
         self._logger.info(f"Attempting to connect to MQTT broker at {self._broker_address}:{self._port}")
 
+    def connect_async(self):
+        """Connect in the background, the broker doesn't have to be reachable yet. The transport keeps retrying."""
+        self._client.connect_async(self._broker_address, self._port, self._keepalive)
+        self._logger.info(f"Connecting in the background to MQTT broker at {self._broker_address}:{self._port}")
+
     def disconnect(self):
         """Disconnect from the MQTT broker."""
-        self._client.loop_stop()  # Stop the loop
         self._client.disconnect()
         self._logger.info("Disconnected from MQTT Broker.")
 
@@ -59,5 +97,6 @@ class MQTTManager:
 
     def publish(self, topic, payload, qos=0, retain=False):
         """Publish a message to a specific topic."""
-        self._client.publish(topic, payload, qos=qos, retain=retain)
+        message_info = self._client.publish(topic, payload, qos=qos, retain=retain)
         self._logger.info(f"Published message '{payload}' to topic '{topic}' with QoS {qos}")
+        return message_info
@@ -4,6 +4,7 @@ class MqttTopic:
 
     def __init__(self, digital_id: str) -> None:
         self._internal_sensor_data_topic = f"/{digital_id}/sensor_data/"
+        self._sensor_data_batch_topic = f"/{digital_id}/sensor_data_batch/"
         self._set_heater_values = f"/{digital_id}/set_heater_values/"
         self._set_steamer_values = f"/{digital_id}/set_steamer_values/"
 
@@ -11,6 +12,10 @@ class MqttTopic:
     def sensor_data_topic(self):
         return self._internal_sensor_data_topic
 
+    @property
+    def sensor_data_batch_topic(self):
+        return self._sensor_data_batch_topic
+
     @property
     def set_heater_values(self):
         return self._set_heater_values
@@ -18,3 +23,12 @@ class MqttTopic:
     @property
     def set_steamer_values(self):
         return self._set_steamer_values
+
+    @staticmethod
+    def wildcard() -> 'MqttTopic':
+        """Topics that match every digital id, e.g. `/+/sensor_data/`."""
+        return MqttTopic("+")
+
+    @staticmethod
+    def digital_id_from_topic(topic: str) -> str:
+        return topic.strip("/").split("/")[0]
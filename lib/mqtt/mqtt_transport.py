@@ -0,0 +1,33 @@
+class MqttTransport:
+    """
+    The part of an MQTT client that MQTTManager uses. The callbacks are called like the ones of paho
+    (callback api version 1): on_connect(client, userdata, flags, rc), on_disconnect(client, userdata, rc)
+    and on_message(client, userdata, message) with a message that has a topic, payload (bytes), qos and retain.
+    """
+    on_connect = None
+    on_disconnect = None
+    on_message = None
+
+    def connect(self, host: str, port: int = 1883, keepalive: int = 60) -> None:
+        """Connects and starts handling the network traffic in the background."""
+        pass
+
+    def connect_async(self, host: str, port: int = 1883, keepalive: int = 60) -> None:
+        """Connects in the background and keeps retrying until the broker is reachable."""
+        pass
+
+    def disconnect(self) -> None:
+        pass
+
+    def is_connected(self) -> bool:
+        return False
+
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        pass
+
+    def unsubscribe(self, topic: str) -> None:
+        pass
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False):
+        """Returns a message info with `wait_for_publish(timeout)` and `is_published()`, like paho."""
+        pass
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class MqttTransportDriver(Enum):
+    PAHO = "PAHO"
+    LOOPBACK = "LOOPBACK"
@@ -0,0 +1,26 @@
+from lib.mqtt.mqtt_transport import MqttTransport
+from lib.mqtt.mqtt_transport_driver import MqttTransportDriver
+
+
+class MqttTransportFactory:
+
+    @staticmethod
+    def create_transport(transport_driver: MqttTransportDriver) -> MqttTransport:
+        if transport_driver == MqttTransportDriver.PAHO:
+            from lib.mqtt.transports.paho_transport import PahoTransport
+            return PahoTransport()
+
+        if transport_driver == MqttTransportDriver.LOOPBACK:
+            from lib.mqtt.transports.loopback_transport import LoopbackTransport
+            return LoopbackTransport()  # talks to the broker of the process
+
+        raise ValueError(f"Unsupported mqtt transport: {transport_driver}")
+
+    @staticmethod
+    def create_transport_from_config(transport_driver_as_str: str) -> MqttTransport:
+        if not transport_driver_as_str or transport_driver_as_str.lower() == "paho":
+            return MqttTransportFactory.create_transport(MqttTransportDriver.PAHO)
+        elif transport_driver_as_str.lower() == "loopback":
+            return MqttTransportFactory.create_transport(MqttTransportDriver.LOOPBACK)
+        else:
+            raise ValueError(f"Unsupported mqtt transport: {transport_driver_as_str}")
@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Union
+
+
+@dataclass
+class OutboxMessage:
+    sequence: int
+    topic: str
+    payload: Union[str, bytes]
+    qos: int
+    created_at: float
+
+
+class Outbox:
+    """
+    Append-only, on-disk log of the messages that still have to be published, stored in SQLite.
+
+    Messages get an increasing sequence number and are read back in that order. Acknowledged messages
+    are only marked; `compact` removes them in one go so the hot path stays a single insert/update.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")  # appends don't block the drainer and vice versa
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                is_text INTEGER NOT NULL,
+                qos INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                acked INTEGER NOT NULL DEFAULT 0
+            )""")
+        self._connection.commit()
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    def append(self, topic: str, payload: Union[str, bytes], qos: int = 1) -> int:
+        is_text = isinstance(payload, str)
+        data = payload.encode() if is_text else bytes(payload)
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO outbox (topic, payload, is_text, qos, created_at) VALUES (?, ?, ?, ?, ?)",
+                (topic, data, int(is_text), qos, time.time()))
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def peek(self, limit: int) -> List[OutboxMessage]:
+        """The oldest `limit` messages that are not acknowledged yet, in order."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT sequence, topic, payload, is_text, qos, created_at FROM outbox "
+                "WHERE acked = 0 ORDER BY sequence LIMIT ?", (limit,)).fetchall()
+        return [OutboxMessage(sequence=sequence,
+                              topic=topic,
+                              payload=payload.decode() if is_text else payload,
+                              qos=qos,
+                              created_at=created_at)
+                for sequence, topic, payload, is_text, qos, created_at in rows]
+
+    def ack(self, up_to_sequence: int) -> None:
+        """Marks every message up to and including `up_to_sequence` as published."""
+        with self._lock:
+            self._connection.execute("UPDATE outbox SET acked = 1 WHERE acked = 0 AND sequence <= ?", (up_to_sequence,))
+            self._connection.commit()
+
+    def compact(self) -> int:
+        """Removes the acknowledged messages, returns how many were removed."""
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM outbox WHERE acked = 1")
+            self._connection.commit()
+            return cursor.rowcount
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM outbox WHERE acked = 0").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
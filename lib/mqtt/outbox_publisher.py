@@ -0,0 +1,120 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Optional, Union
+
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.outbox import Outbox
+from lib.util.latency_stats import LatencyStats
+
+
+@dataclass
+class DrainStats:
+    appended: int = field(default=0)
+    drained: int = field(default=0)
+    drain_time: float = field(default=0.0)  # seconds spent publishing and waiting for the acks
+    compacted: int = field(default=0)
+    publish_latency: LatencyStats = field(default_factory=LatencyStats)  # append until the broker acked
+
+    @property
+    def throughput(self) -> float:
+        """Drained messages per second of draining."""
+        if self.drain_time == 0:
+            return 0.0
+        return self.drained / self.drain_time
+
+    def __str__(self):
+        return (f"DrainStats(appended: {self.appended}, drained: {self.drained}, compacted: {self.compacted}, "
+                f"throughput: {self.throughput:.0f} msg/s, publish latency: {self.publish_latency})")
+
+
+class OutboxPublisher:
+    """
+    Publishes through a durable outbox: `publish` only appends the message to the Outbox on disk, a
+    background thread sends the messages to the broker in order, in batches of at most `batch_size`,
+    with QoS 1 and only acknowledges them in the outbox once the broker has acked them. While the
+    broker is unreachable the messages stay on disk and are replayed after the reconnect.
+    """
+
+    def __init__(self, outbox: Outbox, mqtt_manager: MQTTManager, logger: Optional[Logger] = None,
+                 batch_size: int = 100, ack_timeout: float = 5.0, compact_interval: float = 60.0) -> None:
+        self._outbox = outbox
+        self._mqtt_manager = mqtt_manager
+        self._logger = logger or Logger(__name__)
+        self._batch_size = batch_size
+        self._ack_timeout = ack_timeout
+        self._compact_interval = compact_interval
+        self._stats = DrainStats()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> DrainStats:
+        return self._stats
+
+    @property
+    def outbox(self) -> Outbox:
+        return self._outbox
+
+    def publish(self, topic: str, payload: Union[str, bytes], qos: int = 1, retain: bool = False) -> int:
+        sequence = self._outbox.append(topic, payload, max(qos, 1))
+        self._stats.appended += 1
+        self._wakeup.set()
+        return sequence
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="outbox-drainer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        last_compact = time.monotonic()
+        while self._running:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+
+            while self._running and self._mqtt_manager.is_connected:
+                if self.drain_batch() < self._batch_size:
+                    break
+
+            if time.monotonic() - last_compact >= self._compact_interval:
+                self._stats.compacted += self._outbox.compact()
+                last_compact = time.monotonic()
+
+    def drain_batch(self) -> int:
+        """Publishes the next batch, returns how many messages were acknowledged by the broker."""
+        messages = self._outbox.peek(self._batch_size)
+        if not messages:
+            return 0
+
+        start = time.monotonic()
+        published = [(message, self._mqtt_manager.publish(message.topic, message.payload, qos=message.qos))
+                     for message in messages]
+
+        # only acknowledge the messages before the first one the broker didn't ack, so the order stays intact
+        acked = 0
+        for message, message_info in published:
+            try:
+                message_info.wait_for_publish(self._ack_timeout)
+            except (RuntimeError, ValueError) as e:
+                self._logger.warning(f"Outbox message {message.sequence} was not published: {e}")
+                break
+            if not message_info.is_published():
+                break
+            self._stats.publish_latency.record(time.time() - message.created_at)
+            acked += 1
+
+        if acked > 0:
+            self._outbox.ack(messages[acked - 1].sequence)
+        self._stats.drained += acked
+        self._stats.drain_time += time.monotonic() - start
+        return acked
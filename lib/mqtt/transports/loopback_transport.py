@@ -0,0 +1,254 @@
+import itertools
+import threading
+from dataclasses import dataclass, field
+from logging import Logger
+from queue import Queue
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from lib.mqtt.mqtt_transport import MqttTransport
+
+MQTT_ERR_SUCCESS = 0
+MQTT_ERR_NO_CONN = 4  # same codes as paho
+
+
+@dataclass
+class LoopbackMessage:
+    topic: str
+    payload: bytes
+    qos: int = 0
+    retain: bool = False
+    mid: int = 0
+
+
+class LoopbackMessageInfo:
+    """Like paho's MQTTMessageInfo, the loopback broker acknowledges a message as soon as it is routed."""
+
+    def __init__(self, mid: int, rc: int = MQTT_ERR_SUCCESS) -> None:
+        self.mid = mid
+        self.rc = rc
+        self._published = threading.Event()
+
+    def wait_for_publish(self, timeout: float = None) -> None:
+        if self.rc != MQTT_ERR_SUCCESS:
+            raise RuntimeError(f"Message publish failed: return code {self.rc}")
+        self._published.wait(timeout)
+
+    def is_published(self) -> bool:
+        return self._published.is_set()
+
+    def _set_published(self) -> None:
+        self._published.set()
+
+
+@dataclass
+class _Session:
+    clean_session: bool
+    subscriptions: Dict[str, int] = field(default_factory=dict)
+    pending: List[LoopbackMessage] = field(default_factory=list)  # QoS 1 messages received while offline
+    transport: Optional["LoopbackTransport"] = None
+
+
+class LoopbackBroker:
+    """
+    An MQTT broker in the process itself, for running EnviroSense and EnviroControl together in tests and
+    benchmarks without a network.
+
+    It supports the `+` and `#` wildcards, retained messages and the QoS 0/1 semantics: a message is
+    delivered with the lowest QoS of the publish and the subscription, QoS 0 messages for a client that is
+    offline are dropped and QoS 1 messages are kept for it when it has a persistent session
+    (clean_session=False) and delivered when it reconnects.
+    """
+
+    _shared: Optional["LoopbackBroker"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._sessions: Dict[str, _Session] = {}
+        self._retained: Dict[str, LoopbackMessage] = {}
+        self._mids = itertools.count(1)
+
+    @staticmethod
+    def shared() -> "LoopbackBroker":
+        """The broker of the process, so every loopback transport that doesn't get a broker talks to the same one."""
+        with LoopbackBroker._shared_lock:
+            if LoopbackBroker._shared is None:
+                LoopbackBroker._shared = LoopbackBroker()
+            return LoopbackBroker._shared
+
+    @property
+    def retained(self) -> Dict[str, LoopbackMessage]:
+        with self._lock:
+            return dict(self._retained)
+
+    @staticmethod
+    def topic_matches(topic_filter: str, topic: str) -> bool:
+        filter_levels = topic_filter.split("/")
+        topic_levels = topic.split("/")
+        if topic.startswith("$") and filter_levels[0] in ("+", "#"):
+            return False  # wildcards don't match the system topics
+        for index, filter_level in enumerate(filter_levels):
+            if filter_level == "#":
+                return True
+            if index >= len(topic_levels):
+                return False
+            if filter_level != "+" and filter_level != topic_levels[index]:
+                return False
+        return len(filter_levels) == len(topic_levels)
+
+    def next_mid(self) -> int:
+        return next(self._mids)
+
+    def connect(self, transport: "LoopbackTransport") -> None:
+        with self._lock:
+            session = self._sessions.get(transport.client_id)
+            session_present = session is not None and not transport.clean_session
+            if not session_present:
+                session = _Session(clean_session=transport.clean_session)
+                self._sessions[transport.client_id] = session
+            session.transport = transport
+            transport._deliver_connack(session_present)
+            for message in session.pending:
+                transport._deliver_message(message)
+            session.pending.clear()
+
+    def disconnect(self, transport: "LoopbackTransport") -> None:
+        with self._lock:
+            session = self._sessions.get(transport.client_id)
+            if session is None or session.transport is not transport:
+                return
+            session.transport = None
+            if session.clean_session:
+                del self._sessions[transport.client_id]
+
+    def subscribe(self, transport: "LoopbackTransport", topic_filter: str, qos: int) -> None:
+        with self._lock:
+            self._sessions[transport.client_id].subscriptions[topic_filter] = min(qos, 1)
+            for message in self._retained.values():
+                if LoopbackBroker.topic_matches(topic_filter, message.topic):
+                    transport._deliver_message(LoopbackMessage(message.topic, message.payload,
+                                                               min(message.qos, qos, 1), True, self.next_mid()))
+
+    def unsubscribe(self, transport: "LoopbackTransport", topic_filter: str) -> None:
+        with self._lock:
+            self._sessions[transport.client_id].subscriptions.pop(topic_filter, None)
+
+    def publish(self, topic: str, payload: bytes, qos: int = 0, retain: bool = False) -> None:
+        with self._lock:
+            if retain:
+                if payload:
+                    self._retained[topic] = LoopbackMessage(topic, payload, qos, True)
+                else:
+                    self._retained.pop(topic, None)  # an empty retained message clears the retained one
+
+            for session in self._sessions.values():
+                # overlapping subscriptions get the message once, with the highest QoS of them
+                granted = [subscription_qos for topic_filter, subscription_qos in session.subscriptions.items()
+                           if LoopbackBroker.topic_matches(topic_filter, topic)]
+                if not granted:
+                    continue
+                message = LoopbackMessage(topic, payload, min(qos, max(granted)), False, self.next_mid())
+                if session.transport is not None:
+                    session.transport._deliver_message(message)
+                elif message.qos >= 1 and not session.clean_session:
+                    session.pending.append(message)
+
+
+class LoopbackTransport(MqttTransport):
+    """
+    A client of the LoopbackBroker. Like paho, the callbacks are called on a thread of the transport,
+    never on the thread that publishes.
+    """
+
+    def __init__(self, broker: LoopbackBroker = None, client_id: str = "", clean_session: bool = True,
+                 logger: Logger = None) -> None:
+        self._broker = broker or LoopbackBroker.shared()
+        self._client_id = client_id or f"loopback-{uuid4().hex[:12]}"
+        self._clean_session = clean_session
+        self._logger = logger or Logger(__name__)
+        self._inbox = Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._connected = False
+
+    @property
+    def client_id(self) -> str:
+        return self._client_id
+
+    @property
+    def clean_session(self) -> bool:
+        return self._clean_session
+
+    @property
+    def broker(self) -> LoopbackBroker:
+        return self._broker
+
+    def connect(self, host: str = "loopback", port: int = 1883, keepalive: int = 60) -> None:
+        if self._connected:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"{self._client_id}-callbacks", daemon=True)
+        self._thread.start()
+        self._connected = True
+        self._broker.connect(self)
+
+    def connect_async(self, host: str = "loopback", port: int = 1883, keepalive: int = 60) -> None:
+        self.connect(host, port, keepalive)  # the loopback broker is always reachable
+
+    def disconnect(self) -> None:
+        if not self._connected:
+            return
+        self._connected = False
+        self._broker.disconnect(self)
+        self._inbox.put(lambda: self._callback(self.on_disconnect, None, MQTT_ERR_SUCCESS))
+        self._inbox.put(None)
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        if self._connected:
+            self._broker.subscribe(self, topic, qos)
+
+    def unsubscribe(self, topic: str) -> None:
+        if self._connected:
+            self._broker.unsubscribe(self, topic)
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False) -> LoopbackMessageInfo:
+        message_info = LoopbackMessageInfo(self._broker.next_mid(), MQTT_ERR_SUCCESS if self._connected else MQTT_ERR_NO_CONN)
+        if self._connected:
+            self._broker.publish(topic, LoopbackTransport._to_bytes(payload), qos, retain)
+            message_info._set_published()
+        return message_info
+
+    @staticmethod
+    def _to_bytes(payload) -> bytes:
+        if payload is None:
+            return b""
+        if isinstance(payload, str):
+            return payload.encode()
+        if isinstance(payload, (int, float)):
+            return str(payload).encode()
+        return bytes(payload)
+
+    def _deliver_connack(self, session_present: bool) -> None:
+        self._inbox.put(lambda: self._callback(self.on_connect, None, {"session present": int(session_present)}, MQTT_ERR_SUCCESS))
+
+    def _deliver_message(self, message: LoopbackMessage) -> None:
+        self._inbox.put(lambda: self._callback(self.on_message, None, message))
+
+    def _callback(self, callback, *args) -> None:
+        if callback is not None:
+            callback(self, *args)
+
+    def _run(self) -> None:
+        while True:
+            handler = self._inbox.get()
+            if handler is None:
+                break
+            try:
+                handler()
+            except Exception as e:
+                self._logger.error(f"Error in a callback of {self._client_id}: {e}")
@@ -0,0 +1,46 @@
+import paho.mqtt.client as mqtt
+
+from lib.mqtt.mqtt_transport import MqttTransport
+
+
+class PahoTransport(MqttTransport):
+    """Talks to a real broker with paho, the network traffic is handled by paho's own thread."""
+
+    def __init__(self, client: mqtt.Client = None) -> None:
+        self._client = client or mqtt.Client()
+        self._client.on_connect = lambda client, userdata, flags, rc: self._callback(self.on_connect, userdata, flags, rc)
+        self._client.on_disconnect = lambda client, userdata, rc: self._callback(self.on_disconnect, userdata, rc)
+        self._client.on_message = lambda client, userdata, message: self._callback(self.on_message, userdata, message)
+
+    @property
+    def client(self) -> mqtt.Client:
+        return self._client
+
+    def _callback(self, callback, *args) -> None:
+        if callback is not None:
+            callback(self, *args)
+
+    def connect(self, host: str, port: int = 1883, keepalive: int = 60) -> None:
+        self._client.connect(host, port, keepalive)
+        self._client.loop_start()  # Starts a new thread to process network traffic
+
+    def connect_async(self, host: str, port: int = 1883, keepalive: int = 60) -> None:
+        self._client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self._client.connect_async(host, port, keepalive)
+        self._client.loop_start()
+
+    def disconnect(self) -> None:
+        self._client.loop_stop()
+        self._client.disconnect()
+
+    def is_connected(self) -> bool:
+        return self._client.is_connected()
+
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        self._client.subscribe(topic, qos=qos)
+
+    def unsubscribe(self, topic: str) -> None:
+        self._client.unsubscribe(topic)
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False) -> mqtt.MQTTMessageInfo:
+        return self._client.publish(topic, payload, qos=qos, retain=retain)
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Iterable, Tuple, Union
+
+import numpy as np
+
+from lib.sensor_drivers.bme280.bme280_driver import UncompensatedReadings
+
+Blocks = Union[np.ndarray, bytes, Iterable[UncompensatedReadings], Iterable[bytes]]
+
+
+@dataclass
+class CompensatedBatch:
+    temperature: np.ndarray  # °C
+    pressure: np.ndarray  # hPa
+    humidity: np.ndarray  # %rH
+
+    def __len__(self):
+        return len(self.temperature)
+
+
+class BatchCompensation:
+    """
+    Compensates many raw BME280 data blocks (0xF7..0xFE) at once, e.g. to reprocess a log of raw
+    readings with other calibration parameters. The floating point path does the same float64
+    operations as CompensatedReadings and the fixed point path the same integer operations as
+    FixedPointCompensatedReadings, so every sample gives the same result as the scalar classes.
+    """
+
+    def __init__(self, compensation_params: dict) -> None:
+        self._comp = {name: int(value) for name, value in compensation_params.items()}
+
+    @staticmethod
+    def decode(blocks: Blocks) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The raw pressure, temperature and humidity of an (n, 8) array, raw bytes or UncompensatedReadings."""
+        if isinstance(blocks, (bytes, bytearray)):
+            blocks = np.frombuffer(blocks, dtype=np.uint8).reshape(-1, 8)
+        elif not isinstance(blocks, np.ndarray):
+            blocks = np.array([block.block if isinstance(block, UncompensatedReadings) else list(block)
+                               for block in blocks], dtype=np.uint8).reshape(-1, 8)
+        blocks = blocks.astype(np.int64)
+        pressure = (blocks[:, 0] << 12) | (blocks[:, 1] << 4) | (blocks[:, 2] >> 4)
+        temperature = (blocks[:, 3] << 12) | (blocks[:, 4] << 4) | (blocks[:, 5] >> 4)
+        humidity = (blocks[:, 6] << 8) | blocks[:, 7]
+        return pressure, temperature, humidity
+
+    def compensate(self, blocks: Blocks, fixed_point: bool = False) -> CompensatedBatch:
+        pressure, temperature, humidity = self.decode(blocks)
+        if fixed_point:
+            return self._compensate_fixed_point(pressure, temperature, humidity)
+        return self._compensate_float(pressure, temperature, humidity)
+
+    def _compensate_float(self, p: np.ndarray, t: np.ndarray, h: np.ndarray) -> CompensatedBatch:
+        c = self._comp
+        v1 = (t / 16384.0 - c["dig_T1"] / 1024.0) * c["dig_T2"]
+        v2 = ((t / 131072.0 - c["dig_T1"] / 8192.0) ** 2) * c["dig_T3"]
+        t_fine = v1 + v2
+
+        res = t_fine - 76800.0
+        res = (h - (c["dig_H4"] * 64.0 + c["dig_H5"] / 16384.0 * res)) * (c["dig_H2"] / 65536.0 * (1.0 + c["dig_H6"] / 67108864.0 * res * (1.0 + c["dig_H3"] / 67108864.0 * res)))
+        res = res * (1.0 - (c["dig_H1"] * res / 524288.0))
+        humidity = np.clip(res, 0.0, 100.0)
+
+        v1 = t_fine / 2.0 - 64000.0
+        v2 = v1 * v1 * c["dig_P6"] / 32768.0
+        v2 = v2 + v1 * c["dig_P5"] * 2.0
+        v2 = v2 / 4.0 + c["dig_P4"] * 65536.0
+        v1 = (c["dig_P3"] * v1 * v1 / 524288.0 + c["dig_P2"] * v1) / 524288.0
+        v1 = (1.0 + v1 / 32768.0) * c["dig_P1"]
+        zero = v1 == 0
+        v1 = np.where(zero, 1.0, v1)  # Prevent divide by zero
+
+        res = 1048576.0 - p
+        res = ((res - v2 / 4096.0) * 6250.0) / v1
+        v1 = c["dig_P9"] * res * res / 2147483648.0
+        v2 = res * c["dig_P8"] / 32768.0
+        res = res + (v1 + v2 + c["dig_P7"]) / 16.0
+        pressure = np.where(zero, 0.0, res) / 100.0
+
+        return CompensatedBatch(temperature=t_fine / 5120.0, pressure=pressure, humidity=humidity)
+
+    def _compensate_fixed_point(self, p: np.ndarray, t: np.ndarray, h: np.ndarray) -> CompensatedBatch:
+        # int64 throughout, the datasheet's int32 intermediate values fit in it without change
+        c = self._comp
+        v1 = (((t >> 3) - (c["dig_T1"] << 1)) * c["dig_T2"]) >> 11
+        v2 = (((((t >> 4) - c["dig_T1"]) * ((t >> 4) - c["dig_T1"])) >> 12) * c["dig_T3"]) >> 14
+        t_fine = v1 + v2
+        temperature = ((t_fine * 5 + 128) >> 8) / 100.0
+
+        res = t_fine - 76800
+        res = (((((h << 14) - (c["dig_H4"] << 20) - (c["dig_H5"] * res)) + 16384) >> 15)
+               * (((((((res * c["dig_H6"]) >> 10) * (((res * c["dig_H3"]) >> 11) + 32768)) >> 10)
+                    + 2097152) * c["dig_H2"] + 8192) >> 14))
+        res = res - (((((res >> 15) * (res >> 15)) >> 7) * c["dig_H1"]) >> 4)
+        humidity = (np.clip(res, 0, 419430400) >> 12) / 1024.0
+
+        v1 = t_fine - 128000
+        v2 = v1 * v1 * c["dig_P6"]
+        v2 = v2 + ((v1 * c["dig_P5"]) << 17)
+        v2 = v2 + (c["dig_P4"] << 35)
+        v1 = ((v1 * v1 * c["dig_P3"]) >> 8) + ((v1 * c["dig_P2"]) << 12)
+        v1 = (((1 << 47) + v1) * c["dig_P1"]) >> 33
+        zero = v1 == 0
+        v1 = np.where(zero, 1, v1)  # Prevent divide by zero
+
+        res = 1048576 - p
+        dividend = ((res << 31) - v2) * 3125
+        # C rounds an integer division towards zero, NumPy's // towards minus infinity
+        res = np.abs(dividend) // np.abs(v1) * np.sign(dividend) * np.sign(v1)
+        v1 = (c["dig_P9"] * (res >> 13) * (res >> 13)) >> 25
+        v2 = (c["dig_P8"] * res) >> 19
+        res = ((res + v1 + v2) >> 8) + (c["dig_P7"] << 4)
+        pressure = np.where(zero, 0, res) / 25600.0
+
+        return CompensatedBatch(temperature=temperature, pressure=pressure, humidity=humidity)
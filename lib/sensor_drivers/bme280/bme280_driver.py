@@ -1,11 +1,26 @@
+import struct
 import time
 from enum import Enum
+from typing import Dict, List, Optional
 
 from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.bme280.calibration_cache import CalibrationCache
 from lib.sensor_drivers.sensor_interface import SensorInterface
 
 
 DEFAULT_PORT = 0x76
+CHIP_ID_REGISTER = 0xD0
+CTRL_HUM_REGISTER = 0xF2
+CTRL_MEAS_REGISTER = 0xF4
+CONFIG_REGISTER = 0xF5
+
+# pressure, temperature and humidity are read in one burst from 0xF7..0xFE
+DATA_BLOCK = (0xF7, 8)
+
+# the calibration is stored in two blocks: 0x88..0xA1 (temperature, pressure and dig_H1) and 0xE1..0xE7 (humidity)
+CALIBRATION_BLOCK_1 = (0x88, 26)
+CALIBRATION_BLOCK_2 = (0xE1, 7)
+_CALIBRATION_LAYOUT_1 = struct.Struct("<HhhHhhhhhhhh")
 
 
 class SampleModes(Enum):
@@ -16,6 +31,48 @@ class SampleModes(Enum):
     SAMPLE_X16 = 5
 
 
+class OperatingMode(Enum):
+    SLEEP = 0
+    FORCED = 1
+    NORMAL = 3
+
+
+class StandbyTime(Enum):
+    """Inactive time between two measurements in normal mode (t_sb in the config register)."""
+    STANDBY_0_5_MS = 0
+    STANDBY_62_5_MS = 1
+    STANDBY_125_MS = 2
+    STANDBY_250_MS = 3
+    STANDBY_500_MS = 4
+    STANDBY_1000_MS = 5
+    STANDBY_10_MS = 6
+    STANDBY_20_MS = 7
+
+    @property
+    def seconds(self) -> float:
+        return _STANDBY_SECONDS[self]
+
+    @staticmethod
+    def from_milliseconds(milliseconds: float) -> "StandbyTime":
+        return min(StandbyTime, key=lambda standby: abs(standby.seconds * 1000 - milliseconds))
+
+
+_STANDBY_SECONDS = {
+    StandbyTime.STANDBY_0_5_MS: 0.0005, StandbyTime.STANDBY_62_5_MS: 0.0625, StandbyTime.STANDBY_125_MS: 0.125,
+    StandbyTime.STANDBY_250_MS: 0.25, StandbyTime.STANDBY_500_MS: 0.5, StandbyTime.STANDBY_1000_MS: 1.0,
+    StandbyTime.STANDBY_10_MS: 0.01, StandbyTime.STANDBY_20_MS: 0.02,
+}
+
+
+class FilterCoefficient(Enum):
+    """IIR filter on the temperature and pressure (not the humidity), it suppresses short disturbances."""
+    OFF = 0
+    X2 = 1
+    X4 = 2
+    X8 = 3
+    X16 = 4
+
+
 class Reader(object):
     """
     Wraps a I2C SMBus instance to provide methods for reading
@@ -49,6 +106,10 @@ class UncompensatedReadings(object):
         self.temperature = (block[3] << 16 | block[4] << 8 | block[5]) >> 4
         self.humidity = block[6] << 8 | block[7]
 
+    @property
+    def block(self):
+        return self._block
+
     def __repr__(self):
         return "uncompensated_reading(temp=0x{0:08X}, pressure=0x{1:08X}, humidity=0x{2:08X}, block={3})".format(
             self.temperature, self.pressure, self.humidity,
@@ -72,25 +133,25 @@ class CompensatedReadings(object):
     def __init__(self, raw_readings, compensation_params):
         self._comp = compensation_params
         self.uncompensated = raw_readings
-        self.temperature = self.__tfine(raw_readings.temperature) / 5120.0
-        self.humidity = self.__calc_humidity(raw_readings.humidity,
-                                             raw_readings.temperature)
-        self.pressure = self.__calc_pressure(raw_readings.pressure,
-                                             raw_readings.temperature) / 100.0
+        # the humidity and pressure compensation both depend on the fine temperature, it is calculated once
+        t_fine = self.__tfine(raw_readings.temperature)
+        self.temperature = t_fine / 5120.0
+        self.humidity = self.__calc_humidity(raw_readings.humidity, t_fine)
+        self.pressure = self.__calc_pressure(raw_readings.pressure, t_fine) / 100.0
 
     def __tfine(self, t):
         v1 = (t / 16384.0 - self._comp.dig_T1 / 1024.0) * self._comp.dig_T2
         v2 = ((t / 131072.0 - self._comp.dig_T1 / 8192.0) ** 2) * self._comp.dig_T3
         return v1 + v2
 
-    def __calc_humidity(self, h, t):
-        res = self.__tfine(t) - 76800.0
+    def __calc_humidity(self, h, t_fine):
+        res = t_fine - 76800.0
         res = (h - (self._comp.dig_H4 * 64.0 + self._comp.dig_H5 / 16384.0 * res)) * (self._comp.dig_H2 / 65536.0 * (1.0 + self._comp.dig_H6 / 67108864.0 * res * (1.0 + self._comp.dig_H3 / 67108864.0 * res)))
         res = res * (1.0 - (self._comp.dig_H1 * res / 524288.0))
         return max(0.0, min(res, 100.0))
 
-    def __calc_pressure(self, p, t):
-        v1 = self.__tfine(t) / 2.0 - 64000.0
+    def __calc_pressure(self, p, t_fine):
+        v1 = t_fine / 2.0 - 64000.0
         v2 = v1 * v1 * self._comp.dig_P6 / 32768.0
         v2 = v2 + v1 * self._comp.dig_P5 * 2.0
         v2 = v2 / 4.0 + self._comp.dig_P4 * 65536.0
@@ -113,6 +174,64 @@ class CompensatedReadings(object):
                 .format(self.temperature, self.pressure, self.humidity))
 
 
+class FixedPointCompensatedReadings(object):
+    """
+    The integer compensation of the BME280 datasheet (4.2.3): 32-bit for the temperature and the
+    humidity, 64-bit for the pressure. It gives the same results as the firmware of most other BME280
+    drivers and doesn't need a floating point unit; the resolution is 0.01 °C, 1/256 Pa and 1/1024 %rH.
+    """
+
+    def __init__(self, raw_readings, compensation_params):
+        self._comp = compensation_params
+        self.uncompensated = raw_readings
+        t_fine = self.__tfine(raw_readings.temperature)
+        self.temperature = ((t_fine * 5 + 128) >> 8) / 100.0
+        self.humidity = self.__calc_humidity(raw_readings.humidity, t_fine) / 1024.0
+        self.pressure = self.__calc_pressure(raw_readings.pressure, t_fine) / 25600.0
+
+    def __tfine(self, t):
+        v1 = (((t >> 3) - (self._comp.dig_T1 << 1)) * self._comp.dig_T2) >> 11
+        v2 = (((((t >> 4) - self._comp.dig_T1) * ((t >> 4) - self._comp.dig_T1)) >> 12) * self._comp.dig_T3) >> 14
+        return v1 + v2
+
+    def __calc_humidity(self, h, t_fine):
+        res = t_fine - 76800
+        res = (((((h << 14) - (self._comp.dig_H4 << 20) - (self._comp.dig_H5 * res)) + 16384) >> 15)
+               * (((((((res * self._comp.dig_H6) >> 10) * (((res * self._comp.dig_H3) >> 11) + 32768)) >> 10)
+                    + 2097152) * self._comp.dig_H2 + 8192) >> 14))
+        res = res - (((((res >> 15) * (res >> 15)) >> 7) * self._comp.dig_H1) >> 4)
+        res = max(0, min(res, 419430400))
+        return res >> 12
+
+    def __calc_pressure(self, p, t_fine):
+        v1 = t_fine - 128000
+        v2 = v1 * v1 * self._comp.dig_P6
+        v2 = v2 + ((v1 * self._comp.dig_P5) << 17)
+        v2 = v2 + (self._comp.dig_P4 << 35)
+        v1 = ((v1 * v1 * self._comp.dig_P3) >> 8) + ((v1 * self._comp.dig_P2) << 12)
+        v1 = (((1 << 47) + v1) * self._comp.dig_P1) >> 33
+
+        # Prevent divide by zero
+        if v1 == 0:
+            return 0
+
+        res = 1048576 - p
+        res = _truncating_division(((res << 31) - v2) * 3125, v1)
+        v1 = (self._comp.dig_P9 * (res >> 13) * (res >> 13)) >> 25
+        v2 = (self._comp.dig_P8 * res) >> 19
+        return ((res + v1 + v2) >> 8) + (self._comp.dig_P7 << 4)
+
+    def __repr__(self):
+        return ("compensated_reading(temp={0:0.2f} °C, pressure={1:0.2f} hPa, humidity={2:0.2f} % rH)"
+                .format(self.temperature, self.pressure, self.humidity))
+
+
+def _truncating_division(dividend: int, divisor: int) -> int:
+    # C rounds an integer division towards zero, Python's // towards minus infinity
+    quotient = abs(dividend) // abs(divisor)
+    return quotient if (dividend < 0) == (divisor < 0) else -quotient
+
+
 class Params(dict):
     __getattr__ = dict.__getitem__
     __setattr__ = dict.__setitem__
@@ -131,12 +250,44 @@ class Memoize:
 
 
 class Bme280(SensorInterface):
-    def __init__(self, bus, address=DEFAULT_PORT, sampling=SampleModes.SAMPLE_X1) -> None:
+    """
+    In forced mode (the default) every reading starts a measurement and waits for it. In normal mode
+    the sensor measures continuously, one measurement every `sampling_period`, and a reading is only
+    a block read of the latest result.
+    """
+
+    def __init__(self, bus, address=DEFAULT_PORT, sampling=SampleModes.SAMPLE_X1,
+                 calibration_cache: Optional[CalibrationCache] = None, bus_id=None,
+                 mode: OperatingMode = OperatingMode.FORCED, standby: StandbyTime = StandbyTime.STANDBY_62_5_MS,
+                 iir_filter: FilterCoefficient = FilterCoefficient.OFF, fixed_point: bool = False) -> None:
         self._bus = bus
         self._address = address
+        self._calibration_cache = calibration_cache
+        self._bus_id = bus_id
 
         self._compensation_params = self.load_calibration_params()
         self._sampling = sampling
+        self._mode = mode
+        self._standby = standby
+        self._iir_filter = iir_filter
+        self._compensation = FixedPointCompensatedReadings if fixed_point else CompensatedReadings
+
+        if self._mode == OperatingMode.NORMAL:
+            self._start_normal_mode()
+
+    @property
+    def mode(self) -> OperatingMode:
+        return self._mode
+
+    @property
+    def measurement_time(self) -> float:
+        oversampling = self._sampling.value or SampleModes.SAMPLE_X1.value
+        return self.__calc_delay(oversampling, oversampling, oversampling)
+
+    @property
+    def sampling_period(self) -> float:
+        """Time between two new results in normal mode, reading faster returns the same result again."""
+        return self.measurement_time + self._standby.seconds
 
     def load_calibration_params(self):
         """
@@ -147,7 +298,46 @@ class Bme280(SensorInterface):
         The calibration parameters are subsequently used to with some compensation
         formula to perform temperature readout in degC, humidity in % and pressure
         in hPA.
+
+        With a calibration cache a known sensor is only verified (its chip id and dig_T1), otherwise
+        the parameters are read in two block transfers and stored in the cache.
         """
+        key = None
+        if self._calibration_cache is not None:
+            chip_id = self._bus.read_byte_data(self._address, CHIP_ID_REGISTER)
+            key = CalibrationCache.key(self._bus_id, self._address, chip_id)
+            cached = self._calibration_cache.get(key)
+            # dig_T1 differs from chip to chip, so a sensor that was swapped isn't mistaken for the cached one
+            if cached is not None and Reader(self._bus, self._address).unsigned_short(0x88) == cached["dig_T1"]:
+                return Params(cached)
+
+        try:
+            compensation_params = self._read_calibration_blocks()
+        except (OSError, NotImplementedError):
+            # some i2c adapters don't support block reads, fall back to a read per register
+            compensation_params = self._read_calibration_registers()
+
+        if self._calibration_cache is not None:
+            self._calibration_cache.put(key, compensation_params)
+        return compensation_params
+
+    def _read_calibration_blocks(self) -> Params:
+        block_1 = bytes(self._bus.read_i2c_block_data(self._address, *CALIBRATION_BLOCK_1))
+        block_2 = bytes(self._bus.read_i2c_block_data(self._address, *CALIBRATION_BLOCK_2))
+        compensation_params = Params(zip(["dig_T1", "dig_T2", "dig_T3", "dig_P1", "dig_P2", "dig_P3", "dig_P4",
+                                          "dig_P5", "dig_P6", "dig_P7", "dig_P8", "dig_P9"],
+                                         _CALIBRATION_LAYOUT_1.unpack_from(block_1)))
+
+        compensation_params.dig_H1 = block_1[0xA1 - 0x88]
+        compensation_params.dig_H2, h3, e4, e5, e6, h6 = struct.unpack("<hbbbbb", block_2)
+        # the same decoding as the register reads below
+        compensation_params.dig_H3 = h3
+        compensation_params.dig_H4 = e4 << 4 | e5 & 0x0F
+        compensation_params.dig_H5 = ((e5 >> 4) & 0x0F) | (e6 << 4)
+        compensation_params.dig_H6 = h6
+        return compensation_params
+
+    def _read_calibration_registers(self) -> Params:
         read = Reader(self._bus, self._address)
         compensation_params = Params()
 
@@ -188,6 +378,22 @@ class Bme280(SensorInterface):
         p_delay = 0.001250 + 0.0023 * (1 << p_oversampling)
         return t_delay + h_delay + p_delay
 
+    def _start_normal_mode(self) -> None:
+        oversampling = self._sampling.value or SampleModes.SAMPLE_X1.value
+        # writes to the config register are only guaranteed to be taken in sleep mode, and a ctrl_hum
+        # change only becomes effective after a write to ctrl_meas
+        self._bus.write_byte_data(self._address, CTRL_MEAS_REGISTER, OperatingMode.SLEEP.value)
+        self._bus.write_byte_data(self._address, CTRL_HUM_REGISTER, oversampling)
+        self._bus.write_byte_data(self._address, CONFIG_REGISTER, self._standby.value << 5 | self._iir_filter.value << 2)
+        self._bus.write_byte_data(self._address, CTRL_MEAS_REGISTER,
+                                  oversampling << 5 | oversampling << 2 | OperatingMode.NORMAL.value)
+        # wait once for the first measurement, the data registers hold their reset values until then
+        time.sleep(self.measurement_time)
+
+    @property
+    def compensation_params(self) -> Params:
+        return self._compensation_params
+
     def _sample(self) -> CompensatedReadings:
         """
         Primes the sensor for reading (default: x1 oversampling), pauses for a set
@@ -198,21 +404,56 @@ class Bme280(SensorInterface):
           * temperature (in degrees Celsius)
           * humidity (in % relative humidity)
           * pressure (in hPa)
+
+        In normal mode the sensor is already measuring, the latest result is read without waiting.
         """
+        delay = self._start_measurement()
+        if delay > 0:
+            time.sleep(delay)
+        return self._compensate(self._bus.read_i2c_block_data(self._address, *DATA_BLOCK))
+
+    def _start_measurement(self) -> float:
+        """Starts a measurement in forced mode and returns how long it takes, in normal mode the sensor is already measuring."""
+        if self._mode == OperatingMode.NORMAL:
+            return 0.0
 
-        mode = 1  # forced
+        mode = OperatingMode.FORCED.value
         t_oversampling = self._sampling.value or SampleModes.SAMPLE_X1.value
         h_oversampling = self._sampling.value or SampleModes.SAMPLE_X1.value
         p_oversampling = self._sampling.value or SampleModes.SAMPLE_X1.value
 
-        self._bus.write_byte_data(self._address, 0xF2, h_oversampling)  # ctrl_hum
-        self._bus.write_byte_data(self._address, 0xF4, t_oversampling << 5 | p_oversampling << 2 | mode)  # ctrl
-        delay = self.__calc_delay(t_oversampling, h_oversampling, p_oversampling)
-        time.sleep(delay)
+        self._bus.write_byte_data(self._address, CTRL_HUM_REGISTER, h_oversampling)
+        self._bus.write_byte_data(self._address, CTRL_MEAS_REGISTER, t_oversampling << 5 | p_oversampling << 2 | mode)
+        return self.__calc_delay(t_oversampling, h_oversampling, p_oversampling)
 
-        block = self._bus.read_i2c_block_data(self._address, 0xF7, 8)
-        raw_data = UncompensatedReadings(block)
-        return CompensatedReadings(raw_data, self._compensation_params)
+    def _compensate(self, block) -> CompensatedReadings:
+        return self._compensation(UncompensatedReadings(block), self._compensation_params)
+
+    @staticmethod
+    def read_many(sensors: List["Bme280"]) -> List[SensorData]:
+        """
+        Reads several sensors in one pass: the measurements of all sensors in forced mode are started
+        first and waited for once, then the data blocks of the sensors that share a bus with
+        `read_blocks` (see SharedI2cBus) are read without other transactions in between.
+        """
+        delay = max([sensor._start_measurement() for sensor in sensors], default=0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        blocks = {}
+        by_bus: Dict[int, List[int]] = {}
+        for index, sensor in enumerate(sensors):
+            by_bus.setdefault(id(sensor._bus), []).append(index)
+        for indexes in by_bus.values():
+            bus = sensors[indexes[0]]._bus
+            if hasattr(bus, "read_blocks"):
+                reads = bus.read_blocks([(sensors[index]._address, *DATA_BLOCK) for index in indexes])
+            else:
+                reads = [bus.read_i2c_block_data(sensors[index]._address, *DATA_BLOCK) for index in indexes]
+            blocks.update(zip(indexes, reads))
+
+        readings = [sensor._compensate(blocks[index]) for index, sensor in enumerate(sensors)]
+        return [SensorData(temperature=data.temperature, pressure=data.pressure, humidity=data.humidity) for data in readings]
 
     def get_sensor_data(self) -> SensorData:
         data = self._sample()
@@ -0,0 +1,45 @@
+import json
+import os
+import threading
+from typing import Optional
+
+
+class CalibrationCache:
+    """
+    The decoded calibration parameters of BME280 sensors in a json file, keyed by bus, address and
+    chip id. The calibration is trimmed in the factory and never changes, so it only has to be read
+    from the sensor once.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self._file_path = file_path
+        self._lock = threading.Lock()
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @staticmethod
+    def key(bus_id, address: int, chip_id: int) -> str:
+        return f"{bus_id}:0x{address:02X}:0x{chip_id:02X}"
+
+    def _load(self) -> dict:
+        try:
+            with open(self._file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, params: dict) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = dict(params)
+            # write next to the cache and rename, so a crash never leaves half a file behind
+            temporary_path = f"{self._file_path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file, indent=2, sort_keys=True)
+            os.replace(temporary_path, self._file_path)
@@ -1,4 +1,8 @@
 import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from lib.domain.sensor_data import SensorData
 from lib.sensor_drivers.sensor_interface import SensorInterface
@@ -12,29 +16,123 @@ except ImportError:
     LIBRARY_AVAILABLE = False
 
 
+@dataclass
+class Dht22Reading:
+    sensor_data: SensorData
+    taken_at: float  # time.monotonic() of the read
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+
 class Dht22(SensorInterface):
+    """
+    The DHT22 can't be read more often than every 2 seconds and a read often fails. A background thread
+    reads the sensor every `interval` seconds (never faster than the sensor allows) and backs off after
+    failed reads; `get_sensor_data()` returns the latest good reading at once, as long as it isn't older
+    than `max_age`. `get_timed_sensor_data()` also returns when that reading was taken.
+    """
+
+    MIN_INTERVAL = 2.0
 
-    def __init__(self, gpio_pin: int):
+    def __init__(self, gpio_pin: int, interval: float = MIN_INTERVAL, max_age: float = 10.0,
+                 max_backoff: float = 60.0, first_read_timeout: float = 5.0) -> None:
         self._sensor = Adafruit_DHT.DHT22 if LIBRARY_AVAILABLE else None
         self._gpio_pin = gpio_pin
+        self._interval = max(interval, self.MIN_INTERVAL)
+        self._max_age = max_age
+        self._max_backoff = max(max_backoff, self._interval)
+        self._first_read_timeout = first_read_timeout
+
+        # the sampler replaces the reading as a whole, so readers never need a lock
+        self._latest: Optional[Dht22Reading] = None
+        self._first_read = threading.Event()
+        self._stopped = threading.Event()
+        self._reads = 0
+        self._failures = 0
+        self._consecutive_failures = 0
+
+        self._thread = threading.Thread(target=self._sample, name=f"dht22-{gpio_pin}", daemon=True)
+        self._thread.start()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def reads(self) -> int:
+        return self._reads
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._consecutive_failures
+
+    @property
+    def latest(self) -> Optional[Dht22Reading]:
+        return self._latest
 
     def _read_data(self) -> SensorData:
         if LIBRARY_AVAILABLE:
             humidity, temperature = Adafruit_DHT.read(self._sensor, self._gpio_pin)
+            if humidity is None or temperature is None:
+                raise IOError(f"No answer from the DHT22 on gpio {self._gpio_pin}")
         else:
             humidity = round(random.uniform(20.0, 90.0), 2)
             temperature = round(random.uniform(15.0, 35.0), 2)
 
+        # the DHT22 has no pressure sensor, the pressure is left at its default
         return SensorData(
             temperature=temperature,
-            pressure=0,
             humidity=humidity
         )
 
+    def _next_delay(self, read_time: float) -> float:
+        if self._consecutive_failures == 0:
+            return max(0.0, self._interval - read_time)
+        # retry after the minimum interval, then back off exponentially
+        return min(self._max_backoff, self._interval * 2 ** (self._consecutive_failures - 1))
+
+    def _sample(self) -> None:
+        while not self._stopped.is_set():
+            started_at = time.monotonic()
+            try:
+                sensor_data = self._read_data()
+            except Exception as e:
+                self._failures += 1
+                self._consecutive_failures += 1
+                if self._consecutive_failures == 1:
+                    print(f"Failed to get sensor data: {e}")
+            else:
+                self._latest = Dht22Reading(sensor_data, started_at)
+                self._consecutive_failures = 0
+                self._first_read.set()
+            self._reads += 1
+            self._stopped.wait(self._next_delay(time.monotonic() - started_at))
+
     def get_sensor_data(self) -> SensorData:
-        try:
-            sensor_data = self._read_data()
-            return sensor_data
-        except Exception as e:
-            print(f"Failed to get sensor data: {e}")
-            return SensorData()  # Return an empty object in case of an error
+        return self._latest_reading().sensor_data
+
+    def get_timed_sensor_data(self) -> Tuple[SensorData, float]:
+        latest = self._latest_reading()
+        return latest.sensor_data, latest.taken_at
+
+    def _latest_reading(self) -> Dht22Reading:
+        latest = self._latest
+        if latest is None:
+            # only right after the start, the first read is still busy
+            self._first_read.wait(self._first_read_timeout)
+            latest = self._latest
+        if latest is None:
+            raise IOError(f"No reading of the DHT22 on gpio {self._gpio_pin} yet")
+        if latest.age > self._max_age:
+            raise IOError(f"The last reading of the DHT22 on gpio {self._gpio_pin} is {latest.age:.1f}s old")
+        return latest
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=1)
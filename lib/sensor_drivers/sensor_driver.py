@@ -5,3 +5,6 @@ class SensorDriver(Enum):
     MOCK = "MOCK"
     BME280 = "BME280"
     DHT22 = "DHT22"
+    SIMULATED_ROOM = "SIMULATED_ROOM"
+    SIMULATED_OUTDOOR = "SIMULATED_OUTDOOR"
+    SYNTHETIC = "SYNTHETIC"
@@ -1,22 +1,29 @@
+from typing import Optional
+
 from lib.sensor_drivers.sensor_driver import SensorDriver
 from lib.sensor_drivers.sensor_interface import SensorInterface
 
+BME280_CALIBRATION_CACHE = "bme280_calibration.json"
+
 
 class SensorFactory:
 
     @staticmethod
-    def create_driver(sensor_driver: SensorDriver, address: int) -> SensorInterface:
+    def create_driver(sensor_driver: SensorDriver, address: int, bme280_settings: Optional[dict] = None) -> SensorInterface:
         if sensor_driver == SensorDriver.MOCK:
             from lib.sensor_drivers.sensor_mock import SensorMock
             return SensorMock()
 
         if sensor_driver == SensorDriver.BME280:
             from lib.sensor_drivers.bme280.bme280_driver import Bme280
-            import smbus2
+            from lib.sensor_drivers.bme280.calibration_cache import CalibrationCache
+            from lib.i2c.i2c_bus_manager import I2cBusManager
 
+            # every bme280 on the bus shares one handle, its transactions are serialized
             port = 1
-            bus = smbus2.SMBus(port)
-            return Bme280(bus, address)
+            bus = I2cBusManager.shared().bus(port)
+            return Bme280(bus, address, calibration_cache=CalibrationCache(BME280_CALIBRATION_CACHE), bus_id=port,
+                          **SensorFactory._bme280_options(bme280_settings or {}))
 
         if sensor_driver == SensorDriver.DHT22:
             from lib.sensor_drivers.dht22.dht22_driver import Dht22
@@ -24,4 +31,28 @@ class SensorFactory:
             dht22 = Dht22(address)
             return dht22
 
+        if sensor_driver in (SensorDriver.SIMULATED_ROOM, SensorDriver.SIMULATED_OUTDOOR):
+            from lib.simulation.simulated_sensor import SimulatedSensor
+            return SimulatedSensor(outdoor=sensor_driver == SensorDriver.SIMULATED_OUTDOOR)
+
+        if sensor_driver == SensorDriver.SYNTHETIC:
+            from lib.sensor_drivers.synthetic.synthetic_sensor import SyntheticSensor
+            return SyntheticSensor(seed=address)  # the address is the seed, so every sensor has its own readings
+
         raise ValueError(f"Unsupported sensor driver: {sensor_driver}")
+
+    @staticmethod
+    def _bme280_options(settings: dict) -> dict:
+        from lib.sensor_drivers.bme280.bme280_driver import FilterCoefficient, OperatingMode, SampleModes, StandbyTime
+
+        mode = (settings.get("mode") or "forced").lower()
+        if mode not in ("forced", "normal"):
+            raise ValueError(f"Unsupported bme280 mode: {mode}")
+        oversampling = settings.get("oversampling") or 1
+        iir_filter = settings.get("iir_filter") or 0
+        return {
+            "mode": OperatingMode.NORMAL if mode == "normal" else OperatingMode.FORCED,
+            "sampling": SampleModes[f"SAMPLE_X{oversampling}"],
+            "standby": StandbyTime.from_milliseconds(settings.get("standby_ms") or 62.5),
+            "iir_filter": FilterCoefficient[f"X{iir_filter}"] if iir_filter else FilterCoefficient.OFF,
+        }
@@ -0,0 +1,182 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.sensor_driver import SensorDriver
+from lib.sensor_drivers.sensor_factory import SensorFactory
+from lib.sensor_drivers.sensor_interface import SensorInterface
+from lib.util.latency_stats import LatencyStats
+
+
+class _HubEntry:
+
+    def __init__(self, sensor: SensorInterface, settings: Optional[dict] = None) -> None:
+        self.sensor = sensor
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.reading: Optional[SensorData] = None
+        self.taken_at = 0.0  # clock of the hub, for the ttl
+        self.reading_time = 0.0  # time.monotonic() at which the driver took the reading
+        self.in_flight: Optional[Future] = None
+        self.latency = LatencyStats()
+        # only changed while holding the lock of the entry
+        self.requests = 0
+        self.hardware_reads = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+
+class HubSensor(SensorInterface):
+    """A sensor of the hub, every read goes through the hub. The hub owns the driver, so close() does nothing."""
+
+    def __init__(self, hub: "SensorHub", key: Hashable) -> None:
+        self._hub = hub
+        self._key = key
+
+    @property
+    def key(self) -> Hashable:
+        return self._key
+
+    def get_sensor_data(self) -> SensorData:
+        return self._hub.read(self._key)
+
+    def get_timed_sensor_data(self) -> Tuple[SensorData, float]:
+        return self._hub.read_timed(self._key)
+
+
+class SensorHub:
+    """
+    Owns every physical sensor of the process, so the consumers in the process that read the same sensor
+    share one driver. The hub isn't shared between processes. Reads that come in while the sensor is being
+    read wait for that read instead of starting another one, and a reading younger than `ttl` seconds
+    is served from the cache without touching the bus.
+    """
+
+    _shared: Optional["SensorHub"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ttl: float = 0.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _HubEntry] = {}
+
+    @staticmethod
+    def shared() -> "SensorHub":
+        """The hub of the process."""
+        with SensorHub._shared_lock:
+            if SensorHub._shared is None:
+                SensorHub._shared = SensorHub()
+            return SensorHub._shared
+
+    @staticmethod
+    def set_shared(hub: Optional["SensorHub"]) -> None:
+        with SensorHub._shared_lock:
+            SensorHub._shared = hub
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def requests(self) -> int:
+        return sum(entry.requests for entry in self._entries_snapshot())
+
+    @property
+    def hardware_reads(self) -> int:
+        return sum(entry.hardware_reads for entry in self._entries_snapshot())
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(entry.cache_hits for entry in self._entries_snapshot())
+
+    @property
+    def coalesced(self) -> int:
+        return sum(entry.coalesced for entry in self._entries_snapshot())
+
+    def _entries_snapshot(self) -> List[_HubEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def latency(self, key: Hashable) -> LatencyStats:
+        return self._entries[key].latency
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def sensor(self, sensor_driver: SensorDriver, address: int, bme280_settings: Optional[dict] = None) -> HubSensor:
+        """
+        The sensor with this driver and address, the driver is only created the first time. There is one driver
+        per physical sensor, so asking for it with other bme280 settings than it was created with raises a
+        ValueError; without settings the existing driver is returned as it is.
+        """
+        key = (sensor_driver, address)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _HubEntry(SensorFactory.create_driver(sensor_driver, address, bme280_settings),
+                                               bme280_settings)
+            elif bme280_settings is not None and bme280_settings != entry.settings:
+                raise ValueError(f"The {sensor_driver.value} sensor at {address} was already created with other settings: "
+                                 f"{entry.settings}")
+        return HubSensor(self, key)
+
+    def register(self, key: Hashable, sensor: SensorInterface) -> HubSensor:
+        """Adds a driver that was created elsewhere, a driver that is already registered under the key is kept."""
+        with self._lock:
+            self._entries.setdefault(key, _HubEntry(sensor))
+        return HubSensor(self, key)
+
+    def read(self, key: Hashable) -> SensorData:
+        return self.read_timed(key)[0]
+
+    def read_timed(self, key: Hashable) -> Tuple[SensorData, float]:
+        """The reading and the time.monotonic() at which the driver took it, a cached reading keeps its time."""
+        entry = self._entries[key]
+        with entry.lock:
+            entry.requests += 1
+            if entry.reading is not None and self._clock() - entry.taken_at <= self._ttl:
+                entry.cache_hits += 1
+                return entry.reading, entry.reading_time
+            if entry.in_flight is not None:
+                entry.coalesced += 1
+                future, reader = entry.in_flight, False
+            else:
+                future, reader = Future(), True
+                entry.in_flight = future
+
+        if reader:
+            self._read_sensor(entry, future)
+        return future.result()
+
+    def _read_sensor(self, entry: _HubEntry, future: Future) -> None:
+        start = time.perf_counter()
+        try:
+            sensor_data, reading_time = entry.sensor.get_timed_sensor_data()
+        except Exception as e:
+            # a failed read isn't cached, the next request tries again
+            with entry.lock:
+                entry.in_flight = None
+            future.set_exception(e)
+            return
+
+        entry.latency.record(time.perf_counter() - start)
+        with entry.lock:
+            entry.hardware_reads += 1
+            entry.reading, entry.taken_at, entry.reading_time = sensor_data, self._clock(), reading_time
+            entry.in_flight = None
+        future.set_result((sensor_data, reading_time))
+
+    def close(self) -> None:
+        entries = self._entries_snapshot()
+        with self._lock:
+            self._entries.clear()
+        for entry in entries:
+            entry.sensor.close()
+
+    def __str__(self):
+        return (f"SensorHub(sensors: {len(self._entries)}, requests: {self.requests}, hardware reads: {self.hardware_reads}, "
+                f"cache hits: {self.cache_hits}, coalesced: {self.coalesced})")
@@ -1,3 +1,6 @@
+import time
+from typing import Tuple
+
 from lib.domain.sensor_data import SensorData
 
 
@@ -5,3 +8,13 @@ class SensorInterface:
 
     def get_sensor_data(self) -> SensorData:
         return SensorData()
+
+    def get_timed_sensor_data(self) -> Tuple[SensorData, float]:
+        """
+        The sensor data and the time.monotonic() at which it was taken. A driver that returns a reading
+        it took earlier (the DHT22, the hub) overrides this with the time of that reading.
+        """
+        return self.get_sensor_data(), time.monotonic()
+
+    def close(self) -> None:
+        pass
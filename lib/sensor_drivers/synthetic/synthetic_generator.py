@@ -0,0 +1,112 @@
+import math
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from lib.util.saturation_vapour import SaturationVapourEngine
+
+_SATURATION = SaturationVapourEngine()
+
+
+@dataclass
+class SyntheticBatch:
+    """One reading of every sensor, a missed reading (dropout) is NaN and not valid."""
+    timestamp: float
+    temperature: np.ndarray
+    humidity: np.ndarray
+    pressure: np.ndarray
+    valid: np.ndarray
+
+
+@dataclass
+class SyntheticSeries:
+    """Readings of every sensor over time, the arrays have a row per step and a column per sensor."""
+    timestamps: np.ndarray
+    temperature: np.ndarray
+    humidity: np.ndarray
+    pressure: np.ndarray
+    valid: np.ndarray
+
+
+class SyntheticSensorGenerator:
+    """
+    Seeded, realistic readings for many virtual sensors at once.
+
+    Every sensor gets its own mean temperature, daily amplitude and phase. The temperature follows a
+    daily sine plus a slowly wandering offset (an AR(1) process) and sensor noise. The water vapour in
+    the air wanders slowly as well and the relative humidity is derived from it, so the humidity drops
+    when the temperature rises like it does in a real room. The pressure wanders around `pressure`.
+    With `dropout_rate` a reading is missed with that probability. The same seed gives the same readings.
+    """
+
+    def __init__(self, sensors: int, seed: Optional[int] = None, interval: float = 3.0, start_time: float = 0.0,
+                 mean_temperature: float = 20.0, temperature_spread: float = 2.0, daily_amplitude: float = 3.0,
+                 relative_humidity: float = 50.0, pressure: float = 1013.25, temperature_noise: float = 0.05,
+                 humidity_noise: float = 0.5, dropout_rate: float = 0.0, correlation_time: float = 3600.0) -> None:
+        self._rng = np.random.default_rng(seed)
+        self._sensors = sensors
+        self._interval = interval
+        self._time = start_time
+        self._temperature_noise = temperature_noise
+        self._humidity_noise = humidity_noise
+        self._dropout_rate = dropout_rate
+        # the wandering parts keep this much of their value per step
+        self._persistence = math.exp(-interval / correlation_time)
+        self._innovation = math.sqrt(1 - self._persistence ** 2)
+
+        self._mean_temperature = mean_temperature + self._rng.normal(0.0, temperature_spread, sensors)
+        self._amplitude = daily_amplitude * self._rng.uniform(0.5, 1.5, sensors)
+        self._phase = self._rng.uniform(-math.pi / 4, math.pi / 4, sensors)  # warmest around the middle of the afternoon
+        self._base_vapour = _SATURATION.absolute_humidity(self._mean_temperature, relative_humidity)
+        self._pressure = pressure
+
+        self._temperature_drift = self._rng.normal(0.0, 0.5, sensors)
+        self._vapour_drift = self._rng.normal(0.0, 0.5, sensors)
+        self._pressure_drift = self._rng.normal(0.0, 3.0, sensors)
+
+    @property
+    def sensors(self) -> int:
+        return self._sensors
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+    def next_batch(self) -> SyntheticBatch:
+        timestamp = self._time
+        rng = self._rng
+        persistence, innovation = self._persistence, self._innovation
+
+        self._temperature_drift = persistence * self._temperature_drift + innovation * rng.normal(0.0, 0.5, self._sensors)
+        self._vapour_drift = persistence * self._vapour_drift + innovation * rng.normal(0.0, 0.5, self._sensors)
+        self._pressure_drift = persistence * self._pressure_drift + innovation * rng.normal(0.0, 3.0, self._sensors)
+
+        daily = np.sin(2 * math.pi * (timestamp / 86400.0 - 9 / 24.0) + self._phase)  # highest at 15h
+        temperature = (self._mean_temperature + self._amplitude * daily + self._temperature_drift
+                       + rng.normal(0.0, self._temperature_noise, self._sensors))
+        vapour = np.maximum(self._base_vapour + self._vapour_drift, 0.5)
+        humidity = np.clip(100.0 * vapour / _SATURATION.saturation_vapour_density(temperature)
+                           + rng.normal(0.0, self._humidity_noise, self._sensors), 0.0, 100.0)
+        pressure = self._pressure + self._pressure_drift
+
+        valid = rng.random(self._sensors) >= self._dropout_rate
+        if not valid.all():
+            temperature[~valid] = np.nan
+            humidity[~valid] = np.nan
+            pressure[~valid] = np.nan
+
+        self._time += self._interval
+        return SyntheticBatch(timestamp, np.round(temperature, 2), np.round(humidity, 2), np.round(pressure, 2), valid)
+
+    def batches(self, count: int) -> Iterator[SyntheticBatch]:
+        for _ in range(count):
+            yield self.next_batch()
+
+    def series(self, steps: int) -> SyntheticSeries:
+        batches = list(self.batches(steps))
+        return SyntheticSeries(timestamps=np.array([batch.timestamp for batch in batches]),
+                               temperature=np.stack([batch.temperature for batch in batches]),
+                               humidity=np.stack([batch.humidity for batch in batches]),
+                               pressure=np.stack([batch.pressure for batch in batches]),
+                               valid=np.stack([batch.valid for batch in batches]))
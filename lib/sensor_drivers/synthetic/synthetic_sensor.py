@@ -0,0 +1,20 @@
+from typing import Optional
+
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.sensor_interface import SensorInterface
+from lib.sensor_drivers.synthetic.synthetic_generator import SyntheticSensorGenerator
+
+
+class SyntheticSensor(SensorInterface):
+    """A single sensor of a SyntheticSensorGenerator, a missed reading raises an IOError like a failed read of a real driver."""
+
+    def __init__(self, seed: Optional[int] = None, generator: SyntheticSensorGenerator = None):
+        self._generator = generator or SyntheticSensorGenerator(1, seed=seed)
+
+    def get_sensor_data(self) -> SensorData:
+        batch = self._generator.next_batch()
+        if not batch.valid[0]:
+            raise IOError("The synthetic sensor missed a reading")
+        return SensorData(temperature=float(batch.temperature[0]),
+                          humidity=float(batch.humidity[0]),
+                          pressure=float(batch.pressure[0]))
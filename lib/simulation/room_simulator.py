@@ -0,0 +1,185 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from lib.util.saturation_vapour import SaturationVapourEngine
+
+_SATURATION = SaturationVapourEngine()
+
+
+@dataclass
+class OutdoorProfile:
+    """Outside temperature as a daily sine, coldest at `coldest_hour`, with a constant relative humidity."""
+    mean_temperature: float = 12.0
+    daily_amplitude: float = 5.0
+    relative_humidity: float = 75.0
+    coldest_hour: float = 5.0
+    pressure: float = 1013.25
+
+    def at(self, seconds: float) -> Tuple[float, float]:
+        """Temperature (°C) and relative humidity (%) outside, `seconds` after midnight of day one."""
+        phase = 2 * math.pi * (seconds / 3600.0 - self.coldest_hour) / 24.0
+        return self.mean_temperature - self.daily_amplitude * math.cos(phase), self.relative_humidity
+
+
+@dataclass
+class RoomModel:
+    """
+    A room as a single thermal mass and a single volume of air.
+
+    The temperature loses `heat_loss_rate` of the difference with the outside per second and rises
+    `heater_rate` °C per second while the heater is on. The water vapour (g/m3) is exchanged with the
+    outside air at `ventilation_rate` per second and the steamer adds `steamer_rate` g/m3 per second.
+    Above saturation the vapour condenses.
+    """
+    heat_loss_rate: float = 1 / 2400.0  # a time constant of 40 minutes
+    heater_rate: float = 0.008  # about 29 °C per hour at full power
+    ventilation_rate: float = 1 / 1800.0
+    steamer_rate: float = 0.01  # g/m3 per second
+    heater_pin: int = 17  # the relays that switch the heater and the steamer, as in config.yaml
+    steamer_pin: int = 27
+    outdoor: OutdoorProfile = field(default_factory=OutdoorProfile)
+
+
+class RoomSimulator:
+    """
+    Steps a RoomModel forward in simulated time. The simulated sensors read the room and the outside,
+    the simulated relays switch the heater and the steamer, so the whole sense -> control loop can run
+    offline.
+
+    With `speed` > 0 the simulated time runs `speed` times faster than the wall clock and the plant is
+    brought up to date on every read or switch. With `speed` 0 the time only moves with `advance`, for
+    deterministic tests. The plant is integrated in steps of at most `max_step` simulated seconds.
+    """
+
+    _shared: Optional["RoomSimulator"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, model: RoomModel = None, speed: float = 60.0, start_temperature: Optional[float] = None,
+                 start_relative_humidity: float = 50.0, start_time: float = 0.0, max_step: float = 1.0) -> None:
+        self._model = model or RoomModel()
+        self._speed = speed
+        self._max_step = max_step
+        self._lock = threading.RLock()
+        self._time = start_time
+        # in real time the simulated time is _time_origin plus the wall time since _wall_start, times speed
+        self._time_origin = start_time
+        self._wall_start = time.monotonic()
+        outside_temperature, _ = self._model.outdoor.at(start_time)
+        self._temperature = outside_temperature if start_temperature is None else start_temperature
+        self._vapour = float(_SATURATION.absolute_humidity(self._temperature, start_relative_humidity))
+        self._heater_on = False
+        self._steamer_on = False
+        self._heater_switches = 0
+        self._steamer_switches = 0
+        self._heater_on_time = 0.0
+        self._steamer_on_time = 0.0
+
+    @staticmethod
+    def shared() -> "RoomSimulator":
+        """The simulator of the process, used by the simulated sensor and relay drivers."""
+        with RoomSimulator._shared_lock:
+            if RoomSimulator._shared is None:
+                RoomSimulator._shared = RoomSimulator()
+            return RoomSimulator._shared
+
+    @staticmethod
+    def set_shared(simulator: Optional["RoomSimulator"]) -> None:
+        with RoomSimulator._shared_lock:
+            RoomSimulator._shared = simulator
+
+    @property
+    def model(self) -> RoomModel:
+        return self._model
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
+
+    @property
+    def relative_humidity(self) -> float:
+        return min(100.0, 100.0 * self._vapour / float(_SATURATION.saturation_vapour_density(self._temperature)))
+
+    @property
+    def heater_on(self) -> bool:
+        return self._heater_on
+
+    @property
+    def steamer_on(self) -> bool:
+        return self._steamer_on
+
+    @property
+    def heater_switches(self) -> int:
+        return self._heater_switches
+
+    @property
+    def steamer_switches(self) -> int:
+        return self._steamer_switches
+
+    @property
+    def heater_on_time(self) -> float:
+        return self._heater_on_time
+
+    @property
+    def steamer_on_time(self) -> float:
+        return self._steamer_on_time
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._sync()
+            self._integrate(self._time + seconds)
+            # the real time runs on from the advanced time
+            self._time_origin = self._time
+            self._wall_start = time.monotonic()
+
+    def _sync(self) -> None:
+        if self._speed > 0:
+            self._integrate(self._time_origin + (time.monotonic() - self._wall_start) * self._speed)
+
+    def _integrate(self, until: float) -> None:
+        model = self._model
+        while self._time < until:
+            step = min(self._max_step, until - self._time)
+            outside_temperature, outside_relative_humidity = model.outdoor.at(self._time)
+            outside_vapour = outside_relative_humidity / 100.0 * float(_SATURATION.saturation_vapour_density(outside_temperature))
+
+            self._temperature += step * (model.heat_loss_rate * (outside_temperature - self._temperature)
+                                         + (model.heater_rate if self._heater_on else 0.0))
+            self._vapour += step * (model.ventilation_rate * (outside_vapour - self._vapour)
+                                    + (model.steamer_rate if self._steamer_on else 0.0))
+            self._vapour = min(self._vapour, float(_SATURATION.saturation_vapour_density(self._temperature)))  # condenses
+
+            if self._heater_on:
+                self._heater_on_time += step
+            if self._steamer_on:
+                self._steamer_on_time += step
+            self._time += step
+
+    def read_room(self) -> Tuple[float, float, float]:
+        """Temperature, relative humidity and pressure in the room."""
+        with self._lock:
+            self._sync()
+            return self._temperature, self.relative_humidity, self._model.outdoor.pressure
+
+    def read_outdoor(self) -> Tuple[float, float, float]:
+        with self._lock:
+            self._sync()
+            temperature, relative_humidity = self._model.outdoor.at(self._time)
+            return temperature, relative_humidity, self._model.outdoor.pressure
+
+    def set_relay(self, gpio_pin: int, closed: bool) -> None:
+        """A closed relay switches its device on, a relay that isn't the heater or the steamer is ignored."""
+        with self._lock:
+            self._sync()
+            if gpio_pin == self._model.heater_pin:
+                self._heater_switches += int(closed != self._heater_on)
+                self._heater_on = closed
+            elif gpio_pin == self._model.steamer_pin:
+                self._steamer_switches += int(closed != self._steamer_on)
+                self._steamer_on = closed
@@ -0,0 +1,16 @@
+from lib.gpio.relay_interface import RelayInterface
+from lib.simulation.room_simulator import RoomSimulator
+
+
+class SimulatedRelay(RelayInterface):
+    """Switches the heater or the steamer of a RoomSimulator, depending on the gpio pin."""
+
+    def __init__(self, gpio_pin: int, simulator: RoomSimulator = None):
+        self._gpio_pin = gpio_pin
+        self._simulator = simulator or RoomSimulator.shared()
+
+    def open_relay(self) -> None:
+        self._simulator.set_relay(self._gpio_pin, False)
+
+    def close_relay(self) -> None:
+        self._simulator.set_relay(self._gpio_pin, True)
@@ -0,0 +1,21 @@
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.sensor_interface import SensorInterface
+from lib.simulation.room_simulator import RoomSimulator
+
+
+class SimulatedSensor(SensorInterface):
+    """Reads the room of a RoomSimulator, or the outside air when `outdoor` is set."""
+
+    def __init__(self, simulator: RoomSimulator = None, outdoor: bool = False):
+        self._simulator = simulator or RoomSimulator.shared()
+        self._outdoor = outdoor
+
+    def get_sensor_data(self) -> SensorData:
+        if self._outdoor:
+            temperature, humidity, pressure = self._simulator.read_outdoor()
+        else:
+            temperature, humidity, pressure = self._simulator.read_room()
+        # the same ranges as SensorData accepts, like a real sensor clips at the end of its range
+        return SensorData(temperature=round(min(max(temperature, -50.0), 50.0), 2),
+                          humidity=round(min(max(humidity, 0.0), 100.0), 2),
+                          pressure=round(pressure, 2))
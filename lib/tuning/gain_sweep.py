@@ -0,0 +1,154 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from lib.controllers.enviroment_controller import EnvironmentController
+from lib.domain.sensor_status import SensorStatus
+from lib.history.sensor_history_store import STATUS_CODES
+from lib.tuning.plant_model import FirstOrderPlant
+
+
+@dataclass(frozen=True)
+class GainSet:
+    kp: float
+    kd: float
+    threshold: float
+
+
+@dataclass
+class TuningScenario:
+    """A closed loop run: the controller follows `setpoints` (the external temperature for the heater) on the plant."""
+    setpoints: Sequence[float]
+    outside: Sequence[float]
+    start_value: float
+    plant: FirstOrderPlant = field(default_factory=FirstOrderPlant)
+    sample_interval: float = 3.0  # seconds per step, the publish interval of EnviroSense
+    tolerance: float = 0.5  # settled when the error stays within this band
+    toggle_weight: float = 0.01  # how much a relay switch costs in the score
+
+    @staticmethod
+    def from_history(records: np.ndarray, tolerance: float = 0.5) -> "TuningScenario":
+        """
+        A scenario for the heater from the raw records of a SensorHistoryStore: the plant is fitted on the
+        readings and the heater decisions, the external temperature is both the setpoint and the outside.
+        Readings of a sensor that wasn't OK (stale, or missing and NaN in the history) are left out.
+        """
+        ok = STATUS_CODES.index(SensorStatus.OK)
+        internal = np.where(records["internal_status"] == ok, records["internal_temperature"], np.nan)
+        external = np.where(records["external_status"] == ok, records["external_temperature"], np.nan)
+        good = np.isfinite(internal) & np.isfinite(external)
+        if np.count_nonzero(good) < 3:
+            raise ValueError("Not enough readings in the history to tune on")
+        plant = FirstOrderPlant.fit(internal, external, records["heater_on"])
+        return TuningScenario(setpoints=external[good].astype(np.float64).tolist(),
+                              outside=external[good].astype(np.float64).tolist(),
+                              start_value=float(internal[good][0]),
+                              plant=plant,
+                              sample_interval=float(np.median(np.diff(records["timestamp"]))),
+                              tolerance=tolerance)
+
+
+@dataclass
+class TuningResult:
+    gains: GainSet
+    overshoot: float  # the largest amount the value went above the setpoint
+    settling_time: Optional[float]  # seconds until the error stays within the tolerance, None when it never does
+    toggles: int  # relay switches
+    mean_absolute_error: float
+    score: float  # lower is better
+
+    def __str__(self):
+        settling_time = "-" if self.settling_time is None else f"{self.settling_time:.0f}s"
+        return (f"kp: {self.gains.kp:.3f}, kd: {self.gains.kd:.3f}, threshold: {self.gains.threshold:.3f} => "
+                f"overshoot: {self.overshoot:.2f}, settling time: {settling_time}, toggles: {self.toggles}, "
+                f"mean abs error: {self.mean_absolute_error:.3f}, score: {self.score:.3f}")
+
+
+def evaluate(gains: GainSet, scenario: TuningScenario) -> TuningResult:
+    """Runs an EnvironmentController with these gains in closed loop on the plant of the scenario."""
+    controller = EnvironmentController(gains.kp, gains.kd, gains.threshold)
+    plant = scenario.plant
+    value = scenario.start_value
+    device_on = False
+    toggles = 0
+    errors = np.empty(len(scenario.setpoints))
+
+    for step, (setpoint, outside) in enumerate(zip(scenario.setpoints, scenario.outside)):
+        errors[step] = value - setpoint
+        turn_on = controller.calculate_device_on_off(value, setpoint)
+        if step > 0 and turn_on != device_on:
+            toggles += 1
+        device_on = turn_on
+        value = plant.step(value, outside, device_on)
+
+    outside_band = np.flatnonzero(np.abs(errors) > scenario.tolerance)
+    if outside_band.size == 0:
+        settling_time = 0.0
+    elif outside_band[-1] == errors.size - 1:
+        settling_time = None
+    else:
+        settling_time = float(outside_band[-1] + 1) * scenario.sample_interval
+
+    overshoot = max(0.0, float(errors.max()))
+    mean_absolute_error = float(np.abs(errors).mean())
+    score = mean_absolute_error + overshoot + scenario.toggle_weight * toggles
+    if settling_time is None:
+        score = math.inf  # never settled, ranks last
+    return TuningResult(gains, overshoot, settling_time, toggles, mean_absolute_error, score)
+
+
+def _evaluate_chunk(gain_sets: List[GainSet], scenario: TuningScenario) -> List[TuningResult]:
+    return [evaluate(gains, scenario) for gains in gain_sets]
+
+
+class GainSweep:
+    """
+    Evaluates many gain sets on a scenario, spread over a process pool (one process per core by default),
+    and ranks them by score: the mean absolute error plus the overshoot plus a cost per relay switch.
+    """
+
+    def __init__(self, scenario: TuningScenario, workers: Optional[int] = None, chunk_size: int = 16) -> None:
+        self._scenario = scenario
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+
+    @staticmethod
+    def grid(kp_values: Iterable[float], kd_values: Iterable[float], threshold_values: Iterable[float]) -> List[GainSet]:
+        return [GainSet(kp, kd, threshold) for kp, kd, threshold in itertools.product(kp_values, kd_values, threshold_values)]
+
+    @staticmethod
+    def random(count: int, kp_range=(0.0, 1.0), kd_range=(0.0, 1.0), threshold_range=(0.0, 1.0),
+               seed: Optional[int] = None) -> List[GainSet]:
+        rng = np.random.default_rng(seed)
+        return [GainSet(float(kp), float(kd), float(threshold))
+                for kp, kd, threshold in zip(rng.uniform(*kp_range, count),
+                                             rng.uniform(*kd_range, count),
+                                             rng.uniform(*threshold_range, count))]
+
+    @staticmethod
+    def refine(best: GainSet, count: int, spread: float = 0.25, kp_range=(0.0, 1.0), kd_range=(0.0, 1.0),
+               threshold_range=(0.0, 1.0), seed: Optional[int] = None) -> List[GainSet]:
+        """
+        Random gain sets around a good one, for a second, finer pass over the best result of a sweep. Every
+        gain moves by up to `spread` times the width of its search range, so a gain of 0 can move as well,
+        and stays within the range.
+        """
+        rng = np.random.default_rng(seed)
+        ranges = np.array([kp_range, kd_range, threshold_range], dtype=np.float64)
+        offsets = rng.uniform(-spread, spread, (count, 3)) * (ranges[:, 1] - ranges[:, 0])
+        gains = np.clip(np.array([best.kp, best.kd, best.threshold]) + offsets, ranges[:, 0], ranges[:, 1])
+        return [GainSet(float(kp), float(kd), float(threshold)) for kp, kd, threshold in gains]
+
+    def run(self, gain_sets: List[GainSet]) -> List[TuningResult]:
+        chunks = [gain_sets[index:index + self._chunk_size] for index in range(0, len(gain_sets), self._chunk_size)]
+        if self._workers == 1:
+            results = [_evaluate_chunk(chunk, self._scenario) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                results = list(executor.map(_evaluate_chunk, chunks, itertools.repeat(self._scenario)))
+        return sorted((result for chunk in results for result in chunk), key=lambda result: result.score)
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class FirstOrderPlant:
+    """
+    The simple room of the controller tests: with the heater on the temperature rises `heating_rate`
+    degrees per step, with the heater off it drops towards the outside temperature by `loss_rate`
+    of the difference per step.
+    """
+    heating_rate: float = 0.486
+    loss_rate: float = 0.05
+
+    def step(self, value: float, outside: float, device_on: bool) -> float:
+        if device_on:
+            return value + self.heating_rate
+        return value - self.loss_rate * (value - outside)
+
+    @staticmethod
+    def fit(inside: np.ndarray, outside: np.ndarray, device_on: np.ndarray) -> "FirstOrderPlant":
+        """
+        Estimates the plant from consecutive readings, e.g. the raw history of EnviroControl. Steps where
+        the relay state isn't known (-1 in the history) or a reading is NaN (no good reading) are left out.
+        """
+        inside = np.asarray(inside, dtype=np.float64)
+        outside = np.asarray(outside, dtype=np.float64)
+        device_on = np.asarray(device_on)
+
+        change = np.diff(inside)
+        state = device_on[:-1]
+        known = np.isfinite(inside[:-1]) & np.isfinite(inside[1:]) & np.isfinite(outside[:-1])
+        heating = (state == 1) & known
+        cooling = (state == 0) & known
+        if not heating.any() or not cooling.any():
+            raise ValueError("The readings need steps with the device on and with the device off to fit the plant")
+
+        # heater off: change = -loss_rate * (inside - outside), least squares through the origin
+        difference = inside[:-1][cooling] - outside[:-1][cooling]
+        loss_rate = -float(np.dot(change[cooling], difference) / np.dot(difference, difference))
+        return FirstOrderPlant(heating_rate=float(change[heating].mean()), loss_rate=loss_rate)
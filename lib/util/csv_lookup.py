@@ -1,11 +1,28 @@
+import bisect
 import csv
+import math
+
+import numpy as np
 
 
 class CSVLookup:
-    def __init__(self, file_path):
+    """
+    Lookup table of the maximum water vapour (g/m3) per temperature.
+
+    `get_closest_value` returns the row of the highest temperature strictly below the target. The table
+    is sorted once when it is loaded, a lookup is then an index calculation (for a table with a row per
+    degree) or a bisect instead of a scan over all the rows.
+
+    With `interpolate=True` the value is linearly interpolated between the rows at the target temperature
+    itself.
+    """
+
+    def __init__(self, file_path, interpolate: bool = False):
         self.file_path = file_path
+        self.interpolate = interpolate
         self.lookup_table = {}
         self._load_data()
+        self._build_index()
 
     def _load_data(self):
         with open(self.file_path, mode='r', newline='', encoding='utf-8') as file:
@@ -16,11 +33,62 @@ class CSVLookup:
                 gm3, temp = float(row[0]), int(row[1])
                 self.lookup_table[temp] = gm3
 
+    def _build_index(self):
+        self._temperatures = sorted(self.lookup_table.keys())
+        self._values = [self.lookup_table[temp] for temp in self._temperatures]
+        self._temperatures_array = np.array(self._temperatures, dtype=float)
+        self._values_array = np.array(self._values, dtype=float)
+        # a row for every degree lets us calculate the index instead of searching it
+        self._dense = (len(self._temperatures) > 0 and
+                       self._temperatures[-1] - self._temperatures[0] == len(self._temperatures) - 1)
+
+    def _index_below(self, target_temperature) -> int:
+        if self._dense:
+            index = math.ceil(target_temperature) - 1 - self._temperatures[0]
+            return min(index, len(self._temperatures) - 1)
+        return bisect.bisect_left(self._temperatures, target_temperature) - 1
+
     def get_closest_value(self, target_temperature):
-        valid_keys = [temp for temp in self.lookup_table.keys() if temp < target_temperature]
+        if not math.isfinite(target_temperature):
+            # e.g. the NaN of a missing reading, there is no row for it
+            return None
+        if self.interpolate:
+            return self.get_interpolated_value(target_temperature)
 
-        if not valid_keys:
+        index = self._index_below(target_temperature)
+        if index < 0:
             return None
 
-        closest_temp = max(valid_keys)
-        return closest_temp, self.lookup_table[closest_temp]
\ No newline at end of file
+        return self._temperatures[index], self._values[index]
+
+    def get_interpolated_value(self, target_temperature):
+        if not self._temperatures or not self._temperatures[0] <= target_temperature <= self._temperatures[-1]:
+            return None
+
+        index = bisect.bisect_left(self._temperatures, target_temperature)
+        if self._temperatures[index] == target_temperature:
+            return target_temperature, self._values[index]
+
+        low_temp, high_temp = self._temperatures[index - 1], self._temperatures[index]
+        low_value, high_value = self._values[index - 1], self._values[index]
+        fraction = (target_temperature - low_temp) / (high_temp - low_temp)
+        return target_temperature, low_value + fraction * (high_value - low_value)
+
+    def get_closest_values(self, target_temperatures):
+        """
+        Vectorized `get_closest_value` for a whole array of temperatures, e.g. recorded history.
+        Returns an array of the used table temperatures and an array of the values, both NaN where
+        there is no row below the target or the target isn't finite.
+        """
+        targets = np.asarray(target_temperatures, dtype=float)
+
+        if self.interpolate:
+            values = np.interp(targets, self._temperatures_array, self._values_array, left=np.nan, right=np.nan)
+            return np.where(np.isnan(values), np.nan, targets), values
+
+        indexes = np.searchsorted(self._temperatures_array, targets, side='left') - 1
+        missing = (indexes < 0) | ~np.isfinite(targets)
+        indexes = np.where(missing, 0, indexes)
+        temperatures = np.where(missing, np.nan, self._temperatures_array[indexes])
+        values = np.where(missing, np.nan, self._values_array[indexes])
+        return temperatures, values
@@ -0,0 +1,25 @@
+from lib.util.csv_lookup import CSVLookup
+from lib.util.saturation_vapour import SaturationVapourEngine, SaturationFormula
+
+
+class HumidityLookupFactory:
+
+    @staticmethod
+    def create(config: dict):
+        """
+        Creates the lookup for the maximum water vapour per temperature, set with `humidity_lookup`:
+        "csv" (default) uses the table, "magnus" or "buck" calculate it.
+        """
+        humidity_lookup = (config.get("humidity_lookup") or "csv").lower()
+
+        if humidity_lookup == "csv":
+            return CSVLookup(config.get("humidity_table_path") or "doc/waterdampspanning.csv",
+                             interpolate=config.get("humidity_table_interpolate") or False)
+
+        if humidity_lookup == "magnus":
+            return SaturationVapourEngine(SaturationFormula.MAGNUS)
+
+        if humidity_lookup == "buck":
+            return SaturationVapourEngine(SaturationFormula.BUCK)
+
+        raise ValueError(f"Unsupported humidity lookup: {humidity_lookup}")
@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import List
+
+# upper bounds of the buckets in seconds, the last bucket holds everything above 1s
+DEFAULT_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+@dataclass
+class JitterHistogram:
+    """How late the ticks of a periodic task started compared to their deadline."""
+    bounds: tuple = field(default=DEFAULT_BOUNDS)
+    counts: List[int] = field(default_factory=list)
+    count: int = field(default=0)
+    maximum: float = field(default=0.0)
+    total: float = field(default=0.0)
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def record(self, seconds: float) -> None:
+        seconds = abs(seconds)
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, percentage: float) -> float:
+        """Upper bound of the bucket that holds the given percentile, inf when it is in the last bucket."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * percentage / 100.0
+        seen = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def __str__(self):
+        if self.count == 0:
+            return "JitterHistogram(no samples)"
+        buckets = ", ".join(f"<={bound * 1000:g}ms: {bucket_count}"
+                            for bound, bucket_count in zip(self.bounds, self.counts) if bucket_count)
+        if self.counts[-1]:
+            buckets += f", >{self.bounds[-1] * 1000:g}ms: {self.counts[-1]}"
+        return f"JitterHistogram(count: {self.count}, mean: {self.mean * 1000:.3f}ms, max: {self.maximum * 1000:.3f}ms, {buckets})"
@@ -0,0 +1,35 @@
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LatencyStats:
+    count: int = field(default=0)
+    total: float = field(default=0.0)
+    minimum: float = field(default=float("inf"))
+    maximum: float = field(default=0.0)
+    last: float = field(default=0.0)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            self.minimum = min(self.minimum, seconds)
+            self.maximum = max(self.maximum, seconds)
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def __str__(self):
+        if self.count == 0:
+            return "LatencyStats(no samples)"
+        return (f"LatencyStats(count: {self.count}, mean: {self.mean * 1000:.3f}ms, "
+                f"min: {self.minimum * 1000:.3f}ms, max: {self.maximum * 1000:.3f}ms, "
+                f"last: {self.last * 1000:.3f}ms)")
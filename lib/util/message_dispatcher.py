@@ -0,0 +1,156 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from queue import Queue, Empty
+from typing import Callable, Dict, List, Optional
+
+
+_STOP = object()  # sentinel put on the queue to wake up and stop the dispatcher
+
+
+@dataclass
+class DispatchStats:
+    messages_handled: int = field(default=0)
+    messages_unhandled: int = field(default=0)
+    ticks: int = field(default=0)
+    idle_time: float = field(default=0.0)  # seconds spent blocked on the queue
+    busy_time: float = field(default=0.0)  # seconds spent in handlers and ticks
+
+    @property
+    def utilization(self) -> float:
+        total = self.idle_time + self.busy_time
+        if total == 0:
+            return 0.0
+        return self.busy_time / total
+
+    def __str__(self):
+        return (f"DispatchStats(handled: {self.messages_handled}, unhandled: {self.messages_unhandled}, "
+                f"ticks: {self.ticks}, idle: {self.idle_time:.3f}s, busy: {self.busy_time:.3f}s, "
+                f"utilization: {self.utilization:.2%})")
+
+
+class MessageDispatcher:
+    """
+    Blocks on a message queue and dispatches every message to the handler registered for its topic.
+
+    The dispatcher sleeps in `Queue.get` until the MQTT thread puts a message on the queue, so no CPU
+    is used between messages. Housekeeping handlers are called every `tick_interval` seconds, also
+    when messages keep arriving.
+    """
+
+    def __init__(self, message_queue: Queue, logger: Logger, tick_interval: float = 1.0) -> None:
+        self._message_queue = message_queue
+        self._logger = logger
+        self._tick_interval = tick_interval
+        self._handlers: Dict[str, Callable[[dict], None]] = {}
+        self._tick_handlers: List[Callable[[], None]] = []
+        self._stats = DispatchStats()
+        self._running = False
+
+    @property
+    def stats(self) -> DispatchStats:
+        return self._stats
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def register_handler(self, topic: str, handler: Callable[[dict], None]) -> None:
+        self._handlers[topic] = handler
+
+    def register_tick(self, handler: Callable[[], None]) -> None:
+        self._tick_handlers.append(handler)
+
+    def stop(self) -> None:
+        self._running = False
+        self._message_queue.put(_STOP)
+
+    def run(self) -> None:
+        self._running = True
+        next_tick = time.monotonic() + self._tick_interval
+
+        while self._running:
+            wait_start = time.monotonic()
+            timeout = max(0.0, next_tick - wait_start)
+            try:
+                message = self._message_queue.get(timeout=timeout)
+            except Empty:
+                message = None
+
+            if message is _STOP:
+                break
+            next_tick = self._process(message, wait_start, next_tick)
+
+        self._running = False
+
+    def _process(self, message: Optional[dict], wait_start: float, next_tick: float) -> float:
+        busy_start = time.monotonic()
+        self._stats.idle_time += busy_start - wait_start
+
+        if message is not None:
+            self._dispatch(message)
+
+        if time.monotonic() >= next_tick:
+            self._tick()
+            next_tick = time.monotonic() + self._tick_interval
+
+        self._stats.busy_time += time.monotonic() - busy_start
+        return next_tick
+
+    def _dispatch(self, message: dict) -> None:
+        handler = self._handlers.get(message.get("topic"))
+        if handler is None:
+            self._stats.messages_unhandled += 1
+            self._logger.warning(f"No handler registered for topic '{message.get('topic')}'")
+            return
+
+        try:
+            handler(message)
+        except Exception as e:
+            self._logger.error(f"Error handling message on topic '{message.get('topic')}': {e}")
+        self._stats.messages_handled += 1
+
+    def _tick(self) -> None:
+        self._stats.ticks += 1
+        for tick_handler in self._tick_handlers:
+            try:
+                tick_handler()
+            except Exception as e:
+                self._logger.error(f"Error in housekeeping tick: {e}")
+
+
+class AsyncMessageDispatcher(MessageDispatcher):
+    """
+    Same dispatching as the MessageDispatcher, but it awaits an `asyncio.Queue` so it can share the
+    event loop with the MQTT client and the relay tasks. Handlers are called on the event loop and
+    must not block.
+    """
+
+    def __init__(self, message_queue: asyncio.Queue, logger: Logger, tick_interval: float = 1.0) -> None:
+        super().__init__(message_queue, logger, tick_interval)
+
+    def stop(self) -> None:
+        self._running = False
+        self._message_queue.put_nowait(_STOP)
+
+    def run(self) -> None:
+        raise RuntimeError("AsyncMessageDispatcher has to be awaited with run_async()")
+
+    async def run_async(self) -> None:
+        self._running = True
+        next_tick = time.monotonic() + self._tick_interval
+
+        while self._running:
+            wait_start = time.monotonic()
+            timeout = max(0.0, next_tick - wait_start)
+            try:
+                message = await asyncio.wait_for(self._message_queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                message = None
+
+            if message is _STOP:
+                break
+            next_tick = self._process(message, wait_start, next_tick)
+
+        self._running = False
@@ -0,0 +1,101 @@
+import asyncio
+import math
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+from lib.util.jitter_histogram import JitterHistogram
+
+
+class OverrunPolicy(Enum):
+    SKIP = "SKIP"  # the missed ticks are dropped, the next tick is the next deadline that is still ahead
+    CATCH_UP = "CATCH_UP"  # the missed ticks are run right away, one after the other
+
+
+class PeriodicScheduler:
+    """
+    Keeps a fixed cadence for a periodic task: the deadlines are `start + n * period` on the monotonic
+    clock, so the time the task itself takes doesn't add up and the period doesn't drift. When a tick
+    takes longer than the period the scheduler skips or catches up the missed ticks, depending on the
+    policy. How late every tick started is kept in a JitterHistogram.
+
+        scheduler = PeriodicScheduler(0.5)
+        while running:
+            scheduler.wait_next()
+            sample()
+    """
+
+    def __init__(self, period: float, policy: OverrunPolicy = OverrunPolicy.SKIP,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        if period <= 0:
+            raise ValueError(f"The period has to be positive: {period}")
+        self._period = period
+        self._policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self._next_deadline: Optional[float] = None
+        self._jitter = JitterHistogram()
+        self._ticks = 0
+        self._overruns = 0
+        self._skipped = 0
+
+    @property
+    def period(self) -> float:
+        return self._period
+
+    @property
+    def jitter(self) -> JitterHistogram:
+        return self._jitter
+
+    @property
+    def ticks(self) -> int:
+        return self._ticks
+
+    @property
+    def overruns(self) -> int:
+        return self._overruns
+
+    @property
+    def skipped(self) -> int:
+        return self._skipped
+
+    def wait_next(self) -> float:
+        """Sleeps until the next deadline and returns it, the first call returns at once."""
+        deadline = self._next()
+        remaining = deadline - self._clock()
+        if remaining > 0:
+            self._sleep(remaining)
+        return self._tick(deadline)
+
+    async def wait_next_async(self) -> float:
+        deadline = self._next()
+        remaining = deadline - self._clock()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        return self._tick(deadline)
+
+    def _next(self) -> float:
+        now = self._clock()
+        if self._next_deadline is None:
+            self._next_deadline = now
+            return now
+
+        if now > self._next_deadline:
+            # the previous tick ran past this deadline, it is run late; with SKIP only the most recent
+            # of the deadlines that passed is run
+            self._overruns += 1
+            if self._policy == OverrunPolicy.SKIP:
+                missed = math.floor((now - self._next_deadline) / self._period)
+                self._skipped += missed
+                self._next_deadline += missed * self._period
+        return self._next_deadline
+
+    def _tick(self, deadline: float) -> float:
+        self._jitter.record(self._clock() - deadline)
+        self._ticks += 1
+        self._next_deadline = deadline + self._period
+        return deadline
+
+    def __str__(self):
+        return (f"PeriodicScheduler(period: {self._period}s, ticks: {self._ticks}, overruns: {self._overruns}, "
+                f"skipped: {self._skipped}, {self._jitter})")
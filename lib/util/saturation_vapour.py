@@ -0,0 +1,93 @@
+import math
+from enum import Enum
+
+import numpy as np
+
+
+class SaturationFormula(Enum):
+    MAGNUS = "MAGNUS"
+    BUCK = "BUCK"
+
+
+WATER_VAPOUR_GAS_CONSTANT = 461.5  # J/(kg K)
+KELVIN = 273.15
+
+# Magnus-Tetens coefficients over water (Alduchov & Eskridge), valid from -45 °C to 60 °C
+MAGNUS_A = 6.112
+MAGNUS_B = 17.62
+MAGNUS_C = 243.12
+
+# Buck (1996) coefficients over water
+BUCK_A = 6.1121
+BUCK_B = 18.678
+BUCK_C = 257.14
+BUCK_D = 234.5
+
+# hPa -> Pa and kg -> g, divided by the gas constant of water vapour
+_PRESSURE_TO_DENSITY = 100.0 / WATER_VAPOUR_GAS_CONSTANT * 1000.0
+
+
+class SaturationVapourEngine:
+    """
+    Calculates the saturation vapour density (g/m3), absolute humidity and dew point with the Magnus
+    or Buck formula instead of looking them up in waterdampspanning.csv.
+
+    All the methods accept a float or a NumPy array. `get_closest_value` has the same signature as
+    `CSVLookup.get_closest_value` so the engine can replace the table: it returns the saturation vapour
+    density `offset` degrees below the target (the table uses the row below the target), or None for a
+    target that isn't finite. The scalar path calculates the closed form directly, which is faster than
+    the table lookup.
+    """
+
+    def __init__(self, formula: SaturationFormula = SaturationFormula.MAGNUS, offset: float = 1.0):
+        self._formula = formula
+        self._offset = offset
+        # picked once, so a call doesn't compare the formula
+        self.get_closest_value = (self._buck_closest_value if formula == SaturationFormula.BUCK
+                                  else self._magnus_closest_value)
+
+    @property
+    def formula(self) -> SaturationFormula:
+        return self._formula
+
+    def saturation_vapour_pressure(self, temperature):
+        """Saturation vapour pressure in hPa."""
+        temperature = np.asarray(temperature, dtype=float)
+        if self._formula == SaturationFormula.BUCK:
+            return BUCK_A * np.exp((BUCK_B - temperature / BUCK_D) * (temperature / (BUCK_C + temperature)))
+        return MAGNUS_A * np.exp(MAGNUS_B * temperature / (MAGNUS_C + temperature))
+
+    def saturation_vapour_density(self, temperature):
+        """Maximum amount of water vapour the air can hold, in g/m3."""
+        temperature = np.asarray(temperature, dtype=float)
+        return self.saturation_vapour_pressure(temperature) * 100.0 / (WATER_VAPOUR_GAS_CONSTANT * (temperature + KELVIN)) * 1000.0
+
+    def absolute_humidity(self, temperature, relative_humidity):
+        """Water vapour in the air in g/m3, for a relative humidity in %."""
+        return self.saturation_vapour_density(temperature) * np.asarray(relative_humidity, dtype=float) / 100.0
+
+    def dew_point(self, temperature, relative_humidity):
+        """Dew point in °C (Magnus inversion), for a relative humidity in %."""
+        temperature = np.asarray(temperature, dtype=float)
+        relative_humidity = np.clip(np.asarray(relative_humidity, dtype=float), 1e-6, 100.0)
+        gamma = np.log(relative_humidity / 100.0) + MAGNUS_B * temperature / (MAGNUS_C + temperature)
+        return MAGNUS_C * gamma / (MAGNUS_B - gamma)
+
+    def _magnus_closest_value(self, target_temperature: float):
+        if not math.isfinite(target_temperature):
+            return None  # like CSVLookup, so the caller keeps its previous decision
+        # math instead of numpy, a single value is a lot faster without the array overhead
+        temperature = target_temperature - self._offset
+        pressure = MAGNUS_A * math.exp(MAGNUS_B * temperature / (MAGNUS_C + temperature))
+        return temperature, pressure * _PRESSURE_TO_DENSITY / (temperature + KELVIN)
+
+    def _buck_closest_value(self, target_temperature: float):
+        if not math.isfinite(target_temperature):
+            return None
+        temperature = target_temperature - self._offset
+        pressure = BUCK_A * math.exp((BUCK_B - temperature / BUCK_D) * (temperature / (BUCK_C + temperature)))
+        return temperature, pressure * _PRESSURE_TO_DENSITY / (temperature + KELVIN)
+
+    def get_closest_values(self, target_temperatures):
+        reference_temperatures = np.asarray(target_temperatures, dtype=float) - self._offset
+        return reference_temperatures, self.saturation_vapour_density(reference_temperatures)
@@ -0,0 +1,116 @@
+import asyncio
+
+from lib.mqtt.async_mqtt_manager import AsyncMQTTManager
+
+CONNACK = bytes([0x20, 0x02, 0x00, 0x00])
+PINGRESP = bytes([0xD0, 0x00])
+
+
+class _TinyBroker:
+    """Just enough of an MQTT broker to accept connections and subscriptions, and to drop them."""
+
+    def __init__(self):
+        self.connections = 0
+        self.subscriptions = 0
+        self._writers = []
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.drop_connections()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_connections(self):
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    async def _handle(self, reader, writer):
+        self._writers.append(writer)
+        try:
+            while True:
+                packet_type, body = await self._read_packet(reader)
+                if packet_type == 0x10:  # CONNECT
+                    self.connections += 1
+                    writer.write(CONNACK)
+                elif packet_type == 0x80:  # SUBSCRIBE, answered with a SUBACK granting QoS 0
+                    self.subscriptions += 1
+                    writer.write(bytes([0x90, 0x03]) + body[:2] + bytes([0x00]))
+                elif packet_type == 0xC0:  # PINGREQ
+                    writer.write(PINGRESP)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    @staticmethod
+    async def _read_packet(reader):
+        header = (await reader.readexactly(1))[0]
+        length, shift = 0, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return header & 0xF0, await reader.readexactly(length)
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+class TestAsyncMQTTManager:
+
+    def test_reconnects_and_subscribes_again_after_the_connection_drops(self):
+        async def scenario():
+            broker = _TinyBroker()
+            port = await broker.start()
+            manager = AsyncMQTTManager(broker_address="127.0.0.1", port=port, min_reconnect_delay=0.05)
+            manager.connect()
+            manager.subscribe("sensors")
+            connected = await _wait_for(lambda: manager.is_connected and broker.subscriptions == 1)
+
+            broker.drop_connections()
+            dropped = await _wait_for(lambda: not manager.is_connected)
+            reconnected = await _wait_for(lambda: manager.is_connected and broker.subscriptions == 2)
+
+            manager.disconnect()
+            await broker.stop()
+            return connected, dropped, reconnected, broker.connections
+
+        # act
+        connected, dropped, reconnected, connections = asyncio.run(scenario())
+
+        # assert
+        assert connected
+        assert dropped
+        assert reconnected
+        assert connections == 2
+
+    def test_does_not_reconnect_after_disconnect(self):
+        async def scenario():
+            broker = _TinyBroker()
+            port = await broker.start()
+            manager = AsyncMQTTManager(broker_address="127.0.0.1", port=port, min_reconnect_delay=0.05)
+            manager.connect()
+            await _wait_for(lambda: manager.is_connected)
+
+            manager.disconnect()
+            await asyncio.sleep(0.3)
+            await broker.stop()
+            return broker.connections
+
+        # act
+        connections = asyncio.run(scenario())
+
+        # assert
+        assert connections == 1
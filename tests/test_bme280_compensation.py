@@ -0,0 +1,64 @@
+import numpy as np
+
+from lib.sensor_drivers.bme280.batch_compensation import BatchCompensation
+from lib.sensor_drivers.bme280.bme280_driver import (Bme280, CompensatedReadings, FixedPointCompensatedReadings,
+                                                     Params, UncompensatedReadings)
+from lib.sensor_drivers.bme280.simulated_bus import EXAMPLE_CALIBRATION, SimulatedBme280Bus
+
+
+def raw_blocks(samples: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = rng.integers(400000, 600000, samples)  # about -12 to 50 °C
+    p = rng.integers(250000, 500000, samples)
+    h = rng.integers(15000, 45000, samples)
+    return np.stack([p >> 12 & 0xFF, p >> 4 & 0xFF, (p & 0x0F) << 4,
+                     t >> 12 & 0xFF, t >> 4 & 0xFF, (t & 0x0F) << 4,
+                     h >> 8, h & 0xFF], axis=1).astype(np.uint8)
+
+
+class TestBme280Compensation:
+
+    def test_batch_gives_the_same_results_as_the_scalar_compensation(self):
+        # arrange
+        blocks = raw_blocks(1000)
+        params = Params(EXAMPLE_CALIBRATION)
+        readings = [UncompensatedReadings(block) for block in blocks.tolist()]
+
+        # act
+        batch = BatchCompensation(params).compensate(blocks)
+        fixed_point_batch = BatchCompensation(params).compensate(readings, fixed_point=True)
+
+        # assert
+        floats = [CompensatedReadings(raw, params) for raw in readings]
+        fixed_points = [FixedPointCompensatedReadings(raw, params) for raw in readings]
+        assert np.array_equal(batch.temperature, [reading.temperature for reading in floats])
+        assert np.array_equal(batch.pressure, [reading.pressure for reading in floats])
+        assert np.array_equal(batch.humidity, [reading.humidity for reading in floats])
+        assert np.array_equal(fixed_point_batch.temperature, [reading.temperature for reading in fixed_points])
+        assert np.array_equal(fixed_point_batch.pressure, [reading.pressure for reading in fixed_points])
+        assert np.array_equal(fixed_point_batch.humidity, [reading.humidity for reading in fixed_points])
+
+    def test_fixed_point_is_within_its_resolution_of_the_float_results(self):
+        # arrange
+        blocks = raw_blocks(1000, seed=2)
+        compensation = BatchCompensation(EXAMPLE_CALIBRATION)
+
+        # act
+        floats = compensation.compensate(blocks)
+        fixed_points = compensation.compensate(blocks.tobytes(), fixed_point=True)
+
+        # assert
+        assert len(fixed_points) == 1000
+        assert np.abs(floats.temperature - fixed_points.temperature).max() <= 0.01
+        assert np.abs(floats.pressure - fixed_points.pressure).max() <= 0.01
+        assert np.abs(floats.humidity - fixed_points.humidity).max() <= 0.01
+
+    def test_driver_can_use_the_fixed_point_compensation(self):
+        # act
+        floats = Bme280(SimulatedBme280Bus()).get_sensor_data()
+        fixed_points = Bme280(SimulatedBme280Bus(), fixed_point=True).get_sensor_data()
+
+        # assert
+        assert fixed_points.temperature == 25.08
+        assert abs(floats.pressure - fixed_points.pressure) <= 0.01
+        assert abs(floats.humidity - fixed_points.humidity) <= 0.01
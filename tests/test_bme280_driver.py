@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from lib.sensor_drivers.bme280.bme280_driver import Bme280, FilterCoefficient, OperatingMode, SampleModes, StandbyTime
+from lib.sensor_drivers.bme280.calibration_cache import CalibrationCache
+from lib.sensor_drivers.bme280.simulated_bus import EXAMPLE_CALIBRATION, SimulatedBme280Bus
+from lib.sensor_drivers.sensor_factory import SensorFactory
+
+
+class NoBlockReadBus(SimulatedBme280Bus):
+
+    def read_i2c_block_data(self, address, register, length):
+        if register != 0xF7:
+            raise OSError("block reads not supported")
+        return super().read_i2c_block_data(address, register, length)
+
+
+class TestBme280Driver:
+
+    def test_block_read_decodes_the_same_as_register_reads(self):
+        # arrange
+        bus = SimulatedBme280Bus()
+
+        # act
+        sensor = Bme280(bus)
+        transactions = bus.transactions
+
+        # assert
+        assert transactions == 2
+        assert dict(sensor._compensation_params) == EXAMPLE_CALIBRATION
+        assert dict(sensor._read_calibration_registers()) == EXAMPLE_CALIBRATION
+
+    def test_negative_humidity_parameters_are_decoded(self):
+        # arrange
+        calibration = dict(EXAMPLE_CALIBRATION, dig_H2=-120, dig_H4=-300, dig_H5=-45, dig_H6=-8)
+
+        # act
+        sensor = Bme280(SimulatedBme280Bus(calibration))
+
+        # assert
+        assert dict(sensor._compensation_params) == calibration
+
+    def test_sensor_data_is_compensated(self):
+        # act
+        sensor_data = Bme280(SimulatedBme280Bus()).get_sensor_data()
+
+        # assert
+        assert sensor_data.temperature == pytest.approx(25.08, abs=0.01)
+        assert sensor_data.humidity == pytest.approx(55.0, abs=1)
+        assert sensor_data.pressure == pytest.approx(1006.5, abs=0.5)
+
+    def test_cached_calibration_is_only_verified(self, tmp_path):
+        # arrange
+        calibration_cache = CalibrationCache(str(tmp_path / "bme280_calibration.json"))
+        Bme280(SimulatedBme280Bus(), calibration_cache=calibration_cache, bus_id=1)
+        bus = SimulatedBme280Bus()
+
+        # act
+        sensor = Bme280(bus, calibration_cache=calibration_cache, bus_id=1)
+
+        # assert
+        assert bus.transactions == 2  # chip id and dig_T1
+        assert dict(sensor._compensation_params) == EXAMPLE_CALIBRATION
+
+    def test_swapped_sensor_is_read_again(self, tmp_path):
+        # arrange
+        calibration_cache = CalibrationCache(str(tmp_path / "bme280_calibration.json"))
+        Bme280(SimulatedBme280Bus(), calibration_cache=calibration_cache, bus_id=1)
+        calibration = dict(EXAMPLE_CALIBRATION, dig_T1=28000, dig_H1=80)
+
+        # act
+        sensor = Bme280(SimulatedBme280Bus(calibration), calibration_cache=calibration_cache, bus_id=1)
+
+        # assert
+        assert dict(sensor._compensation_params) == calibration
+        assert calibration_cache.get(CalibrationCache.key(1, 0x76, 0x60))["dig_T1"] == 28000
+
+    def test_falls_back_to_register_reads(self):
+        # arrange
+        bus = NoBlockReadBus()
+
+        # act
+        sensor = Bme280(bus)
+
+        # assert
+        assert dict(sensor._compensation_params) == EXAMPLE_CALIBRATION
+        assert bus.transactions > 2
+
+    def test_normal_mode_is_configured_once(self):
+        # arrange
+        bus = SimulatedBme280Bus()
+
+        # act
+        sensor = Bme280(bus, sampling=SampleModes.SAMPLE_X2, mode=OperatingMode.NORMAL,
+                        standby=StandbyTime.STANDBY_125_MS, iir_filter=FilterCoefficient.X4)
+
+        # assert
+        assert bus.writes == [(0xF4, 0), (0xF2, 2), (0xF5, 2 << 5 | 2 << 2), (0xF4, 2 << 5 | 2 << 2 | 3)]
+        assert sensor.sampling_period == pytest.approx(sensor.measurement_time + 0.125)
+
+    def test_normal_mode_reads_without_waiting(self):
+        # arrange
+        bus = SimulatedBme280Bus()
+        sensor = Bme280(bus, mode=OperatingMode.NORMAL)
+        bus.transactions = 0
+        bus.writes.clear()
+
+        # act
+        start = time.perf_counter()
+        sensor_data = sensor.get_sensor_data()
+        elapsed = time.perf_counter() - start
+
+        # assert
+        assert bus.transactions == 1
+        assert bus.writes == []
+        assert elapsed < sensor.measurement_time
+        assert sensor_data.temperature == pytest.approx(25.08, abs=0.01)
+
+    def test_bme280_settings_from_config(self):
+        # act
+        options = SensorFactory._bme280_options({"mode": "normal", "standby_ms": 20, "iir_filter": 16, "oversampling": 4})
+
+        # assert
+        assert options == {"mode": OperatingMode.NORMAL, "sampling": SampleModes.SAMPLE_X4,
+                           "standby": StandbyTime.STANDBY_20_MS, "iir_filter": FilterCoefficient.X16}
+        with pytest.raises(ValueError):
+            SensorFactory._bme280_options({"mode": "continuous"})
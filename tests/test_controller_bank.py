@@ -0,0 +1,58 @@
+import numpy as np
+
+from lib.controllers.controller_bank import ControllerBank
+from lib.controllers.enviroment_controller import EnvironmentController
+
+
+class TestControllerBank:
+
+    def test_decisions_are_the_same_as_the_scalar_controller(self):
+        # arrange
+        rng = np.random.default_rng(7)
+        size = 200
+        kp, kd, threshold = rng.uniform(0, 1, size), rng.uniform(0, 1, size), rng.uniform(-0.5, 1, size)
+        controllers = [EnvironmentController(*gains) for gains in zip(kp.tolist(), kd.tolist(), threshold.tolist())]
+        for controller in controllers[::4]:
+            controller.disable_pid()
+        bank = ControllerBank.from_controllers(controllers)
+
+        for _ in range(100):
+            internal, external = rng.normal(20, 3, size), rng.normal(20, 3, size)
+
+            # act
+            decisions = bank.calculate_device_on_off(internal, external)
+            expected = [controller.calculate_device_on_off(internal_value, external_value)
+                        for controller, internal_value, external_value in zip(controllers, internal.tolist(), external.tolist())]
+
+            # assert
+            assert decisions.tolist() == expected
+
+        assert bank.integral.tolist() == [controller._integral for controller in controllers]
+        assert bank.previous_error.tolist() == [controller._previous_error for controller in controllers]
+
+    def test_gains_are_broadcast(self):
+        # arrange
+        bank = ControllerBank(0.3, 0.2, 0.5, size=3)
+        controller = EnvironmentController(0.3, 0.2, 0.5)
+
+        # act
+        decisions = bank.calculate_device_on_off([18, 20, 25], [20, 20, 20])
+
+        # assert
+        assert len(bank) == 3
+        assert decisions.tolist() == [True, False, False]
+        assert decisions[0] == controller.calculate_device_on_off(18, 20)
+
+    def test_set_gains_starts_over(self):
+        # arrange
+        bank = ControllerBank([0.3, 0.3], [0.2, 0.2], [0.5, 0.5])
+        bank.calculate_device_on_off([18, 18], [20, 20])
+
+        # act
+        bank.set_gains(1, 0.9, 0.1, 0.2)
+        bank.disable_pid(0)
+
+        # assert
+        assert bank.integral.tolist() == [2.0, 0.0]
+        assert bank.use_pid.tolist() == [False, True]
+        assert bank.calculate_device_on_off([21, 18], [20, 20]).tolist() == [False, True]
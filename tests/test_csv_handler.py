@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from lib.util.csv_lookup import CSVLookup
@@ -19,4 +20,53 @@ class TestCsvHandler:
         target_value = csv_env_table.get_closest_value(test_input)
 
         # arrange
-        assert target_value == expected
\ No newline at end of file
+        assert target_value == expected
+
+    @pytest.mark.parametrize("test_input", [-20, -14, -13.5, 0, 0.01, 20.59, 34.99, 35, 35.5, 80])
+    def test_closest_value_matches_linear_scan(self, test_input):
+        csv_env_table = CSVLookup("../doc/waterdampspanning.csv")
+        valid_keys = [temp for temp in csv_env_table.lookup_table.keys() if temp < test_input]
+        expected = (max(valid_keys), csv_env_table.lookup_table[max(valid_keys)]) if valid_keys else None
+
+        # act
+        target_value = csv_env_table.get_closest_value(test_input)
+
+        # assert
+        assert target_value == expected
+
+    def test_closest_values_for_an_array(self):
+        csv_env_table = CSVLookup("../doc/waterdampspanning.csv")
+        targets = [20.59, 35, 4, 17.01, 15.99, -20]
+
+        # act
+        temperatures, values = csv_env_table.get_closest_values(targets)
+
+        # assert
+        for target, temperature, value in zip(targets[:-1], temperatures, values):
+            assert (temperature, value) == csv_env_table.get_closest_value(target)
+        assert np.isnan(temperatures[-1]) and np.isnan(values[-1])
+
+    def test_interpolated_value(self):
+        csv_env_table = CSVLookup("../doc/waterdampspanning.csv", interpolate=True)
+
+        # act
+        target_value = csv_env_table.get_closest_value(20.5)
+        _, values = csv_env_table.get_closest_values([20.5, 20])
+
+        # assert
+        assert target_value[0] == 20.5
+        assert target_value[1] == pytest.approx((17.28 + csv_env_table.lookup_table[21]) / 2)
+        assert values[0] == pytest.approx(target_value[1])
+        assert values[1] == 17.28
+
+    @pytest.mark.parametrize("interpolate", [False, True])
+    def test_no_value_for_a_temperature_that_is_not_finite(self, interpolate):
+        csv_env_table = CSVLookup("../doc/waterdampspanning.csv", interpolate=interpolate)
+
+        # act
+        target_values = [csv_env_table.get_closest_value(target) for target in (float("nan"), float("inf"), float("-inf"))]
+        _, values = csv_env_table.get_closest_values([float("nan"), float("inf")])
+
+        # assert
+        assert target_values == [None, None, None]
+        assert np.isnan(values).all()
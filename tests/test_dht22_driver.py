@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.dht22.dht22_driver import Dht22
+
+
+class FlakyDht22(Dht22):
+    MIN_INTERVAL = 0.01
+
+    def __init__(self, failures: int, **kwargs):
+        self.remaining_failures = failures
+        self.read_times = []
+        super().__init__(4, **kwargs)
+
+    def _read_data(self) -> SensorData:
+        self.read_times.append(time.monotonic())
+        if self.remaining_failures > 0:
+            self.remaining_failures -= 1
+            raise IOError("checksum error")
+        return SensorData(temperature=21.5, humidity=40.0)
+
+
+class TestDht22Driver:
+
+    def test_reading_returns_the_latest_value_at_once(self):
+        # arrange
+        sensor = FlakyDht22(failures=0, interval=0.05)
+        sensor.get_sensor_data()  # waits for the first read
+
+        # act
+        start = time.perf_counter()
+        sensor_data = sensor.get_sensor_data()
+        elapsed = time.perf_counter() - start
+        sensor.close()
+
+        # assert
+        assert elapsed < 0.001
+        assert sensor_data.temperature == 21.5
+        assert sensor_data.pressure == SensorData().pressure
+        assert sensor.latest.age < 0.1
+        assert sensor.get_timed_sensor_data()[1] == sensor.latest.taken_at
+
+    def test_reads_are_not_faster_than_the_minimum_interval(self):
+        # arrange
+        sensor = FlakyDht22(failures=0, interval=0.0)
+
+        # act
+        time.sleep(0.1)
+        sensor.close()
+
+        # assert
+        gaps = [b - a for a, b in zip(sensor.read_times, sensor.read_times[1:])]
+        assert sensor.interval == FlakyDht22.MIN_INTERVAL
+        assert len(gaps) > 2 and min(gaps) >= FlakyDht22.MIN_INTERVAL * 0.9
+
+    def test_failed_reads_are_retried_with_backoff(self):
+        # arrange
+        sensor = FlakyDht22(failures=3, interval=0.01, max_backoff=1.0)
+
+        # act
+        sensor_data = sensor.get_sensor_data()
+        sensor.close()
+
+        # assert
+        gaps = [b - a for a, b in zip(sensor.read_times, sensor.read_times[1:])]
+        assert sensor_data.temperature == 21.5
+        assert sensor.failures == 3 and sensor.consecutive_failures == 0
+        assert gaps[0] >= 0.009 and gaps[1] >= 0.019 and gaps[2] >= 0.039
+
+    def test_old_reading_is_not_returned(self):
+        # arrange
+        sensor = FlakyDht22(failures=0, interval=10.0, max_age=0.02)
+        sensor.get_sensor_data()
+
+        # act
+        time.sleep(0.05)
+
+        # assert
+        with pytest.raises(IOError):
+            sensor.get_sensor_data()
+        sensor.close()
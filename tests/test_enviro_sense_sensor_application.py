@@ -0,0 +1,61 @@
+import logging
+
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.envirosense_app.enviro_sense_sensor_application import EnviroSenseSensorApplication
+from lib.mqtt.mqtt_topic import MqttTopic
+
+
+class RecordingMqttManager:
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        self.published.append((topic, payload))
+
+
+class TestEnviroSenseSensorApplication:
+
+    def _application(self, mqtt_manager, batch_size=1, batch_max_age=30) -> EnviroSenseSensorApplication:
+        return EnviroSenseSensorApplication("LP_ENVIROSENSE_APP", logging.getLogger("test"),
+                                            "mock", 118, "mock", 22, mqtt_manager,
+                                            batch_size=batch_size, batch_max_age=batch_max_age)
+
+    def test_publishes_every_sample_without_batching(self):
+        # arrange
+        mqtt_manager = RecordingMqttManager()
+        application = self._application(mqtt_manager)
+
+        # act
+        application.publish_sensor_data()
+        application.publish_sensor_data()
+
+        # assert
+        assert [topic for topic, _ in mqtt_manager.published] == [MqttTopic("LP_ENVIROSENSE_APP").sensor_data_topic] * 2
+
+    def test_flushes_a_full_batch(self):
+        # arrange
+        mqtt_manager = RecordingMqttManager()
+        application = self._application(mqtt_manager, batch_size=3)
+
+        # act
+        for _ in range(7):
+            application.publish_sensor_data()
+        application.flush()
+
+        # assert
+        topics = [topic for topic, _ in mqtt_manager.published]
+        sizes = [len(SensorDataBatch.from_wire(payload).payloads) for _, payload in mqtt_manager.published]
+        assert topics == [MqttTopic("LP_ENVIROSENSE_APP").sensor_data_batch_topic] * 3
+        assert sizes == [3, 3, 1]
+
+    def test_flushes_an_old_batch(self):
+        # arrange
+        mqtt_manager = RecordingMqttManager()
+        application = self._application(mqtt_manager, batch_size=100, batch_max_age=0)
+
+        # act
+        application.publish_sensor_data()
+
+        # assert
+        assert len(mqtt_manager.published) == 1
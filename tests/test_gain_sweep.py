@@ -0,0 +1,96 @@
+import numpy as np
+
+from lib.domain.sensor_status import SensorStatus
+from lib.history.sensor_history_store import RECORD_DTYPE, STATUS_CODES
+from lib.tuning.gain_sweep import GainSet, GainSweep, TuningScenario, evaluate
+from lib.tuning.plant_model import FirstOrderPlant
+
+
+def _scenario(steps: int = 400) -> TuningScenario:
+    return TuningScenario(setpoints=[23.0] * steps, outside=[15.0] * steps, start_value=18.0)  # cold outside
+
+
+class TestGainSweep:
+
+    def test_plant_is_fitted_on_readings(self):
+        # arrange
+        plant = FirstOrderPlant(heating_rate=0.3, loss_rate=0.08)
+        inside, outside, device_on = [15.0], np.full(200, 10.0), np.arange(200) % 7 < 3
+        for step in range(199):
+            inside.append(plant.step(inside[-1], outside[step], device_on[step]))
+
+        # act
+        fitted = FirstOrderPlant.fit(np.array(inside), outside, device_on.astype(int))
+
+        # assert
+        assert abs(fitted.heating_rate - 0.3) < 1e-9
+        assert abs(fitted.loss_rate - 0.08) < 1e-9
+
+    def test_evaluate_measures_the_closed_loop(self):
+        # act
+        result = evaluate(GainSet(0.5, 0.0, 1.0), _scenario())
+
+        # assert
+        assert result.settling_time is not None and result.settling_time > 0
+        assert 0 < result.overshoot < 1
+        assert result.toggles >= 1
+
+    def test_controller_that_never_switches_on_ranks_last(self):
+        # arrange
+        gain_sets = [GainSet(0.5, 0.0, 1.0), GainSet(0.0, 0.0, 1000.0)]
+
+        # act
+        results = GainSweep(_scenario(), workers=1).run(gain_sets)
+
+        # assert
+        assert results[0].gains == gain_sets[0]
+        assert results[-1].settling_time is None and results[-1].toggles == 0
+
+    def test_process_pool_gives_the_same_ranking(self):
+        # arrange
+        gain_sets = GainSweep.grid([0.1, 0.3, 0.5], [0.0, 0.2], [0.25, 0.5, 1.0])
+
+        # act
+        sequential = GainSweep(_scenario(), workers=1).run(gain_sets)
+        parallel = GainSweep(_scenario(), workers=2, chunk_size=4).run(gain_sets)
+
+        # assert
+        assert len(parallel) == len(gain_sets)
+        assert [result.gains for result in parallel] == [result.gains for result in sequential]
+
+    def test_refine_moves_a_gain_of_zero_within_the_range(self):
+        # act
+        gain_sets = GainSweep.refine(GainSet(0.5, 0.0, 1.0), 200, spread=0.25, kp_range=(0.0, 1.0),
+                                     kd_range=(0.0, 0.4), threshold_range=(0.0, 1.0), seed=1)
+
+        # assert
+        kd_values = np.array([gains.kd for gains in gain_sets])
+        thresholds = np.array([gains.threshold for gains in gain_sets])
+        assert (kd_values > 0).any() and kd_values.min() >= 0.0 and kd_values.max() <= 0.1
+        assert thresholds.max() <= 1.0 and thresholds.min() >= 0.75
+
+    def test_scenario_from_history_skips_readings_without_a_good_value(self):
+        # arrange
+        plant = FirstOrderPlant(heating_rate=0.3, loss_rate=0.08)
+        records = np.zeros(60, dtype=RECORD_DTYPE)
+        records["timestamp"] = np.arange(60) * 3.0
+        records["external_temperature"] = 10.0
+        records["heater_on"] = np.arange(60) % 7 < 3
+        inside = 15.0
+        for step in range(60):
+            records["internal_temperature"][step] = inside
+            inside = plant.step(inside, 10.0, records["heater_on"][step])
+        records["internal_temperature"][0] = np.nan
+        records["external_temperature"][[10, 30]] = np.nan
+        records["external_status"][[10, 30]] = STATUS_CODES.index(SensorStatus.MISSING)
+        records["internal_status"][45] = STATUS_CODES.index(SensorStatus.STALE)
+
+        # act
+        scenario = TuningScenario.from_history(records)
+
+        # assert
+        assert len(scenario.setpoints) == 56
+        assert not np.isnan(scenario.setpoints).any()
+        assert scenario.start_value == records["internal_temperature"][1]
+        assert abs(scenario.plant.heating_rate - 0.3) < 1e-5
+        assert abs(scenario.plant.loss_rate - 0.08) < 1e-5
@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.i2c.i2c_bus_manager import I2cBusManager, SharedI2cBus
+from lib.sensor_drivers.bme280.bme280_driver import Bme280
+from lib.sensor_drivers.bme280.simulated_bus import SimulatedBme280Bus
+
+
+class ExclusiveBus(SimulatedBme280Bus):
+    """Fails when two transactions overlap, like an adapter without locking would garble them."""
+
+    def __init__(self):
+        super().__init__()
+        self._busy = threading.Lock()
+        self.overlaps = 0
+
+    def _transaction(self, length: int) -> None:
+        if not self._busy.acquire(blocking=False):
+            self.overlaps += 1
+            return
+        try:
+            super()._transaction(length)
+            time.sleep(0.0005)
+        finally:
+            self._busy.release()
+
+
+class TestI2cBusManager:
+
+    def test_bus_is_opened_once(self):
+        # arrange
+        opened = []
+        manager = I2cBusManager(opener=lambda bus_id: opened.append(bus_id) or SimulatedBme280Bus())
+
+        # act
+        first = manager.bus(1)
+        second = manager.bus(1)
+        other = manager.bus(0)
+
+        # assert
+        assert first is second and first is not other
+        assert opened == [1, 0]
+
+    def test_transactions_of_devices_do_not_interleave(self):
+        # arrange
+        raw_bus = ExclusiveBus()
+        bus = SharedI2cBus(raw_bus, 1)
+        internal = Bme280(bus, 0x76)
+        external = Bme280(bus, 0x77)
+
+        # act
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            readings = list(executor.map(lambda sensor: sensor.get_sensor_data(), [internal, external] * 10))
+
+        # assert
+        assert raw_bus.overlaps == 0
+        assert len(readings) == 20
+        assert bus.device_latency(0x76).count > 0 and bus.device_latency(0x77).count > 0
+        assert bus.latency.count == bus.device_latency(0x76).count + bus.device_latency(0x77).count
+
+    def test_read_many_waits_once_for_all_sensors(self):
+        # arrange
+        bus = SharedI2cBus(SimulatedBme280Bus(), 1)
+        sensors = [Bme280(bus, 0x76), Bme280(bus, 0x77)]
+        one = sensors[0].measurement_time
+
+        # act
+        start = time.perf_counter()
+        readings = Bme280.read_many(sensors)
+        elapsed = time.perf_counter() - start
+
+        # assert
+        assert elapsed < 2 * one
+        assert [reading.temperature for reading in readings] == [sensor.get_sensor_data().temperature for sensor in sensors]
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from queue import Queue
+
+import pytest
+
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.envirocontrol_app.async_enviro_control import AsyncEnviroControl
+from lib.envirosense_app.async_enviro_sense import AsyncEnviroSense
+from lib.envirosense_app.enviro_sense import EnviroSense
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.transports.loopback_transport import LoopbackBroker, LoopbackTransport
+from lib.sensor_drivers.sensor_hub import SensorHub
+
+example_config = {
+    'enviro_sense':
+        {
+            'internal_sensor_driver': 'mock', 'internal_sensor_address': 0x76,
+            'external_sensor_driver': 'mock', 'external_sensor_address': 22,
+            'relay_driver': 'mock',
+            'broker_address': 'localhost', 'broker_port': 1883,
+            'mqtt_transport': 'loopback',
+            'enable_pid': False,
+            'kp_heater': 0.3, 'kd_heater': 0.2, 'threshold_heater': 0.5,
+            'kp_steamer': 0.3, 'kd_steamer': 0.2, 'threshold_steamer': 0.5,
+            'sensor_publish_data_timeout': 0.05,
+            'sensor_digital_id': 'LOOPBACK_ROOM',
+            'control_relay_gpio_1': 17, 'control_relay_gpio_2': 27,
+            'humidity_table_path': '../doc/waterdampspanning.csv',
+        }
+}
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _subscriber(broker: LoopbackBroker, topic: str, qos: int = 0, client_id: str = "", clean_session: bool = True):
+    messages = Queue()
+    transport = LoopbackTransport(broker, client_id=client_id, clean_session=clean_session)
+    transport.on_message = lambda client, userdata, message: messages.put(message)
+    transport.connect()
+    transport.subscribe(topic, qos)
+    return transport, messages
+
+
+class TestLoopbackTransport:
+
+    def test_topic_wildcards(self):
+        assert LoopbackBroker.topic_matches("/+/sensor_data/", "/ROOM_1/sensor_data/")
+        assert not LoopbackBroker.topic_matches("/+/sensor_data/", "/ROOM_1/sensor_data_batch/")
+        assert LoopbackBroker.topic_matches("/ROOM_1/#", "/ROOM_1/sensor_data/")
+        assert LoopbackBroker.topic_matches("sensors/#", "sensors")
+        assert not LoopbackBroker.topic_matches("+/status", "$SYS/status")
+
+    def test_message_is_routed_to_the_matching_subscribers(self):
+        # arrange
+        broker = LoopbackBroker()
+        publisher = LoopbackTransport(broker)
+        publisher.connect()
+        _, room_1 = _subscriber(broker, "/ROOM_1/sensor_data/")
+        _, all_rooms = _subscriber(broker, "/+/sensor_data/", qos=1)
+
+        # act
+        message_info = publisher.publish("/ROOM_1/sensor_data/", "payload", qos=1)
+
+        # assert
+        assert message_info.is_published()
+        assert room_1.get(timeout=1).qos == 0  # the qos of the subscription
+        message = all_rooms.get(timeout=1)
+        assert message.payload == b"payload" and message.qos == 1 and not message.retain
+
+    def test_retained_message_is_delivered_to_new_subscribers(self):
+        # arrange
+        broker = LoopbackBroker()
+        publisher = LoopbackTransport(broker)
+        publisher.connect()
+        publisher.publish("/ROOM_1/set_heater_values/", b"\x01", qos=1, retain=True)
+
+        # act
+        _, messages = _subscriber(broker, "/ROOM_1/#", qos=1)
+
+        # assert
+        message = messages.get(timeout=1)
+        assert message.retain and message.payload == b"\x01"
+
+        publisher.publish("/ROOM_1/set_heater_values/", "", retain=True)
+        assert broker.retained == {}
+
+    def test_qos_1_is_kept_for_a_persistent_session_and_qos_0_is_dropped(self):
+        # arrange
+        broker = LoopbackBroker()
+        publisher = LoopbackTransport(broker)
+        publisher.connect()
+        subscriber, messages = _subscriber(broker, "/ROOM_1/sensor_data/", qos=1, client_id="control", clean_session=False)
+        subscriber.disconnect()
+
+        # act
+        publisher.publish("/ROOM_1/sensor_data/", "lost", qos=0)
+        publisher.publish("/ROOM_1/sensor_data/", "kept", qos=1)
+        subscriber.connect()
+
+        # assert
+        assert messages.get(timeout=1).payload == b"kept"
+        assert messages.empty()
+
+    def test_publish_without_connection_fails(self):
+        transport = LoopbackTransport(LoopbackBroker())
+
+        message_info = transport.publish("/ROOM_1/sensor_data/", "payload", qos=1)
+
+        assert not message_info.is_published()
+
+    def test_mqtt_manager_over_loopback(self):
+        # arrange
+        broker = LoopbackBroker()
+        received = Queue()
+        subscriber = MQTTManager(message_list=received, transport=LoopbackTransport(broker))
+        publisher = MQTTManager(transport=LoopbackTransport(broker))
+        subscriber.connect()
+        publisher.connect()
+        subscriber.subscribe("/ROOM_1/sensor_data/")
+
+        # act
+        publisher.publish("/ROOM_1/sensor_data/", b"\xb5\x01")
+
+        # assert
+        assert subscriber.wait_until_connected(timeout=1)
+        assert received.get(timeout=1)["payload"] == b"\xb5\x01"  # binary payloads stay bytes
+
+    def test_enviro_sense_and_enviro_control_in_one_process(self):
+        # arrange
+        enviro_control = EnviroControl(example_config)
+        enviro_sense = EnviroSense(example_config)
+        control_thread = threading.Thread(target=enviro_control.run)
+        sense_thread = threading.Thread(target=enviro_sense.run)
+
+        # act
+        control_thread.start()
+        sense_thread.start()
+        handled = _wait_for(lambda: enviro_control.dispatch_stats.messages_handled >= 3)
+        enviro_sense.stop()
+        enviro_control.stop()
+        sense_thread.join(timeout=5)
+        control_thread.join(timeout=5)
+
+        # assert
+        assert handled
+        assert enviro_control.dispatch_stats.messages_unhandled == 0
+
+    def test_enviro_sense_reads_through_the_hub_it_is_given(self):
+        # arrange
+        sensor_hub = SensorHub()
+        enviro_sense = EnviroSense(example_config, sensor_hub=sensor_hub)
+        enviro_sense.stop()
+
+        # act
+        enviro_sense.run()
+
+        # assert
+        assert len(sensor_hub.keys()) == 2  # not closed, the hub belongs to the caller
+        assert SensorHub._shared is not sensor_hub
+
+    def test_asyncio_runtime_rejects_what_it_does_not_support(self):
+        # arrange
+        with_outbox = {'enviro_sense': dict(example_config['enviro_sense'], mqtt_transport='paho', outbox_path='outbox')}
+
+        # act / assert
+        with pytest.raises(ValueError):
+            AsyncEnviroSense(example_config)
+        with pytest.raises(ValueError):
+            AsyncEnviroSense(with_outbox)
+        with pytest.raises(ValueError):
+            AsyncEnviroControl(example_config)
+
+    def test_asyncio_runtime_flushes_the_history_after_the_relays_stopped(self, tmp_path):
+        # arrange
+        config = {'enviro_sense': dict(example_config['enviro_sense'], mqtt_transport='paho',
+                                       history_path=str(tmp_path / 'history'))}
+        enviro_control = AsyncEnviroControl(config)
+        flushed_with_relays_running = []
+        flush = enviro_control._history_store.flush
+
+        def flush_and_record():
+            flushed_with_relays_running.append(enviro_control._heating_element._task is not None)
+            flush()
+
+        enviro_control._history_store.flush = flush_and_record
+
+        async def scenario():
+            enviro_control._heating_element.start()
+            await enviro_control._shutdown_async()
+
+        # act
+        asyncio.run(scenario())
+
+        # assert
+        assert flushed_with_relays_running == [False]
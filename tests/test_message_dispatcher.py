@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import threading
+import time
+from queue import Queue
+
+from lib.util.message_dispatcher import MessageDispatcher, AsyncMessageDispatcher
+
+
+class TestMessageDispatcher:
+
+    def test_dispatches_messages_to_topic_handler(self):
+        # arrange
+        message_queue = Queue()
+        dispatcher = MessageDispatcher(message_queue, logging.getLogger("test"), tick_interval=10)
+        received = []
+        dispatcher.register_handler("/a/", lambda message: received.append(message["payload"]))
+        message_queue.put({"topic": "/a/", "payload": "1", "qos": 0})
+        message_queue.put({"topic": "/b/", "payload": "2", "qos": 0})
+
+        # act
+        thread = threading.Thread(target=dispatcher.run)
+        thread.start()
+        time.sleep(0.1)
+        dispatcher.stop()
+        thread.join(timeout=1)
+
+        # assert
+        assert received == ["1"]
+        assert dispatcher.stats.messages_handled == 1
+        assert dispatcher.stats.messages_unhandled == 1
+
+    def test_idle_while_waiting_for_messages(self):
+        # arrange
+        message_queue = Queue()
+        dispatcher = MessageDispatcher(message_queue, logging.getLogger("test"), tick_interval=0.05)
+        ticks = []
+        dispatcher.register_tick(lambda: ticks.append(1))
+
+        # act
+        thread = threading.Thread(target=dispatcher.run)
+        thread.start()
+        time.sleep(0.3)
+        dispatcher.stop()
+        thread.join(timeout=1)
+
+        # assert
+        assert len(ticks) >= 3
+        assert dispatcher.stats.idle_time > 0.2
+        assert dispatcher.stats.utilization < 0.5
+
+    def test_async_dispatcher_awaits_messages(self):
+        # arrange
+        received = []
+
+        async def scenario():
+            message_queue = asyncio.Queue()
+            dispatcher = AsyncMessageDispatcher(message_queue, logging.getLogger("test"), tick_interval=10)
+            dispatcher.register_handler("/a/", lambda message: received.append(message["payload"]))
+            task = asyncio.create_task(dispatcher.run_async())
+            message_queue.put_nowait({"topic": "/a/", "payload": "1", "qos": 0})
+            await asyncio.sleep(0.05)
+            dispatcher.stop()
+            await task
+            return dispatcher.stats
+
+        # act
+        stats = asyncio.run(scenario())
+
+        # assert
+        assert received == ["1"]
+        assert stats.messages_handled == 1
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+from lib.domain.room_control_data import RoomControlData
+from lib.envirocontrol_app.multi_room_enviro_control import MultiRoomEnviroControl
+from lib.mqtt.mqtt_manager import MQTTManager
+from lib.mqtt.mqtt_topic import MqttTopic
+from lib.mqtt.transports.loopback_transport import LoopbackTransport
+
+example_config = {
+    'enviro_sense':
+        {
+            'relay_driver': 'mock',
+            'enable_pid': False,
+            'humidity_table_path': '../doc/waterdampspanning.csv',
+            'control_worker_threads': 2,
+            'control_rooms': [
+                {'digital_id': 'ROOM_1', 'relay_gpio_1': 17, 'relay_gpio_2': 27},
+                {'digital_id': 'ROOM_2', 'relay_gpio_1': 22, 'relay_gpio_2': 23, 'kp_heater': 0.9},
+                {'digital_id': 'ROOM_3', 'relay_gpio_1': 5, 'relay_gpio_2': 6},
+            ]
+        }
+}
+
+payload = json.dumps({
+    "id": "bea83a3b-3034-476f-8451-a2677a4ffc3c",
+    "internal_sensor_data": {"temperature": 18.0, "humidity": 40.0, "pressure": 1013.25},
+    "external_sensor_data": {"temperature": 22.0, "humidity": 60.0, "pressure": 1013.25},
+    "timestamp": "2024-10-18 14:38:23.343361"
+})
+
+
+class TestMultiRoomEnviroControl:
+
+    def test_topic_digital_id(self):
+        assert MqttTopic.wildcard().sensor_data_topic == "/+/sensor_data/"
+        assert MqttTopic.digital_id_from_topic("/ROOM_1/sensor_data/") == "ROOM_1"
+
+    def test_rooms_are_spread_over_the_shards(self):
+        # arrange
+        enviro_control = MultiRoomEnviroControl(example_config)
+
+        # act
+        shards = [room.shard for room in enviro_control.rooms.values()]
+
+        # assert
+        assert shards == [0, 1, 0]
+        assert enviro_control.rooms['ROOM_2'].heating_control._kp == 0.9
+        assert enviro_control.rooms['ROOM_1'].csv_env_table is enviro_control.rooms['ROOM_3'].csv_env_table
+
+    def test_archive_size_comes_from_the_config(self):
+        # arrange
+        rooms = [dict(example_config['enviro_sense']['control_rooms'][0]),
+                 dict(example_config['enviro_sense']['control_rooms'][1], control_archive_size=10)]
+        config = {'enviro_sense': dict(example_config['enviro_sense'], control_rooms=rooms, control_archive_size=50)}
+
+        # act
+        enviro_control = MultiRoomEnviroControl(config)
+
+        # assert
+        assert enviro_control.rooms['ROOM_1'].archive.maxlen == 50
+        assert enviro_control.rooms['ROOM_2'].archive.maxlen == 10
+        assert MultiRoomEnviroControl(example_config).rooms['ROOM_1'].archive.maxlen == 1000
+
+    def test_messages_are_handled_by_the_shard_of_the_room(self):
+        # arrange
+        enviro_control = MultiRoomEnviroControl(example_config)
+        enviro_control.start()
+
+        # act
+        for digital_id in ['ROOM_1', 'ROOM_2', 'ROOM_3', 'UNKNOWN_ROOM']:
+            enviro_control.router.put({'topic': MqttTopic(digital_id).sensor_data_topic, 'payload': payload, 'qos': 0})
+        time.sleep(0.2)
+        enviro_control.stop()
+        enviro_control._shutdown()
+
+        # assert
+        handled = [stats.messages_handled for stats in enviro_control.dispatch_stats]
+        unhandled = sum(stats.messages_unhandled for stats in enviro_control.dispatch_stats)
+        assert handled == [2, 1]
+        assert unhandled == 1
+        assert enviro_control.rooms['ROOM_1'].heating_element.executed >= 1
+
+    def test_gains_of_a_room_are_set_over_mqtt(self):
+        # arrange
+        config = {'enviro_sense': dict(example_config['enviro_sense'], mqtt_transport='loopback',
+                                       broker_address='localhost', broker_port=1883)}
+        enviro_control = MultiRoomEnviroControl(config)
+        control_thread = threading.Thread(target=enviro_control.run)
+        publisher = MQTTManager(transport=LoopbackTransport())
+        control_thread.start()
+        publisher.connect()
+        time.sleep(0.1)
+
+        # act
+        publisher.publish(MqttTopic('ROOM_3').set_heater_values, RoomControlData(kp=0.7, kd=0.1).to_json())
+        publisher.publish(MqttTopic('ROOM_3').set_steamer_values, RoomControlData(kp=0.8, kd=0.1).to_json())
+        time.sleep(0.2)
+        enviro_control.stop()
+        control_thread.join(timeout=5)
+
+        # assert
+        assert enviro_control.rooms['ROOM_3'].heating_control._kp == 0.7
+        assert enviro_control.rooms['ROOM_3'].steamer_control._kp == 0.8
+        assert enviro_control.rooms['ROOM_1'].heating_control._kp == 0.3
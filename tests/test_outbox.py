@@ -0,0 +1,98 @@
+import time
+
+from lib.mqtt.outbox import Outbox
+from lib.mqtt.outbox_publisher import OutboxPublisher
+
+
+class AckedMessageInfo:
+
+    def __init__(self, published: bool):
+        self._published = published
+
+    def wait_for_publish(self, timeout=None):
+        pass
+
+    def is_published(self):
+        return self._published
+
+
+class FakeMqttManager:
+
+    def __init__(self, connected: bool, fail_after: int = None):
+        self.is_connected = connected
+        self.fail_after = fail_after
+        self.published = []
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        published = self.fail_after is None or len(self.published) < self.fail_after
+        if published:
+            self.published.append((topic, payload, qos))
+        return AckedMessageInfo(published)
+
+
+class TestOutbox:
+
+    def test_messages_survive_a_restart(self, tmp_path):
+        # arrange
+        outbox = Outbox(str(tmp_path / "outbox.db"))
+        outbox.append("/a/", "text")
+        outbox.append("/a/", b"\xb5binary")
+        outbox.close()
+
+        # act
+        outbox = Outbox(str(tmp_path / "outbox.db"))
+        messages = outbox.peek(10)
+
+        # assert
+        assert [message.payload for message in messages] == ["text", b"\xb5binary"]
+        assert messages[0].sequence < messages[1].sequence
+
+    def test_ack_and_compact(self, tmp_path):
+        # arrange
+        outbox = Outbox(str(tmp_path / "outbox.db"))
+        sequences = [outbox.append("/a/", str(index)) for index in range(5)]
+
+        # act
+        outbox.ack(sequences[2])
+        compacted = outbox.compact()
+
+        # assert
+        assert compacted == 3
+        assert outbox.pending() == 2
+        assert [message.payload for message in outbox.peek(10)] == ["3", "4"]
+
+    def test_drains_in_order_once_connected(self, tmp_path):
+        # arrange
+        mqtt_manager = FakeMqttManager(connected=False)
+        publisher = OutboxPublisher(Outbox(str(tmp_path / "outbox.db")), mqtt_manager, batch_size=3)
+        publisher.start()
+        for index in range(10):
+            publisher.publish("/a/", str(index))
+
+        # act
+        time.sleep(0.1)
+        published_while_down = len(mqtt_manager.published)
+        mqtt_manager.is_connected = True
+        publisher.publish("/a/", "10")
+        time.sleep(0.2)
+        publisher.stop()
+
+        # assert
+        assert published_while_down == 0
+        assert [payload for _, payload, _ in mqtt_manager.published] == [str(index) for index in range(11)]
+        assert publisher.outbox.pending() == 0
+        assert publisher.stats.drained == 11
+
+    def test_stops_at_the_first_message_without_ack(self, tmp_path):
+        # arrange
+        mqtt_manager = FakeMqttManager(connected=True, fail_after=2)
+        publisher = OutboxPublisher(Outbox(str(tmp_path / "outbox.db")), mqtt_manager, batch_size=10)
+        for index in range(5):
+            publisher.publish("/a/", str(index))
+
+        # act
+        acked = publisher.drain_batch()
+
+        # assert
+        assert acked == 2
+        assert [message.payload for message in publisher.outbox.peek(10)] == ["2", "3", "4"]
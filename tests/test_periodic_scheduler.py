@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from lib.util.jitter_histogram import JitterHistogram
+from lib.util.periodic_scheduler import OverrunPolicy, PeriodicScheduler
+
+
+class FakeTime:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestPeriodicScheduler:
+
+    def test_the_time_of_the_task_does_not_add_to_the_period(self):
+        # arrange
+        fake = FakeTime()
+        scheduler = PeriodicScheduler(0.5, clock=fake.clock, sleep=fake.sleep)
+
+        # act
+        deadlines = []
+        for _ in range(10):
+            deadlines.append(scheduler.wait_next())
+            fake.now += 0.2  # the task
+
+        # assert
+        assert deadlines == pytest.approx([100.0 + index * 0.5 for index in range(10)])
+        assert scheduler.overruns == 0
+        assert scheduler.jitter.maximum == 0.0
+
+    def test_skip_drops_the_missed_ticks(self):
+        # arrange
+        fake = FakeTime()
+        scheduler = PeriodicScheduler(1.0, policy=OverrunPolicy.SKIP, clock=fake.clock, sleep=fake.sleep)
+        scheduler.wait_next()
+        fake.now += 3.4  # the task overran three deadlines
+
+        # act
+        late = scheduler.wait_next()
+        following = scheduler.wait_next()
+
+        # assert
+        assert late == 103.0
+        assert following == 104.0
+        assert scheduler.skipped == 2
+        assert scheduler.overruns == 1
+        assert scheduler.jitter.maximum == pytest.approx(0.4)
+
+    def test_catch_up_runs_the_missed_ticks(self):
+        # arrange
+        fake = FakeTime()
+        scheduler = PeriodicScheduler(1.0, policy=OverrunPolicy.CATCH_UP, clock=fake.clock, sleep=fake.sleep)
+        scheduler.wait_next()
+        fake.now += 3.4
+
+        # act
+        deadlines = [scheduler.wait_next() for _ in range(4)]
+
+        # assert
+        assert deadlines == [101.0, 102.0, 103.0, 104.0]
+        assert fake.now == 104.0
+        assert scheduler.skipped == 0
+        assert scheduler.ticks == 5
+
+    def test_async_ticks_keep_the_cadence(self):
+        # arrange
+        scheduler = PeriodicScheduler(0.02)
+
+        async def scenario():
+            deadlines = []
+            for _ in range(5):
+                deadlines.append(await scheduler.wait_next_async())
+                await asyncio.sleep(0.005)
+            return deadlines
+
+        # act
+        deadlines = asyncio.run(scenario())
+
+        # assert
+        assert [b - a for a, b in zip(deadlines, deadlines[1:])] == pytest.approx([0.02] * 4)
+        assert scheduler.jitter.count == 5
+
+    def test_jitter_histogram_buckets(self):
+        # arrange
+        histogram = JitterHistogram()
+
+        # act
+        for seconds in (0.00005, 0.0003, 0.0003, 0.002, 2.0):
+            histogram.record(seconds)
+
+        # assert
+        assert histogram.counts[0] == 1 and histogram.counts[1] == 2 and histogram.counts[3] == 1
+        assert histogram.counts[-1] == 1
+        assert histogram.percentile(50) == 0.0005
+        assert histogram.percentile(100) == float("inf")
@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+from lib.gpio.async_relay_actuator import AsyncRelayActuator
+from lib.gpio.relay_actuator import RelayActuator
+from lib.gpio.relay_command import RelayCommand
+from lib.gpio.relay_interface import RelayInterface
+from lib.gpio.short_cycle_guard import ShortCycleGuard
+
+
+class SlowRelay(RelayInterface):
+    open_settle_time = 0.05
+    close_settle_time = 0.05
+
+    def __init__(self):
+        self.calls = []
+
+    def open_relay(self) -> None:
+        self.calls.append("open")
+
+    def close_relay(self) -> None:
+        self.calls.append("close")
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRelayActuator:
+
+    def test_commands_do_not_block_the_caller(self):
+        # arrange
+        relay = SlowRelay()
+        actuator = RelayActuator(relay, "heater")
+
+        # act
+        start = time.monotonic()
+        future = actuator.close_relay()
+        elapsed = time.monotonic() - start
+        latency = future.result(timeout=1)
+        actuator.shutdown()
+
+        # assert
+        assert elapsed < relay.close_settle_time
+        assert latency >= relay.close_settle_time
+        assert relay.calls == ["close"]
+        assert actuator.latency.count == 1
+
+    def test_only_latest_waiting_command_is_executed(self):
+        # arrange
+        relay = SlowRelay()
+        actuator = RelayActuator(relay, "steamer")
+
+        # act
+        first = actuator.close_relay()
+        while not first.running():
+            time.sleep(0.001)
+        futures = [actuator.open_relay(), actuator.close_relay(), actuator.open_relay()]
+        first.result(timeout=1)
+        futures[-1].result(timeout=1)
+        actuator.shutdown()
+
+        # assert
+        assert relay.calls == ["close", "open"]
+        assert futures[0].cancelled() and futures[1].cancelled()
+        assert actuator.superseded == 2
+
+    def test_async_actuator_awaits_settle_time(self):
+        # arrange
+        relay = SlowRelay()
+
+        async def scenario():
+            actuator = AsyncRelayActuator(relay, "heater")
+            actuator.start()
+            latency = await actuator.close_relay()
+            await actuator.shutdown()
+            return latency
+
+        # act
+        latency = asyncio.run(scenario())
+
+        # assert
+        assert latency >= relay.close_settle_time
+        assert relay.calls == ["close"]
+
+    def test_redundant_commands_are_not_executed(self):
+        # arrange
+        relay = SlowRelay()
+        actuator = RelayActuator(relay, "heater")
+
+        # act
+        actuator.close_relay().result(timeout=1)
+        suppressed = [actuator.close_relay() for _ in range(5)]
+        actuator.open_relay().result(timeout=1)
+        actuator.shutdown()
+
+        # assert
+        assert relay.calls == ["close", "open"]
+        assert all(future.result() == 0.0 for future in suppressed)
+        assert actuator.suppressed == 5
+        assert actuator.executed == 2
+
+    def test_guard_enforces_minimum_on_and_off_times(self):
+        # arrange
+        clock = FakeClock()
+        guard = ShortCycleGuard(min_on_time=60, min_off_time=30, clock=clock)
+
+        # act / assert
+        assert guard.allow(RelayCommand.CLOSE)  # the first command is always executed
+        clock.now = 59
+        assert not guard.allow(RelayCommand.OPEN)
+        clock.now = 60
+        assert guard.allow(RelayCommand.OPEN)
+        clock.now = 80
+        assert not guard.allow(RelayCommand.CLOSE)
+        assert not guard.allow(RelayCommand.OPEN)
+        clock.now = 90
+        assert guard.allow(RelayCommand.CLOSE)
+
+        assert guard.transitions == 3
+        assert guard.suppressed_short_cycle == 2
+        assert guard.suppressed_redundant == 1
+
+    def test_minimum_times_count_from_the_switch_of_the_worker(self):
+        # arrange
+        clock = FakeClock()
+        guard = ShortCycleGuard(min_on_time=60, min_off_time=30, clock=clock)
+
+        class ClockedRelay(SlowRelay):
+            def close_relay(self) -> None:
+                clock.now = 20  # the command waited in the queue and the relay switches later
+                super().close_relay()
+
+        actuator = RelayActuator(ClockedRelay(), "heater", guard=guard)
+
+        # act
+        actuator.close_relay().result(timeout=1)
+        clock.now = 70
+        too_early = guard.allow(RelayCommand.OPEN)
+        clock.now = 80
+        allowed = guard.allow(RelayCommand.OPEN)
+        actuator.shutdown()
+
+        # assert
+        assert not too_early
+        assert allowed
+
+    def test_failed_command_resets_the_known_state(self):
+        # arrange
+        class BrokenRelay(SlowRelay):
+            def close_relay(self) -> None:
+                raise IOError("gpio")
+
+        guard = ShortCycleGuard()
+        actuator = RelayActuator(BrokenRelay(), "steamer", guard=guard)
+
+        # act
+        failed = actuator.close_relay()
+        while not failed.done():
+            time.sleep(0.001)
+        actuator.shutdown()
+
+        # assert
+        assert failed.exception() is not None
+        assert guard.state is None
@@ -0,0 +1,135 @@
+import json
+import logging
+from datetime import datetime, timedelta
+
+from lib.controllers.enviroment_controller import EnvironmentController
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.envirocontrol_app.replay_enviro_control import ReplayEnviroControl
+from lib.history.sensor_history_store import SensorHistoryStore
+
+example_config = {
+    'enviro_sense':
+        {
+            'relay_driver': 'mock',
+            'enable_pid': True,
+            'humidity_table_path': '../doc/waterdampspanning.csv',
+            'kp_heater': 0.3, 'kd_heater': 0.2, 'threshold_heater': 0.5,
+            'kp_steamer': 0.3, 'kd_steamer': 0.2, 'threshold_steamer': 0.5,
+            'sensor_digital_id': 'REPLAY_ROOM',
+            'sensor_publish_data_timeout': 3,
+            'control_relay_gpio_1': 17,
+            'control_relay_gpio_2': 27,
+        }
+}
+
+
+def _payload(internal_temperature: float, external_temperature: float, humidity: float) -> str:
+    return json.dumps({
+        "id": "bea83a3b-3034-476f-8451-a2677a4ffc3c",
+        "internal_sensor_data": {"temperature": internal_temperature, "humidity": humidity, "pressure": 1013.25},
+        "external_sensor_data": {"temperature": external_temperature, "humidity": 60.0, "pressure": 1013.25},
+        "timestamp": "2024-10-18 14:38:23.343361"
+    })
+
+
+class TestReplayEnviroControl:
+
+    def test_replay_records_the_decisions_of_the_controller(self):
+        # arrange
+        readings = [(18.0, 22.0, 10.0), (19.0, 22.0, 12.0), (23.0, 22.0, 80.0), (25.0, 20.0, 90.0), (21.0, 21.5, 14.0)]
+        enviro_control = ReplayEnviroControl(example_config)
+        heater_control = EnvironmentController(0.3, 0.2, 0.5)
+
+        # act
+        report = enviro_control.replay([_payload(*reading) for reading in readings])
+
+        # assert
+        assert report.messages == len(readings)
+        assert report.stages["decode"].count == len(readings)
+        assert report.stages["heater"].count == len(readings)
+        assert [decision.heater_on for decision in enviro_control.decisions] == \
+               [heater_control.calculate_device_on_off(internal, external) for internal, external, _ in readings]
+        assert enviro_control.decisions[0].steamer_on is True  # 10 g/m³ is below the maximum at 17°C
+        assert enviro_control.decisions[2].steamer_on is False
+        assert enviro_control.heating_relay.closed == enviro_control.decisions[-1].heater_on
+
+    def test_relay_only_switches_on_a_change(self):
+        # arrange
+        enviro_control = ReplayEnviroControl(example_config)
+
+        # act
+        report = enviro_control.replay([_payload(30.0, 10.0, 90.0)] * 10)
+
+        # assert
+        assert enviro_control.heating_relay.switches == 1
+        assert enviro_control.steam_relay.switches == 1
+        assert report.decisions_per_second > 0
+
+    def test_missing_readings_do_not_switch_the_relays(self):
+        # arrange
+        enviro_control = ReplayEnviroControl(example_config)
+        missing_internal = json.loads(_payload(0.0, 22.0, 0.0))
+        missing_internal["internal_sensor_status"] = "MISSING"
+        missing_external = json.loads(_payload(18.0, 0.0, 10.0))
+        missing_external["external_sensor_status"] = "MISSING"
+
+        # act
+        enviro_control.replay([json.dumps(missing_internal), json.dumps(missing_external)])
+
+        # assert
+        assert enviro_control.decisions[0].heater_on is None and enviro_control.decisions[0].steamer_on is None
+        assert enviro_control.decisions[1].heater_on is None
+        assert enviro_control.decisions[1].steamer_on is True
+        assert enviro_control.heating_relay.switches == 0
+
+    def test_batches_are_replayed(self):
+        # arrange
+        enviro_control = ReplayEnviroControl(example_config)
+        batch = SensorDataBatch([SensorDataPayload.from_json(_payload(18.0, 22.0, 10.0)),
+                                 SensorDataPayload.from_json(_payload(30.0, 10.0, 90.0))])
+
+        # act
+        report = enviro_control.replay([batch.to_json(), batch.to_bytes(), _payload(18.0, 22.0, 10.0)])
+
+        # assert
+        assert report.messages == 3
+        assert [decision.heater_on for decision in enviro_control.decisions] == [False, False, True]
+        assert len(enviro_control._sensor_data_archive) == 2
+
+    def test_replay_does_not_change_the_enviro_control_logger(self):
+        # arrange
+        enviro_control_logger = logging.getLogger("EnviroControl")
+        level = enviro_control_logger.level
+
+        # act
+        ReplayEnviroControl(example_config)
+
+        # assert
+        assert enviro_control_logger.level == level
+
+    def test_history_with_missing_and_stale_readings_is_replayed(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=10, tiers=[60])
+        statuses = [(SensorStatus.OK, SensorStatus.OK), (SensorStatus.MISSING, SensorStatus.OK),
+                    (SensorStatus.OK, SensorStatus.MISSING), (SensorStatus.STALE, SensorStatus.OK)]
+        start = datetime(2024, 10, 18, 14, 0)
+        for index, (internal_status, external_status) in enumerate(statuses):
+            sensor_data_payload = SensorDataPayload.from_json(_payload(18.0, 22.0, 10.0))
+            sensor_data_payload.timestamp = start + timedelta(seconds=3 * index)
+            sensor_data_payload.internal_sensor_status = internal_status
+            sensor_data_payload.external_sensor_status = external_status
+            store.append(sensor_data_payload, heater_on=None, steamer_on=None)
+        enviro_control = ReplayEnviroControl(example_config)
+
+        # act
+        payloads = list(ReplayEnviroControl.payloads_from_history(store))
+        report = enviro_control.replay_payloads(payloads)
+
+        # assert
+        assert report.messages == 4
+        assert [(payload.internal_sensor_status, payload.external_sensor_status) for payload in payloads] == statuses
+        assert payloads[1].internal_sensor_data.temperature == 0.0
+        assert payloads[3].internal_sensor_data.temperature == 18.0
+        assert enviro_control.decisions[3].heater_on is True  # the stale reading is still decided on
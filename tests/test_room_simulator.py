@@ -0,0 +1,79 @@
+import time
+
+from lib.gpio.relay_driver import RelayDriver
+from lib.gpio.relay_factory import RelayFactory
+from lib.sensor_drivers.sensor_driver import SensorDriver
+from lib.sensor_drivers.sensor_factory import SensorFactory
+from lib.simulation.room_simulator import OutdoorProfile, RoomModel, RoomSimulator
+
+
+def _simulator(**kwargs) -> RoomSimulator:
+    outdoor = OutdoorProfile(mean_temperature=10.0, daily_amplitude=0.0, relative_humidity=60.0)
+    return RoomSimulator(RoomModel(outdoor=outdoor), speed=0, **kwargs)
+
+
+class TestRoomSimulator:
+
+    def test_room_cools_down_to_the_outside(self):
+        # arrange
+        simulator = _simulator(start_temperature=20.0)
+
+        # act
+        simulator.advance(6 * 3600)
+
+        # assert
+        assert abs(simulator.temperature - 10.0) < 0.1
+        assert simulator.time == 6 * 3600
+
+    def test_heater_and_steamer_follow_the_relays(self):
+        # arrange
+        simulator = _simulator(start_temperature=10.0, start_relative_humidity=30.0)
+        RoomSimulator.set_shared(simulator)
+        heater = RelayFactory.create_relay(RelayDriver.SIMULATED, 17)
+        steamer = RelayFactory.create_relay(RelayDriver.SIMULATED, 27)
+        room_sensor = SensorFactory.create_driver(SensorDriver.SIMULATED_ROOM, 0x76)
+        outdoor_sensor = SensorFactory.create_driver(SensorDriver.SIMULATED_OUTDOOR, 22)
+
+        # act
+        heater.close_relay()
+        simulator.advance(600)
+        heated = room_sensor.get_sensor_data()
+        heater.open_relay()
+        steamer.close_relay()
+        simulator.advance(3600)
+        steamed = room_sensor.get_sensor_data()
+        RoomSimulator.set_shared(None)
+
+        # assert
+        assert heated.temperature > 13.0
+        assert steamed.humidity == 100.0  # the steamer saturates the room, the rest condenses
+        assert outdoor_sensor.get_sensor_data().temperature == 10.0
+        assert simulator.heater_switches == 2
+        assert simulator.heater_on_time == 600
+        assert simulator.steamer_on_time == 3600
+
+    def test_real_time_runs_on_from_the_start_time_and_after_advance(self):
+        # arrange
+        outdoor = OutdoorProfile(mean_temperature=10.0, daily_amplitude=0.0)
+        simulator = RoomSimulator(RoomModel(outdoor=outdoor), speed=3600, start_temperature=20.0, start_time=12 * 3600)
+
+        # act
+        time.sleep(0.05)
+        simulator.read_room()
+        running = simulator.time
+        simulator.advance(600)
+        advanced = simulator.time
+        time.sleep(0.05)
+        simulator.read_room()
+
+        # assert
+        assert 12 * 3600 + 100 < running < 12 * 3600 + 1800
+        assert advanced >= running + 600
+        assert simulator.time > advanced + 100
+        assert simulator.temperature < 20.0
+
+    def test_outdoor_profile_is_coldest_in_the_morning(self):
+        outdoor = OutdoorProfile(mean_temperature=12.0, daily_amplitude=5.0, coldest_hour=5.0)
+
+        assert outdoor.at(5 * 3600)[0] == 7.0
+        assert outdoor.at(17 * 3600)[0] == 17.0
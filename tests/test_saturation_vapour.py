@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.envirocontrol_app.enviro_control import EnviroControl
+from lib.util.csv_lookup import CSVLookup
+from lib.util.saturation_vapour import SaturationVapourEngine, SaturationFormula
+
+control_config = {
+    'enviro_sense':
+        {
+            'relay_driver': 'mock',
+            'broker_address': 'localhost', 'broker_port': 1883,
+            'mqtt_transport': 'loopback',
+            'enable_pid': False,
+            'kp_heater': 0.3, 'kd_heater': 0.2, 'threshold_heater': 0.5,
+            'kp_steamer': 0.3, 'kd_steamer': 0.2, 'threshold_steamer': 0.5,
+            'sensor_publish_data_timeout': 3,
+            'sensor_digital_id': 'LOOKUP_ROOM',
+            'control_relay_gpio_1': 17, 'control_relay_gpio_2': 27,
+            'humidity_table_path': '../doc/waterdampspanning.csv',
+        }
+}
+
+
+class TestSaturationVapour:
+
+    @pytest.mark.parametrize("formula", [SaturationFormula.MAGNUS, SaturationFormula.BUCK])
+    def test_density_matches_the_table(self, formula):
+        # arrange
+        csv_env_table = CSVLookup("../doc/waterdampspanning.csv")
+        engine = SaturationVapourEngine(formula)
+        temperatures = [temp for temp in csv_env_table.lookup_table.keys() if 0 <= temp <= 30]  # the table is over ice below 0
+
+        # act
+        densities = engine.saturation_vapour_density(temperatures)
+
+        # assert
+        for temperature, density in zip(temperatures, densities):
+            assert density == pytest.approx(csv_env_table.lookup_table[temperature], abs=0.1)
+
+    def test_closest_value_is_one_degree_below(self):
+        # arrange
+        engine = SaturationVapourEngine()
+
+        # act
+        temperature, density = engine.get_closest_value(21.0)
+        temperatures, densities = engine.get_closest_values(np.array([21.0, 31.0]))
+
+        # assert
+        assert temperature == pytest.approx(20.0)
+        assert density == pytest.approx(17.28, abs=0.05)
+        assert temperatures[0] == pytest.approx(20.0)
+        assert densities[0] == pytest.approx(density)
+
+    def test_dew_point_and_absolute_humidity(self):
+        # arrange
+        engine = SaturationVapourEngine()
+
+        # act
+        dew_point = engine.dew_point(20.0, 50.0)
+        saturated_dew_point = engine.dew_point(20.0, 100.0)
+        absolute_humidity = engine.absolute_humidity(20.0, 50.0)
+
+        # assert
+        assert dew_point == pytest.approx(9.26, abs=0.05)
+        assert saturated_dew_point == pytest.approx(20.0)
+        assert absolute_humidity == pytest.approx(engine.saturation_vapour_density(20.0) / 2)
+
+    @pytest.mark.parametrize("formula", [SaturationFormula.MAGNUS, SaturationFormula.BUCK])
+    def test_closest_value_matches_the_array_path(self, formula):
+        # arrange
+        engine = SaturationVapourEngine(formula)
+        targets = [-5.0, 0.0, 18.37, 21.0, 35.5]
+
+        # act
+        closest_values = [engine.get_closest_value(target) for target in targets]
+        temperatures, densities = engine.get_closest_values(targets)
+
+        # assert
+        for (temperature, density), expected_temperature, expected_density in zip(closest_values, temperatures, densities):
+            assert temperature == pytest.approx(expected_temperature)
+            assert density == pytest.approx(expected_density)
+
+    @pytest.mark.parametrize("formula", [SaturationFormula.MAGNUS, SaturationFormula.BUCK])
+    def test_closest_value_of_nan_is_none(self, formula):
+        engine = SaturationVapourEngine(formula)
+
+        assert engine.get_closest_value(float("nan")) is None
+        assert engine.get_closest_value(float("inf")) is None
+
+    @pytest.mark.parametrize("humidity_lookup", ["csv", "magnus", "buck"])
+    def test_steamer_keeps_its_state_for_a_nan_temperature(self, humidity_lookup):
+        # arrange
+        config = {'enviro_sense': dict(control_config['enviro_sense'], humidity_lookup=humidity_lookup)}
+        enviro_control = EnviroControl(config)
+        internal_sensor_data = SensorData(temperature=20.0, humidity=50.0)
+        internal_sensor_data.temperature = float("nan")  # SensorData itself refuses NaN
+
+        # act
+        kept_on = enviro_control._handle_steamer(internal_sensor_data, steamer_on=True)
+        kept_off = enviro_control._handle_steamer(internal_sensor_data, steamer_on=False)
+
+        # assert
+        assert kept_on is True
+        assert kept_off is False
@@ -0,0 +1,92 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_batch import SensorDataBatch
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.mqtt.mqtt_manager import MQTTManager
+
+
+class TestSensorDataPayload:
+
+    def _payload(self) -> SensorDataPayload:
+        return SensorDataPayload(id=uuid.uuid4(),
+                                 internal_sensor_data=SensorData(temperature=21.37, humidity=48.21, pressure=1012.87),
+                                 external_sensor_data=SensorData(temperature=14.02, humidity=71.5, pressure=1013.04),
+                                 timestamp=datetime(2024, 10, 18, 14, 38, 23, 343361))
+
+    def test_json_is_unchanged(self):
+        # arrange
+        payload = self._payload()
+
+        # act
+        data = json.loads(payload.to_json())
+
+        # assert
+        assert data == {
+            "id": str(payload.id),
+            "internal_sensor_data": {"temperature": 21.37, "humidity": 48.21, "pressure": 1012.87},
+            "external_sensor_data": {"temperature": 14.02, "humidity": 71.5, "pressure": 1013.04},
+            "timestamp": "2024-10-18 14:38:23.343361"
+        }
+        assert SensorDataPayload.from_wire(payload.to_json()) == payload
+
+    def test_binary_round_trip(self):
+        # arrange
+        payload = self._payload()
+
+        # act
+        encoded = payload.encode("binary")
+        decoded = SensorDataPayload.from_wire(MQTTManager.decode_payload(encoded))
+
+        # assert
+        assert len(encoded) == 50
+        assert decoded.id == payload.id
+        assert decoded.timestamp == payload.timestamp
+        assert decoded.internal_sensor_data.temperature == pytest.approx(21.37, abs=1e-4)
+        assert decoded.external_sensor_data.pressure == pytest.approx(1013.04, abs=1e-3)
+
+    def test_unknown_binary_version(self):
+        encoded = bytearray(self._payload().to_bytes())
+        encoded[1] = 99
+
+        with pytest.raises(ValueError):
+            SensorDataPayload.from_wire(bytes(encoded))
+
+    def test_batch_round_trip(self):
+        # arrange
+        batch = SensorDataBatch([self._payload(), self._payload(), self._payload()])
+
+        # act
+        from_json = SensorDataBatch.from_wire(batch.encode("json"))
+        from_bytes = SensorDataBatch.from_wire(MQTTManager.decode_payload(batch.encode("binary")))
+
+        # assert
+        assert from_json == batch
+        assert len(batch.to_bytes()) == 4 + 3 * 50
+        assert [payload.id for payload in from_bytes.payloads] == [payload.id for payload in batch.payloads]
+        assert from_bytes.latest.id == batch.latest.id
+
+    def test_status_round_trip(self):
+        # arrange
+        payload = self._payload()
+        payload.internal_sensor_status = SensorStatus.STALE
+        payload.external_sensor_status = SensorStatus.MISSING
+        batch = SensorDataBatch([self._payload(), payload, self._payload()])
+
+        # act
+        from_json = SensorDataPayload.from_wire(payload.encode("json"))
+        from_bytes = SensorDataPayload.from_wire(payload.encode("binary"))
+        batch_from_bytes = SensorDataBatch.from_wire(batch.encode("binary"))
+
+        # assert
+        assert json.loads(payload.to_json())["external_sensor_status"] == "MISSING"
+        assert from_json == payload
+        assert len(payload.to_bytes()) == 51
+        assert (from_bytes.internal_sensor_status, from_bytes.external_sensor_status) == (SensorStatus.STALE, SensorStatus.MISSING)
+        assert [p.external_sensor_status for p in batch_from_bytes.payloads] == [SensorStatus.OK, SensorStatus.MISSING, SensorStatus.OK]
+        assert batch_from_bytes.latest.id == batch.latest.id
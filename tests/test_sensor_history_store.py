@@ -0,0 +1,182 @@
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_data_payload import SensorDataPayload
+from lib.domain.sensor_status import SensorStatus
+from lib.history.sensor_history_store import STATUS_CODES, SensorHistoryStore
+
+
+def _payload(timestamp: float, temperature: float) -> SensorDataPayload:
+    return SensorDataPayload(id=uuid.uuid4(),
+                             internal_sensor_data=SensorData(temperature=temperature, humidity=50.0, pressure=1000.0),
+                             external_sensor_data=SensorData(temperature=20.0, humidity=60.0, pressure=1010.0),
+                             timestamp=datetime.fromtimestamp(timestamp))
+
+
+class TestSensorHistoryStore:
+
+    def test_range_query_is_a_view_on_the_file(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=100, tiers=[])
+        for second in range(10):
+            store.append(_payload(1_000_000 + second, 15 + second), heater_on=second % 2 == 0, steamer_on=None)
+
+        # act
+        records = store.query(1_000_003, 1_000_006)
+
+        # assert
+        assert list(records["internal_temperature"]) == [18, 19, 20]
+        assert list(records["heater_on"]) == [0, 1, 0]
+        assert list(records["steamer_on"]) == [-1, -1, -1]
+        assert np.shares_memory(records, store.raw.segments()[0])
+
+    def test_oldest_records_are_overwritten(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=5, tiers=[])
+
+        # act
+        for second in range(12):
+            store.append(_payload(1_000_000 + second, 10 + second), heater_on=True, steamer_on=False)
+        records = store.query(0, 2_000_000)
+
+        # assert
+        assert len(store.raw) == 5
+        assert list(records["internal_temperature"]) == [17, 18, 19, 20, 21]
+
+    def test_history_survives_a_restart(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=10, tiers=[])
+        store.append(_payload(1_000_000, 21.5), heater_on=True, steamer_on=True)
+        store.flush()
+
+        # act
+        reopened = SensorHistoryStore(str(tmp_path), capacity=10, tiers=[])
+
+        # assert
+        assert reopened.query(0, 2_000_000)["internal_temperature"][0] == 21.5
+
+    def test_downsampling_tiers(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=1000, tiers=[60])
+
+        # act
+        for second in range(0, 180, 10):
+            store.append(_payload(1_200_000 + second, 10 + second / 10), heater_on=second < 60, steamer_on=False)
+        minutes = store.query(0, 2_000_000, tier=60)
+
+        # assert
+        assert list(minutes["count"]) == [6, 6]  # the last minute is still being collected
+        assert minutes["internal_temperature_min"][0] == 10
+        assert minutes["internal_temperature_max"][0] == 15
+        assert minutes["internal_temperature_mean"][1] == 18.5
+        assert list(minutes["heater_on_mean"]) == [1, 0]
+
+    def test_older_readings_are_dropped(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=10, tiers=[60])
+        store.append(_payload(1_000_010, 21.0), heater_on=True, steamer_on=True)
+
+        # act
+        dropped = not store.append(_payload(1_000_000, 22.0), heater_on=True, steamer_on=True)
+        same_time = store.append(_payload(1_000_010, 23.0), heater_on=True, steamer_on=True)
+
+        # assert
+        assert dropped and same_time
+        assert list(store.query(0, 2_000_000)["internal_temperature"]) == [21.0, 23.0]
+        with pytest.raises(ValueError):
+            store.raw.append((1_000_000.0,) + (0.0,) * 6 + (0, 0, 0, 0))
+
+    def test_bucket_is_collected_again_after_a_restart(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=1000, tiers=[60])
+        for second in range(0, 100, 10):
+            store.append(_payload(1_200_000 + second, 10 + second / 10), heater_on=False, steamer_on=False)
+        store.flush()
+
+        # act
+        reopened = SensorHistoryStore(str(tmp_path), capacity=1000, tiers=[60])
+        for second in range(100, 130, 10):
+            reopened.append(_payload(1_200_000 + second, 10 + second / 10), heater_on=False, steamer_on=False)
+        minutes = reopened.query(0, 2_000_000, tier=60)
+
+        # assert
+        assert list(minutes["timestamp"]) == [1_200_000, 1_200_060]
+        assert list(minutes["count"]) == [6, 6]
+        assert minutes["internal_temperature_mean"][1] == 18.5
+
+    def test_missing_reading_leaves_the_aggregates_unchanged(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=100, tiers=[60])
+        missing_external = _payload(1_200_030, 13.0)
+        missing_external.external_sensor_data = SensorData()
+        missing_external.external_sensor_status = SensorStatus.MISSING
+
+        # act
+        store.append(_payload(1_200_000, 10.0), heater_on=True, steamer_on=False)
+        store.append(_payload(1_200_010, 12.0), heater_on=True, steamer_on=False)
+        store.append(missing_external, heater_on=True, steamer_on=False)
+        store.append(_payload(1_200_060, 20.0), heater_on=True, steamer_on=False)
+        records = store.query(0, 2_000_000)
+        minute = store.query(0, 2_000_000, tier=60)[0]
+
+        # assert
+        assert np.isnan(records["external_temperature"][2]) and np.isnan(records["external_pressure"][2])
+        assert records["internal_temperature"][2] == 13.0
+        assert minute["count"] == 3
+        assert minute["external_temperature_min"] == minute["external_temperature_mean"] == minute["external_temperature_max"] == 20.0
+        assert minute["external_pressure_min"] == 1010.0
+        assert minute["internal_temperature_mean"] == pytest.approx(35.0 / 3)
+
+    def test_stale_reading_keeps_its_value_and_status(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=10, tiers=[])
+        stale_internal = _payload(1_000_000, 21.0)
+        stale_internal.internal_sensor_status = SensorStatus.STALE
+
+        # act
+        store.append(stale_internal, heater_on=True, steamer_on=False)
+        record = store.query(0, 2_000_000)[0]
+
+        # assert
+        assert record["internal_temperature"] == 21.0
+        assert STATUS_CODES[record["internal_status"]] == SensorStatus.STALE
+        assert STATUS_CODES[record["external_status"]] == SensorStatus.OK
+
+    def test_unknown_relay_state_is_left_out_of_the_aggregates(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=100, tiers=[60])
+
+        # act
+        store.append(_payload(1_200_000, 10.0), heater_on=None, steamer_on=None)
+        store.append(_payload(1_200_010, 11.0), heater_on=True, steamer_on=None)
+        store.append(_payload(1_200_020, 12.0), heater_on=False, steamer_on=None)
+        store.append(_payload(1_200_060, 13.0), heater_on=True, steamer_on=True)
+        records = store.query(0, 2_000_000)
+        minute = store.query(0, 2_000_000, tier=60)[0]
+
+        # assert
+        assert records["heater_on"][0] == -1
+        assert minute["count"] == 3
+        assert minute["heater_on_min"] == 0 and minute["heater_on_max"] == 1
+        assert minute["heater_on_mean"] == 0.5
+        assert np.isnan(minute["steamer_on_mean"]) and np.isnan(minute["steamer_on_min"])
+
+    def test_unknown_relay_state_is_left_out_after_a_restart(self, tmp_path):
+        # arrange
+        store = SensorHistoryStore(str(tmp_path), capacity=100, tiers=[60])
+        store.append(_payload(1_200_000, 10.0), heater_on=None, steamer_on=False)
+        store.append(_payload(1_200_010, 11.0), heater_on=True, steamer_on=False)
+        store.flush()
+
+        # act
+        restarted = SensorHistoryStore(str(tmp_path), capacity=100, tiers=[60])
+        restarted.append(_payload(1_200_060, 12.0), heater_on=True, steamer_on=False)
+        minute = restarted.query(0, 2_000_000, tier=60)[0]
+
+        # assert
+        assert minute["count"] == 2
+        assert minute["heater_on_mean"] == 1.0
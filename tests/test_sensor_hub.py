@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.sensor_driver import SensorDriver
+from lib.sensor_drivers.sensor_hub import SensorHub
+from lib.sensor_drivers.sensor_interface import SensorInterface
+
+
+class CountingSensor(SensorInterface):
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.reads = 0
+        self.fail = False
+
+    def get_sensor_data(self) -> SensorData:
+        self.reads += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise IOError("bus error")
+        return SensorData(temperature=20.0 + self.reads)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSensorHub:
+
+    def test_concurrent_reads_share_one_hardware_read(self):
+        # arrange
+        sensor = CountingSensor(delay=0.1)
+        hub = SensorHub()
+        hub_sensor = hub.register("bme280", sensor)
+        barrier = threading.Barrier(8)
+
+        def read():
+            barrier.wait()
+            return hub_sensor.get_sensor_data()
+
+        # act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            readings = list(executor.map(lambda _: read(), range(8)))
+
+        # assert
+        assert sensor.reads == 1
+        assert all(reading.temperature == 21.0 for reading in readings)
+        assert hub.requests == 8 and hub.coalesced == 7 and hub.hardware_reads == 1
+
+    def test_readings_are_cached_within_the_ttl(self):
+        # arrange
+        clock = FakeClock()
+        sensor = CountingSensor()
+        hub = SensorHub(ttl=1.0, clock=clock)
+        hub_sensor = hub.register("dht22", sensor)
+
+        # act
+        first = hub_sensor.get_sensor_data()
+        clock.now = 0.9
+        cached = hub_sensor.get_sensor_data()
+        clock.now = 1.5
+        fresh = hub_sensor.get_sensor_data()
+
+        # assert
+        assert first.temperature == cached.temperature == 21.0
+        assert fresh.temperature == 22.0
+        assert hub.cache_hits == 1
+
+    def test_cached_reading_keeps_the_time_it_was_taken(self):
+        # arrange
+        sensor = CountingSensor()
+        hub = SensorHub(ttl=10.0)
+        hub_sensor = hub.register("dht22", sensor)
+
+        # act
+        _, taken_at = hub_sensor.get_timed_sensor_data()
+        time.sleep(0.02)
+        _, cached_taken_at = hub_sensor.get_timed_sensor_data()
+
+        # assert
+        assert cached_taken_at == taken_at
+        assert time.monotonic() - cached_taken_at >= 0.02
+
+    def test_failed_read_is_not_cached(self):
+        # arrange
+        sensor = CountingSensor()
+        sensor.fail = True
+        hub = SensorHub(ttl=10.0)
+        hub_sensor = hub.register("bme280", sensor)
+
+        # act
+        with pytest.raises(IOError):
+            hub_sensor.get_sensor_data()
+        sensor.fail = False
+        sensor_data = hub_sensor.get_sensor_data()
+
+        # assert
+        assert sensor_data.temperature == 22.0
+        assert sensor.reads == 2
+
+    def test_same_sensor_is_created_once(self):
+        # arrange
+        hub = SensorHub()
+
+        # act
+        first = hub.sensor(SensorDriver.SYNTHETIC, 7)
+        second = hub.sensor(SensorDriver.SYNTHETIC, 7)
+        other = hub.sensor(SensorDriver.SYNTHETIC, 8)
+
+        # assert
+        assert first.key == second.key != other.key
+        assert len(hub.keys()) == 2
+
+    def test_same_sensor_with_other_settings_is_refused(self):
+        # arrange
+        hub = SensorHub()
+        hub.sensor(SensorDriver.SYNTHETIC, 7, {"mode": "forced"})
+
+        # act
+        same = hub.sensor(SensorDriver.SYNTHETIC, 7, {"mode": "forced"})
+        without_settings = hub.sensor(SensorDriver.SYNTHETIC, 7)
+
+        # assert
+        assert same.key == without_settings.key
+        with pytest.raises(ValueError):
+            hub.sensor(SensorDriver.SYNTHETIC, 7, {"mode": "normal"})
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Tuple
+
+from lib.domain.sensor_data import SensorData
+from lib.domain.sensor_status import SensorStatus
+from lib.envirosense_app.sensor_sampler import SensorSampler
+from lib.sensor_drivers.sensor_interface import SensorInterface
+
+
+class SlowSensor(SensorInterface):
+
+    def __init__(self, delay: float, temperature: float = 20.0):
+        self.delay = delay
+        self.temperature = temperature
+        self.reads = 0
+        self.release = threading.Event()
+
+    def get_sensor_data(self) -> SensorData:
+        self.reads += 1
+        self.release.wait(self.delay)
+        return SensorData(temperature=self.temperature)
+
+
+class OldReadingSensor(SensorInterface):
+    """Returns a reading it took earlier, like the DHT22 or a cached reading of the hub."""
+
+    def __init__(self, age: float):
+        self.age = age
+
+    def get_timed_sensor_data(self) -> Tuple[SensorData, float]:
+        return SensorData(temperature=19.0), time.monotonic() - self.age
+
+
+class BrokenSensor(SensorInterface):
+
+    def get_sensor_data(self) -> SensorData:
+        raise IOError("no answer")
+
+
+class TestSensorSampler:
+
+    def test_sensors_are_read_at_the_same_time(self):
+        # arrange
+        sampler = SensorSampler({"internal": SlowSensor(0.1), "external": SlowSensor(0.1)}, timeouts=1.0)
+
+        # act
+        start = time.monotonic()
+        readings = sampler.sample()
+        elapsed = time.monotonic() - start
+        sampler.shutdown()
+
+        # assert
+        assert elapsed < 0.19
+        assert all(reading.status == SensorStatus.OK for reading in readings.values())
+        assert sampler.latency["internal"].count == 1 and sampler.latency["external"].count == 1
+
+    def test_slow_sensor_gives_its_last_good_reading(self):
+        # arrange
+        internal = SlowSensor(0.0, temperature=21.0)
+        external = SlowSensor(0.0, temperature=12.0)
+        sampler = SensorSampler({"internal": internal, "external": external},
+                                timeouts={"internal": 1.0, "external": 0.05})
+        sampler.sample()
+        external.delay = 5.0
+
+        # act
+        start = time.monotonic()
+        readings = sampler.sample()
+        again = sampler.sample()
+        elapsed = time.monotonic() - start
+        external.release.set()
+        sampler.shutdown()
+
+        # assert
+        assert elapsed < 0.5
+        assert readings["internal"].status == SensorStatus.OK
+        assert readings["external"].status == SensorStatus.STALE
+        assert readings["external"].sensor_data.temperature == 12.0
+        assert readings["external"].age > 0
+        assert external.reads == 2  # the hanging read isn't started again
+        assert again["external"].status == SensorStatus.STALE
+        assert sampler.timed_out["external"] == 2
+
+    def test_sensor_without_a_recent_reading_is_missing(self):
+        # arrange
+        sampler = SensorSampler({"internal": SlowSensor(0.0), "external": BrokenSensor()}, max_stale_age=0)
+
+        # act
+        readings = sampler.sample()
+        sampler.shutdown()
+
+        # assert
+        assert readings["internal"].status == SensorStatus.OK
+        assert readings["external"].status == SensorStatus.MISSING
+        assert sampler.failed["external"] == 1
+
+    def test_age_of_a_reading_counts_from_when_the_sensor_took_it(self):
+        # arrange
+        sampler = SensorSampler({"internal": SlowSensor(0.0), "external": OldReadingSensor(4.0)})
+
+        # act
+        readings = sampler.sample()
+        sampler.shutdown()
+
+        # assert
+        assert readings["internal"].status == SensorStatus.OK and readings["internal"].age < 0.1
+        assert readings["external"].status == SensorStatus.OK
+        assert 4.0 <= readings["external"].age < 4.1
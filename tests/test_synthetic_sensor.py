@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from lib.domain.sensor_data import SensorData
+from lib.sensor_drivers.sensor_driver import SensorDriver
+from lib.sensor_drivers.sensor_factory import SensorFactory
+from lib.sensor_drivers.synthetic.synthetic_generator import SyntheticSensorGenerator
+from lib.sensor_drivers.synthetic.synthetic_sensor import SyntheticSensor
+
+
+class TestSyntheticSensor:
+
+    def test_same_seed_gives_the_same_readings(self):
+        # act
+        first = SyntheticSensorGenerator(50, seed=7, dropout_rate=0.1).series(20)
+        second = SyntheticSensorGenerator(50, seed=7, dropout_rate=0.1).series(20)
+        other = SyntheticSensorGenerator(50, seed=8, dropout_rate=0.1).series(20)
+
+        # assert
+        assert np.array_equal(first.temperature, second.temperature, equal_nan=True)
+        assert np.array_equal(first.valid, second.valid)
+        assert not np.array_equal(first.temperature, other.temperature, equal_nan=True)
+
+    def test_readings_are_realistic(self):
+        # arrange
+        generator = SyntheticSensorGenerator(1, seed=3, interval=600)
+
+        # act
+        series = generator.series(144)  # a day
+
+        # assert
+        assert series.temperature.shape == (144, 1)
+        assert 10 < np.min(series.temperature) and np.max(series.temperature) < 30
+        assert np.all((0 <= series.humidity) & (series.humidity <= 100))
+        # the humidity drops when the temperature rises
+        assert np.corrcoef(series.temperature[:, 0], series.humidity[:, 0])[0, 1] < -0.5
+
+    def test_dropouts_are_missing_readings(self):
+        # act
+        batch = SyntheticSensorGenerator(10_000, seed=1, dropout_rate=0.05).next_batch()
+
+        # assert
+        assert 0.9 < batch.valid.mean() < 0.99
+        assert np.isnan(batch.temperature[~batch.valid]).all()
+        assert not np.isnan(batch.temperature[batch.valid]).any()
+
+    def test_synthetic_driver(self):
+        # arrange
+        sensor = SensorFactory.create_driver(SensorDriver.SYNTHETIC, 0x76)
+
+        # act
+        sensor_data = sensor.get_sensor_data()
+
+        # assert
+        assert isinstance(sensor_data, SensorData)
+        assert sensor_data == SensorFactory.create_driver(SensorDriver.SYNTHETIC, 0x76).get_sensor_data()
+
+    def test_missed_reading_raises(self):
+        # arrange
+        sensor = SyntheticSensor(generator=SyntheticSensorGenerator(1, seed=1, dropout_rate=1.0))
+
+        # act / assert
+        with pytest.raises(IOError):
+            sensor.get_sensor_data()